@@ -4,26 +4,75 @@ import os
 # Add the project root directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from flask import Flask, request, jsonify
+import threading
+from dataclasses import asdict
+from flask import Flask, Response, request, jsonify
 import pandas as pd
+from config.settings import API
+from api.http_cache import etag_matches, signals_etag
 from database.db_manager import DatabaseManager
 from strategy.strategy import VortexStrategy
-from data.data_processor import DataProcessor
+from data.bulk_ingest import BulkIngestor
+from data.data_processor import CSV_DTYPES, DataProcessor
+from utils.cache import CachedIndicators, IndicatorCache
 
 
 app = Flask(__name__)
 db_manager = DatabaseManager()
+indicator_cache = CachedIndicators()
+# Encoded /calculate_signals responses by ETag; entries of older data versions age out
+response_cache = IndicatorCache(max_entries=API["RESPONSE_CACHE_SIZE"])
+# One bulk ingest writes at a time
+bulk_ingest_lock = threading.Lock()
 
 
 @app.route('/upload_data', methods=['POST'])
 def upload_data():
     try:
         file = request.files['file']
-        data = pd.read_csv(file)
+        data = pd.read_csv(file, dtype=CSV_DTYPES)
         data_processor = DataProcessor(db_manager)
-        data_processor.set_file_path(file.filename)
-        data_processor.process_and_save()
-        return jsonify({"status": "success", "message": "Data uploaded and processed successfully"}), 200
+        counts = data_processor.save_dataframe(
+            data,
+            mode=request.form.get('mode', 'replace'),
+            symbol=request.form.get('symbol'),
+            timeframe=request.form.get('timeframe'),
+            validation=request.form.get('validation'),
+        )
+        return jsonify({
+            "status": "success",
+            "message": "Data uploaded and processed successfully",
+            "counts": counts,
+            "validation": data_processor.validation_report.to_dict(),
+        }), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/bulk_ingest', methods=['POST'])
+def bulk_ingest():
+    """
+    Ingest a server-side directory or glob of CSV files; form fields source, mode, symbol, timeframe.
+
+    source is relative to API["BULK_INGEST_ROOT"], and sources outside it are rejected.
+    """
+    try:
+        source = request.form.get('source')
+        if not source:
+            raise ValueError("source is required")
+        ingestor = BulkIngestor(
+            db_manager,
+            mode=request.form.get('mode', 'append'),
+            symbol=request.form.get('symbol'),
+            timeframe=request.form.get('timeframe'),
+            validation=request.form.get('validation'),
+            root=API["BULK_INGEST_ROOT"],
+        )
+        with bulk_ingest_lock:
+            results = ingestor.ingest(source)
+        return jsonify({"status": "success", "files": [asdict(result) for result in results]}), 200
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
@@ -31,14 +80,65 @@ def upload_data():
 @app.route('/calculate_signals', methods=['GET'])
 def calculate_signals():
     try:
-        market_data = db_manager.get_market_data()
+        strategy = VortexStrategy(cache=indicator_cache)
+        symbol, timeframe = request.args.get('symbol'), request.args.get('timeframe')
+        # Every ingest that changes the series bumps its version, and with it the ETag
+        version = db_manager.data_version(symbol, timeframe)
+        etag = signals_etag(
+            'calculate_signals', symbol, timeframe, db_manager.signal_params_key(strategy.config), version
+        )
+        headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+        if etag_matches(request.headers.get('If-None-Match'), etag):
+            return Response(status=304, headers=headers)
+        body = response_cache.get(etag)
+        if body is None:
+            # Served from the signals table while the series is unchanged
+            signals = strategy.get_or_calculate_signals(db_manager, symbol=symbol, timeframe=timeframe)
+            body = app.json.dumps(signals)
+            if db_manager.data_version(symbol, timeframe) != version:
+                # An ingest landed during the calculation; the body may not match the tag
+                return Response(body, status=200, mimetype='application/json')
+            response_cache.put(etag, body)
+        return Response(body, status=200, mimetype='application/json', headers=headers)
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/signals', methods=['GET'])
+def signals():
+    try:
         strategy = VortexStrategy()
-        strategy.initialize(market_data)
-        signals = strategy.calculate_signals()
-        return jsonify(signals), 200
+        symbol, timeframe = request.args.get('symbol'), request.args.get('timeframe')
+        if not db_manager.data_version(symbol, timeframe):
+            return jsonify({"status": "error", "message": "No market data for this series"}), 404
+        strategy.get_or_calculate_signals(db_manager, symbol=symbol, timeframe=timeframe)
+        batch = db_manager.get_signals(
+            strategy.config, symbol, timeframe,
+            start=request.args.get('start'), end=request.args.get('end'),
+        )
+        if batch is None:
+            # An ingest changed the series after the calculation read it
+            return jsonify({"status": "error", "message": "Market data changed during the calculation; retry"}), 409
+        return jsonify(batch.to_hln_result().to_dict()), 200
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@app.route('/catalog', methods=['GET'])
+def catalog():
+    try:
+        catalog = db_manager.get_catalog()
+        for column in ("first_date_time", "last_date_time", "modified_at"):
+            catalog[column] = catalog[column].astype(str)
+        return jsonify(catalog.to_dict(orient="records")), 200
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+@app.route('/cache_stats', methods=['GET'])
+def cache_stats():
+    return jsonify({**indicator_cache.cache.stats(), "responses": response_cache.stats()}), 200
+
+
 if __name__ == '__main__':
     app.run(debug=True)
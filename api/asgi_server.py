@@ -0,0 +1,288 @@
+# api/asgi_server.py
+import sys
+import os
+# Add the project root directory to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import asyncio
+import functools
+import io
+import json
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import asdict
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import parse_qs
+import pandas as pd
+from config.settings import API, DATABASE
+from api.http_cache import etag_matches, signals_etag
+from database.async_db import AsyncDatabaseManager
+from database.db_manager import DatabaseManager
+from data.bulk_ingest import BulkIngestor
+from data.data_processor import CSV_DTYPES, DataProcessor
+from strategy.strategy import VortexStrategy
+from utils.cache import IndicatorCache
+
+
+# The database of a compute-pool process, opened once by _init_compute_worker
+_worker_db: Optional[DatabaseManager] = None
+
+
+def _init_compute_worker(db_name: str):
+    """Compute-pool initializer: open the process's DatabaseManager, reused by every calculation it runs."""
+    global _worker_db
+    _worker_db = DatabaseManager(db_name)
+
+
+def _calculate_signals(
+    config: Dict[str, Any], symbol: Optional[str], timeframe: Optional[str]
+) -> Dict[str, Any]:
+    """Compute-pool entry point: calculate and store signals with the process's pooled connections."""
+    return VortexStrategy(config).get_or_calculate_signals(_worker_db, symbol, timeframe)
+
+
+class VortexASGI:
+    def __init__(self, db_name: str = DATABASE["NAME"], compute_workers: Optional[int] = None):
+        """
+        Dependency-free ASGI version of the Flask API, for servers such as uvicorn or hypercorn.
+
+        Database calls go through AsyncDatabaseManager's bounded thread pool, and
+        signal calculations that miss the signals table run in a process pool, so
+        handlers never block the event loop and cold calculations use every core.
+        Each compute process opens the database once. An in-memory database cannot
+        be shared with other processes, so it computes in threads instead. Uploads
+        and bulk ingests run one at a time in their own thread, so a long ingest
+        never holds a database thread that reads are waiting for.
+
+        Handlers take the query parameters, the body and the request headers and
+        return (status, payload) or (status, payload, headers); a bytes payload is
+        sent as already encoded JSON and a None payload as an empty body.
+
+        Parameters:
+            db_name (str): Path of the SQLite database (default from settings).
+            compute_workers (Optional[int]): Size of the compute pool (default is the number of CPUs).
+        """
+        self.db_name = db_name
+        self.compute_workers = compute_workers or os.cpu_count() or 1
+        self.db: Optional[AsyncDatabaseManager] = None
+        self.compute_executor: Optional[Executor] = None
+        # One ingest writes at a time
+        self.ingest_executor: Optional[ThreadPoolExecutor] = None
+        # Encoded /calculate_signals responses by ETag; entries of older data versions age out
+        self.response_cache = IndicatorCache(max_entries=API["RESPONSE_CACHE_SIZE"])
+        self.routes = {
+            ("GET", "/calculate_signals"): self.calculate_signals,
+            ("GET", "/signals"): self.signals,
+            ("GET", "/catalog"): self.catalog,
+            ("POST", "/upload_data"): self.upload_data,
+            ("POST", "/bulk_ingest"): self.bulk_ingest,
+        }
+
+    def startup(self):
+        """Open the database and the executors (done on lifespan startup or the first request)."""
+        if self.db is not None:
+            return
+        self.db = AsyncDatabaseManager(DatabaseManager(self.db_name))
+        self.ingest_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="vortex-ingest")
+        if self.db_name == ":memory:":
+            self.compute_executor = ThreadPoolExecutor(max_workers=self.compute_workers)
+        else:
+            # Worker processes are spawned, not forked from a process running executor threads
+            self.compute_executor = ProcessPoolExecutor(
+                max_workers=self.compute_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_compute_worker,
+                initargs=(self.db_name,),
+            )
+
+    def shutdown(self):
+        """Close the executors and the database."""
+        if self.db is None:
+            return
+        self.compute_executor.shutdown(wait=True)
+        self.ingest_executor.shutdown(wait=True)
+        self.db.close()
+        self.db = None
+        self.compute_executor = None
+        self.ingest_executor = None
+
+    async def __call__(self, scope: Dict[str, Any], receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+        if self.db is None:
+            self.startup()
+
+        handler = self.routes.get((scope["method"], scope["path"]))
+        if handler is None:
+            await self._send_json(send, 404, {"status": "error", "message": "Not found"})
+            return
+        query = {key: values[-1] for key, values in parse_qs(scope["query_string"].decode()).items()}
+        headers = {
+            name.decode("latin-1").lower(): value.decode("latin-1") for name, value in scope.get("headers", [])
+        }
+        body = await self._read_body(receive)
+        response_headers = {}
+        try:
+            status, payload, *rest = await handler(query, body, headers)
+            if rest:
+                response_headers = rest[0]
+        except Exception as e:
+            status, payload = 500, {"status": "error", "message": str(e)}
+        await self._send_json(send, status, payload, response_headers)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await asyncio.get_running_loop().run_in_executor(None, self.shutdown)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    @staticmethod
+    async def _read_body(receive) -> bytes:
+        chunks = []
+        while True:
+            message = await receive()
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _send_json(send, status: int, payload: Any, headers: Optional[Dict[str, str]] = None):
+        if payload is None:
+            body, content = b"", []
+        else:
+            body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+            content = [(b"content-type", b"application/json")]
+        extra = [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()
+        ]
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": content + [(b"content-length", str(len(body)).encode())] + extra,
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    async def _ensure_signals(self, strategy: VortexStrategy, symbol: Optional[str], timeframe: Optional[str]):
+        """Return the stored signals of the series, computing them in the compute pool when stale."""
+        batch = await self.db.get_signals(strategy.config, symbol, timeframe)
+        if batch is not None:
+            return batch
+        loop = asyncio.get_running_loop()
+        if isinstance(self.compute_executor, ProcessPoolExecutor):
+            await loop.run_in_executor(
+                self.compute_executor, _calculate_signals, strategy.config, symbol, timeframe
+            )
+        else:
+            await loop.run_in_executor(
+                self.compute_executor,
+                strategy.get_or_calculate_signals, self.db.db_manager, symbol, timeframe,
+            )
+        # Read back what was stored for the version the calculation saw
+        return await self.db.get_signals(strategy.config, symbol, timeframe)
+
+    async def calculate_signals(self, query: Dict[str, str], body: bytes, headers: Dict[str, str]) -> Tuple:
+        strategy = VortexStrategy()
+        symbol, timeframe = query.get("symbol"), query.get("timeframe")
+        # Every ingest that changes the series bumps its version, and with it the ETag
+        version = await self.db.data_version(symbol, timeframe)
+        etag = signals_etag(
+            "calculate_signals", symbol, timeframe, DatabaseManager.signal_params_key(strategy.config), version
+        )
+        response_headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if etag_matches(headers.get("if-none-match"), etag):
+            return 304, None, response_headers
+        encoded = self.response_cache.get(etag)
+        if encoded is None:
+            batch = await self._ensure_signals(strategy, symbol, timeframe)
+            if batch is None:
+                raise ValueError("Market data changed during the calculation; retry")
+            encoded = json.dumps(strategy.format_signals(batch.to_hln_result())).encode()
+            if await self.db.data_version(symbol, timeframe) != version:
+                # An ingest landed during the calculation; the body may not match the tag
+                return 200, encoded
+            self.response_cache.put(etag, encoded)
+        return 200, encoded, response_headers
+
+    async def signals(self, query: Dict[str, str], body: bytes, headers: Dict[str, str]) -> Tuple[int, Any]:
+        strategy = VortexStrategy()
+        symbol, timeframe = query.get("symbol"), query.get("timeframe")
+        if not await self.db.data_version(symbol, timeframe):
+            return 404, {"status": "error", "message": "No market data for this series"}
+        await self._ensure_signals(strategy, symbol, timeframe)
+        batch = await self.db.get_signals(
+            strategy.config, symbol, timeframe, start=query.get("start"), end=query.get("end")
+        )
+        if batch is None:
+            # An ingest changed the series after the calculation read it
+            return 409, {"status": "error", "message": "Market data changed during the calculation; retry"}
+        return 200, batch.to_hln_result().to_dict()
+
+    async def catalog(self, query: Dict[str, str], body: bytes, headers: Dict[str, str]) -> Tuple[int, Any]:
+        catalog = await self.db.get_catalog()
+        for column in ("first_date_time", "last_date_time", "modified_at"):
+            catalog[column] = catalog[column].astype(str)
+        return 200, catalog.to_dict(orient="records")
+
+    async def _ingest(self, func, *args, **kwargs) -> Any:
+        """Run a write in the ingest thread, after the ingests already queued."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.ingest_executor, functools.partial(func, *args, **kwargs))
+
+    async def upload_data(self, query: Dict[str, str], body: bytes, headers: Dict[str, str]) -> Tuple[int, Any]:
+        """Store a CSV request body; mode, symbol and timeframe are query parameters."""
+        data_processor = DataProcessor(self.db.db_manager)
+
+        def upload():
+            data = pd.read_csv(io.BytesIO(body), dtype=CSV_DTYPES)
+            return data_processor.save_dataframe(
+                data,
+                mode=query.get("mode", "replace"),
+                symbol=query.get("symbol"),
+                timeframe=query.get("timeframe"),
+                validation=query.get("validation"),
+            )
+
+        counts = await self._ingest(upload)
+        return 200, {
+            "status": "success",
+            "message": "Data uploaded and processed successfully",
+            "counts": counts,
+            "validation": data_processor.validation_report.to_dict(),
+        }
+
+    async def bulk_ingest(
+        self, query: Dict[str, str], body: bytes, headers: Dict[str, str]
+    ) -> Tuple[int, Any]:
+        """
+        Ingest a server-side directory or glob of CSV files; source, mode, symbol and timeframe are query parameters.
+
+        source is relative to API["BULK_INGEST_ROOT"], and sources outside it are rejected.
+        """
+        if not query.get("source"):
+            return 400, {"status": "error", "message": "source is required"}
+        try:
+            ingestor = BulkIngestor(
+                self.db.db_manager,
+                max_workers=self.compute_workers,
+                mode=query.get("mode", "append"),
+                symbol=query.get("symbol"),
+                timeframe=query.get("timeframe"),
+                validation=query.get("validation"),
+                root=API["BULK_INGEST_ROOT"],
+            )
+            results = await self._ingest(ingestor.ingest, query["source"])
+        except ValueError as e:
+            return 400, {"status": "error", "message": str(e)}
+        return 200, {"status": "success", "files": [asdict(result) for result in results]}
+
+
+# Serve with e.g. `uvicorn api.asgi_server:app`
+app = VortexASGI()
@@ -0,0 +1,42 @@
+# api/http_cache.py
+
+import hashlib
+from typing import Optional
+from config.settings import DATABASE
+
+
+def signals_etag(
+    route: str, symbol: Optional[str], timeframe: Optional[str], params_key: str, version: int
+) -> str:
+    """
+    Strong ETag of a signals response: it changes with the series' data version and the strategy parameters.
+
+    Parameters:
+        route (str): The endpoint, so different response shapes never share a tag.
+        symbol (Optional[str]): The instrument (default from settings).
+        timeframe (Optional[str]): The bar timeframe (default from settings).
+        params_key (str): Canonical strategy parameters (see DatabaseManager.signal_params_key).
+        version (int): Catalog version of the series (see DatabaseManager.data_version).
+
+    Returns:
+        str: The quoted entity tag.
+    """
+    parts = (
+        route,
+        symbol or DATABASE["DEFAULT_SYMBOL"],
+        timeframe or DATABASE["DEFAULT_TIMEFRAME"],
+        params_key,
+        version,
+    )
+    return '"' + hashlib.blake2b(repr(parts).encode(), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header names the ETag ("*" matches any; weak tags compare by value)."""
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
@@ -21,7 +21,39 @@ ICHIMOKU_COLORS = {
 }
 
 # Database Configuration
-DATABASE = {"NAME": "vortex.db", "PATH": "database/"}
+DATABASE = {
+    "NAME": "vortex.db",
+    "PATH": "database/",
+    "DEFAULT_SYMBOL": "DEFAULT",  # نماد پیش‌فرض برای داده‌های بدون نماد
+    "DEFAULT_TIMEFRAME": "M1",
+    "CHUNK_SIZE": 100000,  # تعداد ردیف در هر بخش خواندن
+    "ROLLUP_BASE": "M1",  # تایم‌فریم پایه برای ساخت تایم‌فریم‌های بالاتر
+    "ROLLUP_TIMEFRAMES": ["M5", "M15", "H1", "H4", "D1"],
+    "COLUMNAR_MIRROR": True,  # نگهداری نسخه ستونی (.npy) کنار SQLite
+    "POOL_SIZE": 8,  # حداکثر تعداد اتصال‌های باز
+    "POOL_TIMEOUT": 30.0,  # ثانیه انتظار برای اتصال آزاد
+    "PRAGMAS": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "mmap_size": 268435456,  # 256 MB
+        "cache_size": -65536,  # 64 MB (مقدار منفی یعنی کیلوبایت)
+        "temp_store": "MEMORY",
+        "busy_timeout": 30000,
+    },
+}
+
+# Ingest Validation
+VALIDATION = {
+    "ACTION": "flag",  # "flag" فقط گزارش، "drop" حذف کندل‌های نامعتبر، "repair" اصلاح در صورت امکان
+    "GAP_BARS": 60,  # فاصله بیشتر از این تعداد کندل به عنوان شکاف گزارش می‌شود
+    "MAX_RANGES": 5,  # حداکثر بازه‌های گزارش‌شده برای هر نوع خطا
+}
+
+# API Settings
+API = {
+    "RESPONSE_CACHE_SIZE": 256,  # تعداد پاسخ‌های ذخیره‌شده برای هر نسخه داده و پارامترها
+    "BULK_INGEST_ROOT": "ingest/",  # پوشه‌ای که /bulk_ingest فقط از داخل آن فایل می‌خواند
+}
 
 # GUI Settings
 GUI = {
@@ -0,0 +1,418 @@
+# data/bulk_ingest.py
+
+import argparse
+import glob
+import io
+import multiprocessing
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import pandas as pd
+
+if __package__ in (None, ""):
+    # Allow `python data/bulk_ingest.py` as well as `python -m data.bulk_ingest`
+    sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from config.settings import DATABASE
+from data.data_processor import CSV_DTYPES, DataProcessor
+from data.hst_reader import HST_HEADER_SIZE, HstFile
+from data.validation import VALIDATION_ACTIONS, BarValidator
+from utils.helpers import TimeframeConverter
+
+# Bulk loads add to the stored series; "replace" would let files of one symbol wipe each other
+BULK_MODES = ("append", "upsert")
+EXECUTORS = ("process", "thread")
+# Bytes of a file a worker parses into one frame
+DEFAULT_CHUNK_BYTES = 16 * 1024 * 1024
+
+
+@dataclass
+class FileResult:
+    """
+    Outcome of ingesting one file (or the bytes appended to it since the last poll).
+
+    Attributes:
+        path (str): The file.
+        symbol (Optional[str]): The instrument the bars were stored under.
+        timeframe (Optional[str]): The timeframe the bars were stored under.
+        rows (int): Number of bars parsed and kept by validation.
+        counts (Optional[Dict[str, int]]): Inserted, updated and skipped rows, or None on error.
+        offset (int): Byte offset up to which the file has been ingested.
+        parse_time (float): Seconds spent reading and parsing in the worker.
+        store_time (float): Seconds spent in the writer.
+        validation (Optional[dict]): Data quality report of the parsed bars (see ValidationReport.to_dict).
+        error (Optional[str]): The error message if the file failed.
+    """
+    path: str
+    symbol: Optional[str]
+    timeframe: Optional[str]
+    rows: int = 0
+    counts: Optional[Dict[str, int]] = None
+    offset: int = 0
+    parse_time: float = 0.0
+    store_time: float = 0.0
+    validation: Optional[dict] = None
+    error: Optional[str] = None
+
+
+def series_from_name(path: str) -> Tuple[str, Optional[str]]:
+    """
+    Derive the series of a file from its name: "EURUSD_M1.csv" or "EURUSD-M1.csv" give
+    ("EURUSD", "M1"); a name without a known timeframe suffix is all symbol.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    for separator in ("_", "-"):
+        symbol, _, suffix = stem.rpartition(separator)
+        if symbol and suffix.upper() in TimeframeConverter.TIMEFRAME_SECONDS:
+            return symbol, suffix.upper()
+    return stem, None
+
+
+def _parse_file(
+    path: str,
+    offset: int,
+    header: Optional[List[str]],
+    complete_lines: bool,
+    validator: BarValidator,
+    chunk_bytes: int,
+) -> Tuple[Optional[pd.DataFrame], int, Optional[List[str]], bool, BarValidator, float]:
+    """
+    Worker entry point: parse and validate one slice of a file, from a byte offset, into bars
+    ready for store_market_data.
+
+    The validator of the file is passed along from slice to slice, so its checks
+    and report span the whole file.
+
+    Returns:
+        Tuple: The prepared bars (None if there was nothing new), the offset after the
+        consumed bytes, the column names of the file, whether the slice reached the end
+        of the file, the validator and the seconds spent.
+    """
+    start = time.perf_counter()
+    frame, end, header, done = _read_file(path, offset, header, complete_lines, chunk_bytes)
+    if frame is not None:
+        frame = validator.validate(frame)
+    return frame, end, header, done, validator, time.perf_counter() - start
+
+
+def _read_file(
+    path: str, offset: int, header: Optional[List[str]], complete_lines: bool, chunk_bytes: int
+) -> Tuple[Optional[pd.DataFrame], int, Optional[List[str]], bool]:
+    """Read about chunk_bytes of a CSV or .hst file from a byte offset; see _parse_file."""
+    if DataProcessor.is_hst(path):
+        # Whole records only; a record still being written is left for the next poll
+        hst = HstFile(path)
+        records = len(hst)
+        first = max(offset - HST_HEADER_SIZE, 0) // hst.record_dtype.itemsize
+        stop = min(first + max(chunk_bytes // hst.record_dtype.itemsize, 1), records)
+        frame = hst.frame(first, stop)
+        return (frame if len(frame) else None), hst.record_offset(stop), None, stop >= records
+    with open(path, "rb") as f:
+        f.seek(offset)
+        # The slice always ends with a whole line, however long
+        data = f.read(chunk_bytes) + f.readline()
+        done = not f.read(1)
+    if complete_lines and done:
+        # A line still being written is left for the next poll
+        data = data[:data.rfind(b"\n") + 1]
+    end = offset + len(data)
+    if not data.strip():
+        return None, end, header, done
+    if header is None:
+        frame = pd.read_csv(io.BytesIO(data), dtype=CSV_DTYPES)
+    else:
+        frame = pd.read_csv(io.BytesIO(data), names=header, header=None, dtype=CSV_DTYPES)
+    return DataProcessor.prepare_frame(frame), end, list(frame.columns), done
+
+
+class BulkIngestor:
+    def __init__(
+        self,
+        db_manager,
+        max_workers: Optional[int] = None,
+        mode: str = "append",
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        executor: str = "process",
+        validation: Optional[str] = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+        root: Optional[str] = None,
+    ):
+        """
+        Ingest many CSV and MetaTrader .hst files: parsed in parallel workers, stored by a single writer.
+
+        Workers only read and parse slices of about chunk_bytes; the calling thread
+        stores each parsed slice in its own transaction as soon as it is ready, so
+        writes never contend for the database while parsing scales with the pool.
+        At most max_workers slices are in flight, so memory use does not grow with
+        the files. The slices of one file are parsed in order, files in parallel.
+        Byte offsets of stored slices are kept, so watch() and later calls only read
+        what was appended, and a failed file resumes after its last stored slice.
+
+        Parameters:
+            db_manager (DatabaseManager): The store to write to.
+            max_workers (Optional[int]): Pool size (default is the number of CPUs).
+            mode (str): "append" or "upsert" (default is "append").
+            symbol (Optional[str]): Store every file under this symbol (default from each file name).
+            timeframe (Optional[str]): Store every file under this timeframe (default from each
+                file name, else from settings).
+            executor (str): "process" for a process pool or "thread" for a thread pool (default is "process").
+            validation (Optional[str]): "flag", "drop" or "repair" invalid bars, in the workers
+                (default from settings).
+            chunk_bytes (int): Bytes of a file parsed into one frame (default is 16 MiB).
+            root (Optional[str]): Directory every source must lie in; relative sources are
+                taken relative to it (default is None, any path).
+
+        Raises:
+            ValueError: If the mode, executor type or validation action is unknown, or chunk_bytes
+                is not positive.
+        """
+        if mode not in BULK_MODES:
+            raise ValueError(f"mode must be one of {BULK_MODES}")
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}")
+        if validation is not None and validation not in VALIDATION_ACTIONS:
+            raise ValueError(f"validation must be one of {VALIDATION_ACTIONS}")
+        if chunk_bytes <= 0:
+            raise ValueError("chunk_bytes must be a positive number")
+        self.db_manager = db_manager
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.mode = mode
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.executor = executor
+        self.validation = validation
+        self.chunk_bytes = chunk_bytes
+        self.root = root
+        # path -> (bytes ingested, column names)
+        self.offsets: Dict[str, Tuple[int, Optional[List[str]]]] = {}
+        # path -> size of a file that failed, not retried until it changes
+        self.failed: Dict[str, int] = {}
+
+    @staticmethod
+    def resolve(source: str) -> List[str]:
+        """Return the CSV and .hst files of a directory, or the files matching a glob pattern, sorted."""
+        if os.path.isdir(source):
+            patterns = [os.path.join(source, "*.csv"), os.path.join(source, "*.hst")]
+        else:
+            patterns = [source]
+        return sorted(
+            path for pattern in patterns for path in glob.glob(pattern) if os.path.isfile(path)
+        )
+
+    def files(self, source: str) -> List[str]:
+        """
+        Return the files of a source, as resolve() does, checked against root if one is set.
+
+        Raises:
+            ValueError: If the source, or a file it matches, lies outside root.
+        """
+        if self.root is None:
+            return self.resolve(source)
+        root = os.path.realpath(self.root)
+        source = os.path.join(root, source)
+        # The part before the first wildcard, then every match, after following links and ".."
+        literal = re.split(r"[*?[]", source, maxsplit=1)[0]
+        paths = self.resolve(source)
+        for path in [literal] + paths:
+            if os.path.commonpath([root, os.path.realpath(path)]) != root:
+                raise ValueError(f"source must lie inside {self.root}")
+        return paths
+
+    def _series(self, path: str) -> Tuple[str, str]:
+        if DataProcessor.is_hst(path):
+            # MetaTrader history files name their series in the header
+            hst = HstFile(path)
+            symbol, timeframe = hst.symbol, hst.timeframe
+            if timeframe is None and not self.timeframe:
+                raise ValueError(f"No timeframe for the {hst.period} minute period of {path}")
+        else:
+            symbol, timeframe = series_from_name(path)
+        return (
+            self.symbol or symbol,
+            self.timeframe or timeframe or DATABASE["DEFAULT_TIMEFRAME"],
+        )
+
+    def _pending(self, paths: List[str]) -> List[Tuple[str, int, Optional[List[str]], int]]:
+        """Files with bytes beyond their recorded offset; a file that shrank is read again."""
+        pending = []
+        for path in paths:
+            offset, header = self.offsets.get(path, (0, None))
+            size = os.path.getsize(path)
+            if size < offset:
+                offset, header = 0, None
+            if size > offset and self.failed.get(path) != size:
+                pending.append((path, offset, header, size))
+        return pending
+
+    def run(self, source: str, complete_lines: bool = False) -> Iterator[FileResult]:
+        """
+        Ingest the new bytes of every file of a source and yield results as files are stored.
+
+        Parameters:
+            source (str): A directory (its *.csv files), a glob pattern or a file.
+            complete_lines (bool): Leave a trailing line without a newline for later, for files
+                that may still be written (default is False).
+
+        Yields:
+            FileResult: One result per file with new data, in completion order.
+        """
+        pending = self._pending(self.files(source))
+        if not pending:
+            return
+        if self.executor == "process":
+            # Workers are spawned, not forked from a process that may be running server threads
+            pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        else:
+            pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        with pool:
+            futures = {}
+            queued = iter(pending)
+
+            def submit(
+                result: FileResult, offset: int, header: Optional[List[str]], validator: BarValidator, size: int
+            ):
+                future = pool.submit(
+                    _parse_file, result.path, offset, header, complete_lines, validator, self.chunk_bytes
+                )
+                futures[future] = (result, size)
+
+            def fill() -> Iterator[FileResult]:
+                """Start queued files until max_workers slices are in flight; yield files that cannot be read."""
+                while len(futures) < self.max_workers:
+                    item = next(queued, None)
+                    if item is None:
+                        return
+                    path, offset, header, size = item
+                    try:
+                        symbol, timeframe = self._series(path)
+                    except Exception as e:
+                        self.failed[path] = size
+                        yield FileResult(path=path, symbol=None, timeframe=None, error=str(e))
+                        continue
+                    result = FileResult(path=path, symbol=symbol, timeframe=timeframe, offset=offset)
+                    result.counts = {"inserted": 0, "updated": 0, "skipped": 0}
+                    submit(result, offset, header, BarValidator(timeframe, self.validation), size)
+
+            try:
+                yield from fill()
+                while futures:
+                    future = next(as_completed(futures))
+                    result, size = futures.pop(future)
+                    try:
+                        frame, offset, header, done, validator, parse_time = future.result()
+                        result.parse_time += parse_time
+                        result.validation = validator.report.to_dict()
+                        start = time.perf_counter()
+                        if frame is not None:
+                            result.rows += len(frame)
+                            counts = self.db_manager.store_market_data(
+                                frame, mode=self.mode, symbol=result.symbol, timeframe=result.timeframe
+                            )
+                            for key in counts:
+                                result.counts[key] += counts[key]
+                        result.store_time += time.perf_counter() - start
+                        result.offset = offset
+                        self.offsets[result.path] = (offset, header)
+                        if not done:
+                            submit(result, offset, header, validator, size)
+                            continue
+                        self.failed.pop(result.path, None)
+                    except sqlite3.Error as e:
+                        # The offset stays before the slice, and the next run retries it
+                        result.error = str(e)
+                        result.counts = None
+                    except Exception as e:
+                        result.error = str(e)
+                        result.counts = None
+                        self.failed[result.path] = size
+                    yield result
+                    yield from fill()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def ingest(self, source: str) -> List[FileResult]:
+        """Ingest every file of a source and return the per-file results."""
+        return list(self.run(source))
+
+    def watch(
+        self,
+        source: str,
+        interval: float = 5.0,
+        stop: Optional[threading.Event] = None,
+        on_result: Optional[Callable[[FileResult], None]] = None,
+    ):
+        """
+        Poll a source and ingest new files and bytes appended to known files until stopped.
+
+        Parameters:
+            source (str): A directory, a glob pattern or a file.
+            interval (float): Seconds between polls (default is 5).
+            stop (Optional[threading.Event]): Set it to stop watching (default is to watch forever).
+            on_result (Optional[Callable[[FileResult], None]]): Called with every result.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for result in self.run(source, complete_lines=True):
+                if on_result is not None:
+                    on_result(result)
+            stop.wait(interval)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point: python -m data.bulk_ingest SOURCE [options]."""
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Ingest a directory or glob of market data CSV files.")
+    parser.add_argument("source", help="Directory of .csv files, glob pattern or file")
+    parser.add_argument("--db", default=DATABASE["NAME"], help="SQLite database path")
+    parser.add_argument("--mode", choices=BULK_MODES, default="append")
+    parser.add_argument("--symbol", help="Symbol for every file (default from the file names)")
+    parser.add_argument("--timeframe", help="Timeframe for every file (default from the file names)")
+    parser.add_argument("--validation", choices=VALIDATION_ACTIONS, help="Flag, drop or repair invalid bars")
+    parser.add_argument("--workers", type=int, help="Parser processes (default is the number of CPUs)")
+    parser.add_argument("--watch", action="store_true", help="Keep polling for new or appended data")
+    parser.add_argument("--interval", type=float, default=5.0, help="Seconds between polls in watch mode")
+    args = parser.parse_args(argv)
+
+    failed = 0
+    with DatabaseManager(args.db) as db_manager:
+        ingestor = BulkIngestor(
+            db_manager, max_workers=args.workers, mode=args.mode,
+            symbol=args.symbol, timeframe=args.timeframe, validation=args.validation,
+        )
+
+        def report(result: FileResult):
+            nonlocal failed
+            if result.error:
+                failed += 1
+                print(f"{result.path}: error: {result.error}")
+            else:
+                print(f"{result.path}: {result.symbol} {result.timeframe} {result.rows} rows {result.counts}")
+                if result.validation and result.validation["counts"]:
+                    print(f"  data quality: {result.validation['counts']}")
+
+        start = time.perf_counter()
+        results = list(ingestor.run(args.source))
+        for result in results:
+            report(result)
+        print(f"Ingested {len(results)} files in {time.perf_counter() - start:.1f}s")
+        if args.watch:
+            try:
+                ingestor.watch(args.source, interval=args.interval, on_result=report)
+            except KeyboardInterrupt:
+                pass
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,28 @@
 # data/data_processor.py
 
+import contextlib
+import os
+from typing import Callable, Optional
+import numpy as np
 import pandas as pd
+from config.settings import DATABASE
+from utils.helpers import DataHelper
+from data.hst_reader import HstFile
+from data.validation import BarValidator
+
+# Column types of broker CSV exports; Date and Time stay strings for the fixed-format parser
+CSV_DTYPES = {
+    "Date": str,
+    "Time": str,
+    "Open": np.float64,
+    "High": np.float64,
+    "Low": np.float64,
+    "Close": np.float64,
+    "Volume": np.float64,
+}
+# Ingest modes: the store modes, plus "replace_range" (replace the stored bars inside the
+# file's time range) and "new_only" (insert only bars whose timestamp is new, i.e. "append")
+INGEST_MODES = ("replace", "replace_range", "new_only", "append", "upsert")
 
 
 class DataProcessor:
@@ -13,6 +35,8 @@ class DataProcessor:
         """
         self.db_manager = db_manager
         self.file_path = None
+        self.mode = "replace"
+        self.validation_report = None
 
     def set_file_path(self, file_path):
         """
@@ -23,82 +47,267 @@ class DataProcessor:
         """
         self.file_path = file_path
 
-    def check_duplicates(self, file_path):
+    def set_mode(self, mode):
+        """
+        Sets the ingest mode used by process_and_save when no mode is passed.
+
+        Parameters:
+            mode (str): One of INGEST_MODES.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in INGEST_MODES:
+            raise ValueError(f"mode must be one of {INGEST_MODES}")
+        self.mode = mode
+
+    @staticmethod
+    def is_hst(file_path):
+        """True for MetaTrader 4 history files, which are read with HstFile instead of as CSV."""
+        return str(file_path).lower().endswith(".hst")
+
+    def _iter_timestamps(self, file_path, chunk_size=None):
+        """Yield the parsed bar times of a file chunk by chunk, reading only Date and Time of a CSV."""
+        chunk_size = chunk_size or DATABASE["CHUNK_SIZE"]
+        if self.is_hst(file_path):
+            hst = HstFile(file_path)
+            for start in range(0, len(hst), chunk_size):
+                yield hst.columns(start, start + chunk_size)["ts"]
+            return
+        reader = pd.read_csv(
+            file_path,
+            usecols=["Date", "Time"],
+            dtype={"Date": str, "Time": str},
+            chunksize=chunk_size,
+        )
+        for chunk in reader:
+            chunk = chunk.dropna(subset=["Date", "Time"])
+            yield DataHelper.parse_timestamps(chunk["Date"].to_numpy(), chunk["Time"].to_numpy())
+
+    def _iter_frames(self, file_path, chunk_size=None):
+        """Yield (bars ready for store_market_data, bytes consumed so far) for each chunk of a file."""
+        chunk_size = chunk_size or DATABASE["CHUNK_SIZE"]
+        if self.is_hst(file_path):
+            hst = HstFile(file_path)
+            for start in range(0, len(hst), chunk_size):
+                stop = min(start + chunk_size, len(hst))
+                yield hst.frame(start, stop), hst.record_offset(stop)
+            return
+        total_bytes = os.path.getsize(file_path)
+        with open(file_path, "rb") as f:
+            for chunk in pd.read_csv(f, dtype=CSV_DTYPES, chunksize=chunk_size):
+                # The parser reads ahead, so the position is approximate until the end
+                yield self.prepare_frame(chunk), min(f.tell(), total_bytes)
+
+    def file_timeframe(self, file_path, timeframe=None):
+        """
+        Returns the timeframe to store a file under: the given one, the period of a .hst file,
+        or None (the default from settings) for a CSV file.
+
+        Raises:
+            ValueError: If a .hst file has a period without a matching timeframe.
+        """
+        if timeframe or not self.is_hst(file_path):
+            return timeframe
+        hst = HstFile(file_path)
+        if hst.timeframe is None:
+            raise ValueError(f"No timeframe for the {hst.period} minute period of {file_path}")
+        return hst.timeframe
+
+    def find_overlap(self, file_path, symbol=None, timeframe=None, chunk_size=None):
+        """
+        Finds the bars of a CSV or .hst file whose timestamps are already stored, without loading the table.
+
+        Parameters:
+            file_path (str): The path to the file containing new market data.
+            symbol (str): The instrument the file belongs to (default from settings).
+            timeframe (str): The bar timeframe of the file (default from the .hst header or settings).
+            chunk_size (Optional[int]): Rows per chunk (default from settings).
+
+        Returns:
+            dict: rows (number of overlapping bars), first_ts and last_ts (their range, None if
+            there is no overlap), and file_first_ts and file_last_ts (the file's own range).
+        """
+        overlap = {"rows": 0, "first_ts": None, "last_ts": None, "file_first_ts": None, "file_last_ts": None}
+        timeframe = self.file_timeframe(file_path, timeframe)
+        for ts in self._iter_timestamps(file_path, chunk_size):
+            if not len(ts):
+                continue
+            self._widen(overlap, "file_first_ts", "file_last_ts", int(ts.min()), int(ts.max()))
+            found = self.db_manager.find_overlap(ts, symbol=symbol, timeframe=timeframe)
+            if found["rows"]:
+                overlap["rows"] += found["rows"]
+                self._widen(overlap, "first_ts", "last_ts", found["first_ts"], found["last_ts"])
+        return overlap
+
+    def _file_range(self, file_path, chunk_size=None):
+        """Return the first and last bar time of a CSV file as epoch ns, or (None, None) if it is empty."""
+        file_range = {"first_ts": None, "last_ts": None}
+        for ts in self._iter_timestamps(file_path, chunk_size):
+            if len(ts):
+                self._widen(file_range, "first_ts", "last_ts", int(ts.min()), int(ts.max()))
+        return file_range["first_ts"], file_range["last_ts"]
+
+    @staticmethod
+    def _widen(bounds, first_key, last_key, first, last):
+        """Extend the range stored under first_key/last_key to include first..last."""
+        if bounds[first_key] is None or first < bounds[first_key]:
+            bounds[first_key] = first
+        if bounds[last_key] is None or last > bounds[last_key]:
+            bounds[last_key] = last
+
+    def check_duplicates(self, file_path, symbol=None, timeframe=None):
         """
         Checks for duplicates in the new data compared to existing data in the database.
 
         Parameters:
             file_path (str): The path to the CSV file containing new market data.
+            symbol (str): The instrument the file belongs to (default from settings).
+            timeframe (str): The bar timeframe of the file (default from settings).
 
         Returns:
             bool: True if duplicates are found, False otherwise.
         """
         try:
-            new_data = pd.read_csv(file_path)
-            existing_data = self.db_manager.get_market_data()
-
-            # Drop rows with NaN values in 'Date' or 'Time' columns
-            new_data = new_data.dropna(subset=["Date", "Time"])
-            existing_data = existing_data.dropna(subset=["date", "time"])
-
-            if existing_data.empty:
-                return False
-
-            # Combine date and time columns to create date_time for new_data
-            new_data["date_time"] = (
-                new_data["Date"].astype(str) + " " + new_data["Time"].astype(str)
-            )
-
-            # Combine date and time columns to create date_time for existing_data
-            if "date" in existing_data.columns and "time" in existing_data.columns:
-                existing_data["date_time"] = (
-                    existing_data["date"].astype(str)
-                    + " "
-                    + existing_data["time"].astype(str)
-                )
-
-            # Check for duplicates by merging new data with existing data
-            merged_data = pd.merge(
-                new_data, existing_data, on=["date_time"], how="inner"
-            )
-            return not merged_data.empty
+            return self.find_overlap(file_path, symbol=symbol, timeframe=timeframe)["rows"] > 0
         except Exception as e:
             print(f"Error checking duplicates: {e}")
             return False
 
-    def process_and_save(self):
+    def process_and_save(
+        self,
+        mode=None,
+        symbol=None,
+        timeframe=None,
+        chunk_size: Optional[int] = None,
+        progress: Optional[Callable[[int, int, int], None]] = None,
+        validation: Optional[str] = None,
+    ):
         """
-        Reads, processes, and saves market data to the database.
+        Streams the CSV or MetaTrader .hst file into the database in chunks of bounded size.
+
+        Each CSV chunk is read with explicit column types and gets its timestamps
+        from the vectorized fixed-format parser; .hst records are decoded from a
+        memory map (see HstFile). Chunks are stored one at a time, so memory use
+        does not grow with the file. In "replace" mode only the first chunk
+        replaces the stored series and later chunks are appended. In
+        "replace_range" mode the stored bars between the file's first and last
+        bar are deleted first. Both replace modes run in one transaction, so a
+        failure leaves the stored series as it was; the other modes commit
+        every chunk. Every chunk passes through a BarValidator whose
+        report is kept in self.validation_report. The columnar mirror catches
+        up on its next read.
+
+        Parameters:
+            mode (str): "replace" swaps the stored bars for the file's bars, "replace_range" only
+                those inside the file's time range, "append" (or "new_only") only adds new bars and
+                "upsert" also updates changed bars (default is the mode set with set_mode).
+            symbol (str): The instrument the file belongs to (default from settings).
+            timeframe (str): The bar timeframe of the file, e.g. "M1" (default from the .hst header
+                or settings).
+            chunk_size (Optional[int]): Rows per chunk (default from settings).
+            progress (Optional[Callable[[int, int, int], None]]): Called after every chunk with the
+                rows read so far, the bytes read so far and the file size.
+            validation (Optional[str]): "flag", "drop" or "repair" invalid bars (default from settings).
+
+        Returns:
+            dict: Counts of inserted, updated and skipped rows (and deleted rows in "replace_range"
+            mode).
+        Raises:
+            ValueError: If the file path is not set or the mode is unknown; read and database
+                errors are raised as well.
         """
         try:
             if not self.file_path:
                 raise ValueError("File path is not set.")
 
-            # Read the data from the CSV file
-            data = pd.read_csv(self.file_path)
-            print("Data read from CSV:", data)  # Debugging statement
+            mode = mode or self.mode
+            if mode not in INGEST_MODES:
+                raise ValueError(f"mode must be one of {INGEST_MODES}")
+            timeframe = self.file_timeframe(self.file_path, timeframe)
+            counts = {"inserted": 0, "updated": 0, "skipped": 0}
+            # A replace is committed once every chunk is stored, so a failure keeps the old bars
+            atomic = mode in ("replace", "replace_range")
+            with self.db_manager.transaction() if atomic else contextlib.nullcontext():
+                if mode == "replace_range":
+                    first_ts, last_ts = self._file_range(self.file_path, chunk_size)
+                    counts["deleted"] = 0
+                    if first_ts is not None:
+                        counts["deleted"] = self.db_manager.delete_market_data(
+                            first_ts, last_ts, symbol=symbol, timeframe=timeframe
+                        )
+                if mode in ("replace_range", "new_only"):
+                    mode = "append"
+                rows = 0
+                total_bytes = os.path.getsize(self.file_path)
+                validator = BarValidator(timeframe, validation)
+                self.validation_report = validator.report
+                for chunk, position in self._iter_frames(self.file_path, chunk_size):
+                    rows += len(chunk)
+                    chunk = validator.validate(chunk)
+                    chunk_counts = self.db_manager.store_market_data(
+                        chunk, mode=mode, symbol=symbol, timeframe=timeframe
+                    )
+                    for key in chunk_counts:
+                        counts[key] += chunk_counts[key]
+                    if mode == "replace":
+                        mode = "append"
+                    if progress is not None:
+                        progress(rows, position, total_bytes)
+            print(f"Stored market data from {self.file_path}: {counts}")
+            if validator.report.issues:
+                print(validator.report.summary())
+            return counts
+        except Exception as e:
+            print(f"Error processing and saving data: {e}")
+            raise
 
-            # Drop rows with NaN values in 'Date' or 'Time' columns
-            data = data.dropna(subset=["Date", "Time"])
+    def save_dataframe(
+        self, data, mode="replace", symbol=None, timeframe=None, refresh_mirror=False, validation=None
+    ):
+        """
+        Processes and saves market data that is already loaded, e.g. from an upload.
 
-            # Combine date and time columns to create date_time
-            data["date_time"] = (
-                data["Date"].astype(str) + " " + data["Time"].astype(str)
-            )
+        Parameters:
+            data (pd.DataFrame): Bars with Date, Time, Open, High, Low, Close and Volume columns.
+            mode (str): "replace", "append" or "upsert" (see process_and_save).
+            symbol (str): The instrument the bars belong to (default from settings).
+            timeframe (str): The bar timeframe, e.g. "M1" (default from settings).
+            refresh_mirror (bool): Bring the columnar mirror up to date now instead of on its next read
+                (default is False).
+            validation (Optional[str]): "flag", "drop" or "repair" invalid bars (default from settings);
+                the report is kept in self.validation_report.
 
-            # Drop existing data from the database
-            self.db_manager.drop_market_data()
-            print("Existing data dropped from database.")  # Debugging statement
+        Returns:
+            dict: Counts of inserted, updated and skipped rows.
+        """
+        validator = BarValidator(timeframe, validation)
+        self.validation_report = validator.report
+        data = validator.validate(self.prepare_frame(data))
+        # Store the processed data in one transaction; the table schema is kept
+        return self.db_manager.store_market_data(
+            data, mode=mode, symbol=symbol, timeframe=timeframe,
+            refresh_mirror=refresh_mirror,
+        )
 
-            # Store the processed data
-            print(
-                "Attempting to store the following data:", data
-            )  # Debugging statement
-            self.db_manager.store_market_data(data)
-            print("Data storage attempt completed.")  # Debugging statement
+    @staticmethod
+    def prepare_frame(data):
+        """
+        Drops bars without Date or Time and adds their date_time text and parsed ts.
 
-            # Retrieve and print stored data for verification
-            stored_data = self.db_manager.get_market_data()
-            print("Data retrieved from database:", stored_data)  # Debugging statement
-        except Exception as e:
-            print(f"Error processing and saving data: {e}")
+        Parameters:
+            data (pd.DataFrame): Bars with Date and Time columns.
+
+        Returns:
+            pd.DataFrame: The bars with date_time and ts (epoch ns) columns.
+        """
+        # Drop rows with NaN values in 'Date' or 'Time' columns
+        data = data.dropna(subset=["Date", "Time"])
+        dates = data["Date"].astype(str)
+        times = data["Time"].astype(str)
+
+        # Combine date and time columns to create date_time, and parse it once
+        return data.assign(
+            date_time=dates + " " + times,
+            ts=DataHelper.parse_timestamps(dates.to_numpy(), times.to_numpy()),
+        )
@@ -0,0 +1,131 @@
+# data/hst_reader.py
+
+import os
+from typing import Dict, Optional
+import numpy as np
+import pandas as pd
+
+HST_HEADER_SIZE = 148
+HST_HEADER_DTYPE = np.dtype([
+    ("version", "<i4"),
+    ("copyright", "S64"),
+    ("symbol", "S12"),
+    ("period", "<i4"),
+    ("digits", "<i4"),
+    ("timesign", "<i4"),
+    ("last_sync", "<i4"),
+    ("unused", "<i4", (13,)),
+])
+# Packed little-endian records: 400 is the pre-build-600 format, 401 the current one
+HST_RECORD_DTYPES = {
+    400: np.dtype([
+        ("time", "<i4"),
+        ("open", "<f8"),
+        ("low", "<f8"),
+        ("high", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<f8"),
+    ]),
+    401: np.dtype([
+        ("time", "<i8"),
+        ("open", "<f8"),
+        ("high", "<f8"),
+        ("low", "<f8"),
+        ("close", "<f8"),
+        ("volume", "<i8"),
+        ("spread", "<i4"),
+        ("real_volume", "<i8"),
+    ]),
+}
+# History period in minutes -> timeframe
+PERIOD_TIMEFRAMES = {1: "M1", 5: "M5", 15: "M15", 30: "M30", 60: "H1", 240: "H4", 1440: "D1"}
+
+
+class HstFile:
+    def __init__(self, path: str):
+        """
+        MetaTrader 4 history file (.hst), read through a memory map.
+
+        Records are decoded by a NumPy structured dtype straight from the mapped
+        file, so reading a range of bars does no per-row Python work.
+
+        Parameters:
+            path (str): The .hst file.
+
+        Raises:
+            ValueError: If the file is too short or its format version is not 400 or 401.
+        """
+        self.path = path
+        if os.path.getsize(path) < HST_HEADER_SIZE:
+            raise ValueError(f"{path} is not a MetaTrader history file")
+        header = np.fromfile(path, dtype=HST_HEADER_DTYPE, count=1)[0]
+        self.version = int(header["version"])
+        if self.version not in HST_RECORD_DTYPES:
+            raise ValueError(f"Unsupported .hst version {self.version} in {path}")
+        self.record_dtype = HST_RECORD_DTYPES[self.version]
+        self.symbol = header["symbol"].split(b"\0", 1)[0].decode("ascii", "replace")
+        self.period = int(header["period"])
+        self.digits = int(header["digits"])
+        self.timeframe: Optional[str] = PERIOD_TIMEFRAMES.get(self.period)
+
+    def __len__(self) -> int:
+        """Number of complete records in the file."""
+        return (os.path.getsize(self.path) - HST_HEADER_SIZE) // self.record_dtype.itemsize
+
+    def record_offset(self, index: int) -> int:
+        """Byte offset of a record in the file."""
+        return HST_HEADER_SIZE + index * self.record_dtype.itemsize
+
+    def records(self, start: int = 0, stop: Optional[int] = None) -> np.ndarray:
+        """Map records start..stop-1 read-only as a structured array."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        if stop <= start:
+            return np.empty(0, dtype=self.record_dtype)
+        return np.memmap(
+            self.path, dtype=self.record_dtype, mode="r",
+            offset=self.record_offset(start), shape=(stop - start,),
+        )
+
+    def columns(self, start: int = 0, stop: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """
+        Return records start..stop-1 as typed columns.
+
+        Returns:
+            Dict[str, np.ndarray]: ts (int64 epoch ns), open, high, low and close (float64)
+            and volume (int64).
+        """
+        records = self.records(start, stop)
+        return {
+            "ts": records["time"].astype(np.int64) * 1_000_000_000,
+            "open": records["open"].astype(np.float64),
+            "high": records["high"].astype(np.float64),
+            "low": records["low"].astype(np.float64),
+            "close": records["close"].astype(np.float64),
+            "volume": records["volume"].astype(np.int64),
+        }
+
+    def frame(self, start: int = 0, stop: Optional[int] = None) -> pd.DataFrame:
+        """
+        Return records start..stop-1 as bars ready for DatabaseManager.store_market_data.
+
+        Returns:
+            pd.DataFrame: Date, Time, Open, High, Low, Close, Volume, date_time and ts columns.
+        """
+        columns = self.columns(start, stop)
+        # "YYYY-MM-DDTHH:MM:SS", split and joined through character views of the array
+        stamps = np.datetime_as_string(columns["ts"].view("datetime64[ns]"), unit="s").astype("U19")
+        characters = stamps.view("U1").reshape(-1, 19)
+        dates = np.ascontiguousarray(characters[:, :10]).view("U10").ravel()
+        times = np.ascontiguousarray(characters[:, 11:]).view("U8").ravel()
+        characters[:, 10] = " "
+        return pd.DataFrame({
+            "Date": dates,
+            "Time": times,
+            "Open": columns["open"],
+            "High": columns["high"],
+            "Low": columns["low"],
+            "Close": columns["close"],
+            "Volume": columns["volume"],
+            "date_time": stamps,
+            "ts": columns["ts"],
+        })
@@ -0,0 +1,215 @@
+# data/validation.py
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+from config.settings import DATABASE, VALIDATION
+from utils.helpers import TimeframeConverter
+
+VALIDATION_ACTIONS = ("flag", "drop", "repair")
+CHECKS = (
+    "missing_price",      # a NaN open, high, low or close
+    "nonpositive_price",  # a price <= 0
+    "high_below_low",
+    "outside_range",      # open or close outside low..high
+    "unordered",          # earlier than the bar before it
+    "duplicate",          # same time as another bar
+    "gap",                # more than GAP_BARS bars missing, weekends excepted
+)
+PRICE_COLUMNS = ["Open", "High", "Low", "Close"]
+NS_PER_DAY = 86_400_000_000_000
+
+
+@dataclass
+class ValidationReport:
+    """
+    Counts and first offending ranges of each check over everything validated so far.
+
+    Attributes:
+        rows (int): Bars validated.
+        counts (Dict[str, int]): Bars failing each check (gaps for "gap").
+        ranges (Dict[str, List[Tuple[int, int, int]]]): Up to MAX_RANGES (first ts, last ts, bars)
+            runs of consecutive offending bars per check; for "gap" the bars around the gap and
+            the number of bars missing between them.
+        repaired (int): Bars whose high/low were repaired.
+        dropped (int): Bars dropped.
+    """
+    rows: int = 0
+    counts: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(CHECKS, 0))
+    ranges: Dict[str, List[Tuple[int, int, int]]] = field(
+        default_factory=lambda: {check: [] for check in CHECKS}
+    )
+    repaired: int = 0
+    dropped: int = 0
+
+    @property
+    def issues(self) -> int:
+        return sum(self.counts.values())
+
+    def to_dict(self) -> dict:
+        """JSON-friendly report with readable times; checks without issues are left out."""
+        def stamp(ts: int) -> str:
+            return str(pd.Timestamp(ts))
+
+        return {
+            "rows": self.rows,
+            "counts": {check: count for check, count in self.counts.items() if count},
+            "ranges": {
+                check: [{"first": stamp(first), "last": stamp(last), "bars": bars} for first, last, bars in runs]
+                for check, runs in self.ranges.items() if runs
+            },
+            "repaired": self.repaired,
+            "dropped": self.dropped,
+        }
+
+    def summary(self) -> str:
+        """One line: issue counts per check, then repaired and dropped bars."""
+        if not self.issues:
+            return f"No data quality issues in {self.rows} bars"
+        found = ", ".join(f"{check} {count}" for check, count in self.counts.items() if count)
+        return f"{self.issues} data quality issues in {self.rows} bars ({found}); repaired {self.repaired}, dropped {self.dropped}"
+
+
+class BarValidator:
+    def __init__(
+        self,
+        timeframe: Optional[str] = None,
+        action: Optional[str] = None,
+        gap_bars: Optional[int] = None,
+        max_ranges: Optional[int] = None,
+    ):
+        """
+        Vectorized checks of prepared bars (see DataProcessor.prepare_frame), chunk by chunk.
+
+        Every check is a handful of NumPy operations over the chunk's columns. The
+        last time of the previous chunk is kept, so ordering, duplicates and gaps
+        are also checked across chunk boundaries. Duplicates are detected between
+        neighbouring bars in time order.
+
+        Parameters:
+            timeframe (Optional[str]): Bar timeframe, for the gap check (default from settings).
+            action (Optional[str]): "flag" only reports, "drop" also drops failing bars, "repair"
+                widens high/low to hold open and close and drops bars it cannot repair (missing or
+                non-positive prices, duplicates) (default from settings).
+            gap_bars (Optional[int]): Report gaps longer than this many bars (default from settings).
+            max_ranges (Optional[int]): Ranges kept per check in the report (default from settings).
+
+        Raises:
+            ValueError: If the action is unknown.
+        """
+        action = action or VALIDATION["ACTION"]
+        if action not in VALIDATION_ACTIONS:
+            raise ValueError(f"action must be one of {VALIDATION_ACTIONS}")
+        self.action = action
+        self.width = TimeframeConverter.timeframe_ns(timeframe or DATABASE["DEFAULT_TIMEFRAME"])
+        self.max_gap = self.width * (gap_bars or VALIDATION["GAP_BARS"])
+        self.max_ranges = VALIDATION["MAX_RANGES"] if max_ranges is None else max_ranges
+        self.report = ValidationReport()
+        self._last_ts: Optional[int] = None
+
+    def _record(self, check: str, mask: np.ndarray, ts: np.ndarray):
+        """Count the offending bars of a check and keep the first runs of consecutive ones."""
+        count = int(np.count_nonzero(mask))
+        if not count:
+            return
+        self.report.counts[check] += count
+        room = self.max_ranges - len(self.report.ranges[check])
+        if room <= 0:
+            return
+        index = np.flatnonzero(mask)
+        breaks = np.flatnonzero(np.diff(index) > 1)
+        starts = index[np.r_[0, breaks + 1]][:room]
+        ends = index[np.r_[breaks, len(index) - 1]][:room]
+        self.report.ranges[check].extend(
+            (int(ts[start]), int(ts[end]), int(end - start + 1)) for start, end in zip(starts, ends)
+        )
+
+    def _gaps(self, ts: np.ndarray, step: np.ndarray) -> np.ndarray:
+        """Bars preceded by a gap longer than max_gap that is not a weekend close."""
+        gap = step > self.max_gap
+        if not gap.any():
+            return gap
+        start = ts - step
+        # Monday is 0; 1970-01-01 was a Thursday
+        start_day = (start // NS_PER_DAY + 3) % 7
+        end_day = (ts // NS_PER_DAY + 3) % 7
+        # A weekend close runs from Friday or Saturday into Sunday or Monday
+        weekend = ((start_day == 4) | (start_day == 5)) & ((end_day == 6) | (end_day == 0)) & (step <= 4 * NS_PER_DAY)
+        return gap & ~weekend
+
+    def validate(self, frame: pd.DataFrame) -> pd.DataFrame:
+        """
+        Check a chunk of bars, add the findings to self.report and apply the action.
+
+        Parameters:
+            frame (pd.DataFrame): Bars with Open, High, Low, Close and ts columns.
+
+        Returns:
+            pd.DataFrame: The bars to store (the same frame when the action is "flag").
+        """
+        rows = len(frame)
+        self.report.rows += rows
+        if not rows:
+            return frame
+        ts = frame["ts"].to_numpy(dtype=np.int64)
+        open_, high, low, close = (frame[c].to_numpy(dtype=np.float64) for c in PRICE_COLUMNS)
+
+        missing = np.isnan(open_) | np.isnan(high) | np.isnan(low) | np.isnan(close)
+        nonpositive = (open_ <= 0) | (high <= 0) | (low <= 0) | (close <= 0)
+        high_below_low = high < low
+        top, bottom = np.maximum(high, low), np.minimum(high, low)
+        outside = (open_ > top) | (open_ < bottom) | (close > top) | (close < bottom)
+
+        # step[i] is the time since the bar before; the first bar continues the previous chunk
+        step = np.empty(rows, dtype=np.int64)
+        step[1:] = np.diff(ts)
+        step[0] = ts[0] - self._last_ts if self._last_ts is not None else 1
+        unordered = step < 0
+        if unordered.any():
+            order = np.argsort(ts, kind="stable")
+            in_order = ts[order]
+            duplicate_sorted = np.empty(rows, dtype=bool)
+            duplicate_sorted[1:] = in_order[1:] == in_order[:-1]
+            duplicate_sorted[0] = self._last_ts is not None and in_order[0] == self._last_ts
+            duplicate = np.empty(rows, dtype=bool)
+            duplicate[order] = duplicate_sorted
+        else:
+            duplicate = step == 0
+        gap = self._gaps(ts, step)
+        self._last_ts = int(ts.max()) if self._last_ts is None else max(self._last_ts, int(ts.max()))
+
+        for check, mask in (
+            ("missing_price", missing),
+            ("nonpositive_price", nonpositive),
+            ("high_below_low", high_below_low),
+            ("outside_range", outside),
+            ("unordered", unordered),
+            ("duplicate", duplicate),
+        ):
+            self._record(check, mask, ts)
+        if gap.any():
+            self.report.counts["gap"] += int(np.count_nonzero(gap))
+            room = self.max_ranges - len(self.report.ranges["gap"])
+            for i in np.flatnonzero(gap)[:max(room, 0)]:
+                self.report.ranges["gap"].append(
+                    (int(ts[i] - step[i]), int(ts[i]), int(step[i] // self.width) - 1)
+                )
+
+        if self.action == "flag":
+            return frame
+        if self.action == "drop":
+            bad = missing | nonpositive | high_below_low | outside | duplicate
+        else:
+            bad = missing | nonpositive | duplicate
+            fix = (high_below_low | outside) & ~bad
+            if fix.any():
+                frame = frame.copy()
+                frame["High"] = np.where(fix, np.maximum.reduce([open_, high, low, close]), high)
+                frame["Low"] = np.where(fix, np.minimum.reduce([open_, high, low, close]), low)
+                self.report.repaired += int(np.count_nonzero(fix))
+        dropped = int(np.count_nonzero(bad))
+        if dropped:
+            self.report.dropped += dropped
+            frame = frame[~bad]
+        return frame
@@ -0,0 +1,74 @@
+# database/async_db.py
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import numpy as np
+import pandas as pd
+from .db_manager import DatabaseManager
+from .models import TradingSignalBatch
+
+
+class AsyncDatabaseManager:
+    def __init__(self, db_manager: DatabaseManager, max_workers: Optional[int] = None):
+        """
+        asyncio front end for DatabaseManager.
+
+        Every call runs in a bounded thread pool, sized like the connection pool
+        by default, so coroutines awaiting the database never block the event
+        loop and never queue for more connections than exist. SQLite releases
+        the GIL while it works, so concurrent reads proceed in parallel.
+
+        Parameters:
+            db_manager (DatabaseManager): The synchronous manager doing the work.
+            max_workers (Optional[int]): Executor size (default is db_manager.pool_size).
+        """
+        self.db_manager = db_manager
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers or db_manager.pool_size, thread_name_prefix="vortex-db"
+        )
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking callable in the database executor and await its result."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(func, *args, **kwargs))
+
+    async def get_market_data(self, *args, **kwargs) -> pd.DataFrame:
+        """Awaitable DatabaseManager.get_market_data."""
+        return await self.run(self.db_manager.get_market_data, *args, **kwargs)
+
+    async def get_market_columns(self, *args, **kwargs) -> Dict[str, np.ndarray]:
+        """Awaitable DatabaseManager.get_market_columns."""
+        return await self.run(self.db_manager.get_market_columns, *args, **kwargs)
+
+    async def store_market_data(self, *args, **kwargs) -> Dict[str, int]:
+        """Awaitable DatabaseManager.store_market_data."""
+        return await self.run(self.db_manager.store_market_data, *args, **kwargs)
+
+    async def get_catalog(self) -> pd.DataFrame:
+        """Awaitable DatabaseManager.get_catalog."""
+        return await self.run(self.db_manager.get_catalog)
+
+    async def data_version(self, *args, **kwargs) -> int:
+        """Awaitable DatabaseManager.data_version."""
+        return await self.run(self.db_manager.data_version, *args, **kwargs)
+
+    async def get_signals(self, *args, **kwargs) -> Optional[TradingSignalBatch]:
+        """Awaitable DatabaseManager.get_signals."""
+        return await self.run(self.db_manager.get_signals, *args, **kwargs)
+
+    async def store_signals(self, *args, **kwargs) -> int:
+        """Awaitable DatabaseManager.store_signals."""
+        return await self.run(self.db_manager.store_signals, *args, **kwargs)
+
+    def close(self):
+        """Wait for running calls, then close the executor and the database manager."""
+        self.executor.shutdown(wait=True)
+        self.db_manager.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await asyncio.get_running_loop().run_in_executor(None, self.close)
@@ -0,0 +1,174 @@
+# database/columnar.py
+
+import json
+import os
+import re
+import shutil
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Sequence, Union
+import numpy as np
+
+# Column files written for every series; date_time is served as a view of ts
+MIRROR_COLUMNS = ["ts", "open", "high", "low", "close", "volume"]
+MIRROR_DTYPES = {
+    "ts": np.int64,
+    "open": np.float64,
+    "high": np.float64,
+    "low": np.float64,
+    "close": np.float64,
+    "volume": np.int64,
+}
+MANIFEST = "manifest.json"
+# Symbols and timeframes used as directory names as they are; anything else is hex-encoded
+SAFE_NAME = re.compile(r"[A-Za-z0-9._-]+")
+
+
+class ColumnarMirror:
+    def __init__(self, root: Union[str, Path]):
+        """
+        Read-only columnar copy of each series as one .npy file per column.
+
+        Layout: root/<symbol>/<timeframe>/manifest.json names the current
+        version directory, which holds ts.npy, open.npy, ... A new version is
+        written to a private temporary directory, renamed next to the old one
+        and published by atomically replacing the manifest, so readers in any
+        process never see a partly written mirror. Symbols and
+        timeframes that are not plain names ("..", "a/b", ...) are stored under
+        an encoded directory name, so no series can reach outside root.
+
+        Parameters:
+            root (Union[str, Path]): Directory holding the mirrored series.
+        """
+        self.root = Path(root)
+
+    @staticmethod
+    def _dir_name(name: str) -> str:
+        """Directory name of a symbol or timeframe: the name itself if plain, else "%" and its UTF-8 hex."""
+        if SAFE_NAME.fullmatch(name) and name not in (".", ".."):
+            return name
+        # "%" never appears in a plain name, so encoded names cannot collide with them
+        return "%" + name.encode("utf-8").hex()
+
+    def series_dir(self, symbol: str, timeframe: str) -> Path:
+        path = self.root / self._dir_name(symbol) / self._dir_name(timeframe)
+        self._check_inside(path)
+        return path
+
+    def _check_inside(self, path: Path):
+        """Raise ValueError unless path lies strictly below root; guards every rmtree."""
+        root = self.root.resolve()
+        resolved = path.resolve()
+        if resolved == root or root not in resolved.parents:
+            raise ValueError(f"{path} is outside the columnar mirror {self.root}")
+
+    def manifest(self, symbol: str, timeframe: str) -> Optional[dict]:
+        """Return the series' manifest (version, modified_at, rows, path), or None if not mirrored."""
+        try:
+            with (self.series_dir(symbol, timeframe) / MANIFEST).open() as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def write(
+        self,
+        symbol: str,
+        timeframe: str,
+        rows: int,
+        chunks: Iterable[Dict[str, np.ndarray]],
+        version: int,
+        modified_at: int,
+    ):
+        """
+        Write a new version of a series from chunks of typed arrays and publish it.
+
+        Parameters:
+            symbol (str): The instrument.
+            timeframe (str): The bar timeframe.
+            rows (int): Total number of bars in chunks.
+            chunks (Iterable[Dict[str, np.ndarray]]): Arrays with at least the MIRROR_COLUMNS, in time order.
+            version (int): Catalog version of the series.
+            modified_at (int): Catalog modification time of the series.
+        """
+        series_dir = self.series_dir(symbol, timeframe)
+        name = f"v{version}-{modified_at}"
+        target = series_dir / name
+        if not target.exists():
+            # Written under a name no other process uses, then renamed into place whole
+            tmp_dir = series_dir / f".{name}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+            tmp_dir.mkdir(parents=True)
+            try:
+                self._write_columns(tmp_dir, rows, chunks)
+                try:
+                    os.rename(tmp_dir, target)
+                except OSError:
+                    if not target.exists():
+                        raise
+                    # Another process published the same version first; keep its copy
+                    shutil.rmtree(tmp_dir, ignore_errors=True)
+            except BaseException:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+                raise
+
+        current = self.manifest(symbol, timeframe)
+        if current is not None and current["version"] > version:
+            # A newer version was published while this one was written
+            return
+        manifest = {"version": version, "modified_at": modified_at, "rows": rows, "path": name}
+        tmp_path = series_dir / f".{MANIFEST}.{os.getpid()}-{uuid.uuid4().hex}.tmp"
+        with tmp_path.open("w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, series_dir / MANIFEST)
+
+        for old in series_dir.iterdir():
+            # Dot names are other writers' unfinished versions
+            if old.is_dir() and old.name != name and not old.name.startswith(".") and not old.is_symlink():
+                # Readers holding memmaps of an old version keep working on POSIX; elsewhere retry next time
+                shutil.rmtree(old, ignore_errors=True)
+
+    @staticmethod
+    def _write_columns(directory: Path, rows: int, chunks: Iterable[Dict[str, np.ndarray]]):
+        """Fill one .npy file per mirrored column in directory from chunks totalling rows bars."""
+        files = {
+            column: np.lib.format.open_memmap(
+                directory / f"{column}.npy", mode="w+", dtype=MIRROR_DTYPES[column], shape=(rows,)
+            )
+            for column in MIRROR_COLUMNS
+        }
+        position = 0
+        for chunk in chunks:
+            size = len(chunk["ts"])
+            if position + size > rows:
+                raise ValueError("Series grew while it was being mirrored")
+            for column, out in files.items():
+                out[position:position + size] = chunk[column]
+            position += size
+        if position != rows:
+            raise ValueError("Series changed while it was being mirrored")
+        for out in files.values():
+            out.flush()
+
+    def open(
+        self, symbol: str, timeframe: str, manifest: dict, columns: Sequence[str]
+    ) -> Dict[str, np.ndarray]:
+        """Map the requested columns of a published version read-only, without copying them."""
+        version_dir = self.series_dir(symbol, timeframe) / manifest["path"]
+        arrays = {}
+        for column in columns:
+            source = "ts" if column == "date_time" else column
+            if manifest["rows"] == 0:
+                # np.load cannot memory-map an empty array
+                array = np.empty(0, dtype=MIRROR_DTYPES[source])
+            else:
+                array = np.load(version_dir / f"{source}.npy", mmap_mode="r")
+            arrays[column] = array.view("datetime64[ns]") if column == "date_time" else array
+        return arrays
+
+    def remove(self, symbol: Optional[str] = None, timeframe: Optional[str] = None):
+        """Delete the mirror of one series, or of everything when no symbol is given."""
+        if symbol is None:
+            shutil.rmtree(self.root, ignore_errors=True)
+            return
+        path = self.series_dir(symbol, timeframe)
+        self._check_inside(path)
+        shutil.rmtree(path, ignore_errors=True)
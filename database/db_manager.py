@@ -1,70 +1,907 @@
 # database/db_manager.py
 
+import itertools
+import json
+import queue
 import sqlite3
+import threading
+import time
+import numpy as np
 import pandas as pd
 from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
+from config.settings import DATABASE
+from utils.helpers import TimeframeConverter
+from .columnar import MIRROR_COLUMNS, MIRROR_DTYPES, ColumnarMirror
+from .models import TradingSignalBatch
+
+_memory_ids = itertools.count()
+
+MARKET_DATA_FIELDS = [
+    "symbol", "timeframe", "date", "time", "open", "high", "low", "close", "volume", "date_time", "ts"
+]
+PRICE_FIELDS = ["open", "high", "low", "close"]
+# Default columns of iter_market_data: no per-row strings
+CHUNK_FIELDS = ["date_time"] + PRICE_FIELDS + ["volume"]
+STORE_MODES = ("replace", "append", "upsert")
+
+# ts is the bar time as integer nanoseconds since the epoch. Rows are clustered
+# by (symbol, timeframe, ts), so one series is a contiguous range of the table.
+MARKET_DATA_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS market_data (
+        symbol TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        date TEXT NOT NULL,
+        time TEXT NOT NULL,
+        open REAL,
+        high REAL,
+        low REAL,
+        close REAL,
+        volume INTEGER,
+        date_time TEXT NOT NULL,
+        ts INTEGER NOT NULL,
+        PRIMARY KEY (symbol, timeframe, ts)
+    ) WITHOUT ROWID
+"""
+MARKET_CATALOG_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS market_catalog (
+        symbol TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        rows INTEGER NOT NULL,
+        first_ts INTEGER,
+        last_ts INTEGER,
+        modified_at INTEGER NOT NULL,
+        version INTEGER NOT NULL DEFAULT 0,
+        dirty_from INTEGER,
+        clean_version INTEGER,
+        PRIMARY KEY (symbol, timeframe)
+    )
+"""
+# dirty_from is the earliest ts changed since version clean_version was mirrored (see refresh_mirror)
+CATALOG_FIELDS = "symbol, timeframe, rows, first_ts, last_ts, modified_at, version"
+MIN_TS = -(2 ** 63)
+# Signals are kept for the latest data version each (symbol, timeframe, params) was computed on
+SIGNALS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS signals (
+        symbol TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        params TEXT NOT NULL,
+        data_version INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        bar_index INTEGER NOT NULL,
+        signal_type TEXT NOT NULL,
+        price REAL,
+        strength REAL,
+        PRIMARY KEY (symbol, timeframe, params, ts, signal_type)
+    ) WITHOUT ROWID
+"""
+SIGNAL_RUNS_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS signal_runs (
+        symbol TEXT NOT NULL,
+        timeframe TEXT NOT NULL,
+        params TEXT NOT NULL,
+        data_version INTEGER NOT NULL,
+        signals INTEGER NOT NULL,
+        created_at INTEGER NOT NULL,
+        PRIMARY KEY (symbol, timeframe, params)
+    )
+"""
+# Bars rolled up from ROLLUP_BASE bars at ingest. They live apart from ingested bars, so an
+# ingested series of a rollup timeframe is never overwritten; it is read instead of the rollup.
+ROLLUP_DATA_SCHEMA = MARKET_DATA_SCHEMA.replace("market_data", "market_rollups")
+ROLLUP_CATALOG_SCHEMA = MARKET_CATALOG_SCHEMA.replace("market_catalog", "rollup_catalog")
+MARKET_TABLES = ("market_data", "market_catalog")
+ROLLUP_TABLES = ("market_rollups", "rollup_catalog")
+# Highest version handed out before the catalogs were last dropped; never dropped itself
+VERSION_FLOOR_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS version_floor (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        version INTEGER NOT NULL
+    )
+"""
+# Versions are drawn from one counter over both catalogs, so a version never identifies two
+# datasets; the floor keeps it from restarting after drop_market_data (ETags embed versions)
+NEXT_VERSION = """
+    (SELECT coalesce(max(version), 0) + 1 FROM (
+        SELECT max(version) AS version FROM market_catalog
+        UNION ALL SELECT max(version) FROM rollup_catalog
+        UNION ALL SELECT version FROM version_floor
+    ))
+"""
+INSERT_MARKET_DATA = f"""
+    INSERT OR IGNORE INTO market_data ({", ".join(MARKET_DATA_FIELDS)})
+    VALUES ({", ".join("?" * len(MARKET_DATA_FIELDS))})
+"""
+REPLACE_MARKET_DATA = INSERT_MARKET_DATA.replace("OR IGNORE", "OR REPLACE")
+REPLACE_ROLLUP_DATA = REPLACE_MARKET_DATA.replace("market_data", "market_rollups")
+
+
+def to_epoch_ns(values) -> Union[int, np.ndarray]:
+    """
+    Convert a timestamp, or an array/Series of timestamps, to integer nanoseconds since the epoch.
+
+    Parameters:
+        values: A scalar accepted by pd.Timestamp, or timestamp strings/datetimes.
+
+    Returns:
+        Union[int, np.ndarray]: An int for a scalar, an int64 array otherwise.
+    """
+    if np.ndim(values) == 0:
+        return int(pd.Timestamp(values).value)
+    return pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
 
 class DatabaseManager:
-    def __init__(self, db_name="vortex.db"):
+    def __init__(
+        self,
+        db_name="vortex.db",
+        pool_size: int = DATABASE["POOL_SIZE"],
+        pragmas: Optional[Dict[str, Any]] = None,
+        mirror_dir: Optional[str] = None,
+    ):
+        """
+        Initialize the DatabaseManager with a bounded pool of persistent connections.
+
+        Connections stay open for the manager's lifetime (until close()) and are
+        configured with the pragmas from settings (WAL, mmap, page cache, ...),
+        so concurrent readers do not wait for a writer.
+
+        Parameters:
+            db_name (str): Path of the SQLite database, or ":memory:" (default is "vortex.db").
+            pool_size (int): Maximum number of open connections (default from settings).
+            pragmas (Optional[Dict[str, Any]]): PRAGMA values applied to every connection (default from settings).
+            mirror_dir (Optional[str]): Directory of the columnar mirror (see ColumnarMirror). Defaults to
+                "<db_name>.columns" when COLUMNAR_MIRROR is enabled in settings; in-memory databases
+                are only mirrored when a directory is given.
+        """
+        if pool_size <= 0:
+            raise ValueError("pool_size must be a positive number")
         self.db_name = db_name
+        self.pool_size = pool_size
+        self.pragmas = dict(DATABASE["PRAGMAS"] if pragmas is None else pragmas)
+        if db_name == ":memory:":
+            # A named shared-cache database, so every pooled connection sees the same data
+            self._database = f"file:vortex_memory_{next(_memory_ids)}?mode=memory&cache=shared"
+            self._uri = True
+        else:
+            self._database = db_name
+            self._uri = False
+        self._idle = queue.LifoQueue()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._closed = False
+        self._stats = {"created": 0, "checkouts": 0, "waits": 0, "errors": 0}
+        if mirror_dir is None and DATABASE["COLUMNAR_MIRROR"] and db_name != ":memory:":
+            mirror_dir = f"{db_name}.columns"
+        self.mirror = ColumnarMirror(mirror_dir) if mirror_dir is not None else None
+        self._mirror_lock = threading.Lock()
         self._create_tables()
 
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self._database,
+            uri=self._uri,
+            timeout=self.pragmas.get("busy_timeout", 5000) / 1000,
+            check_same_thread=False,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value}")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        if self._closed:
+            raise sqlite3.ProgrammingError("DatabaseManager is closed")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._stats["created"] < self.pool_size:
+                self._stats["created"] += 1
+                create = True
+            else:
+                self._stats["waits"] += 1
+                create = False
+        if create:
+            try:
+                return self._connect()
+            except sqlite3.Error:
+                with self._lock:
+                    self._stats["created"] -= 1
+                raise
+        try:
+            return self._idle.get(timeout=DATABASE["POOL_TIMEOUT"])
+        except queue.Empty:
+            raise sqlite3.OperationalError("Timed out waiting for a pooled connection")
+
+    def _release(self, conn: sqlite3.Connection):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
     @contextmanager
-    def get_connection(self):
-        """Context manager for database connection."""
-        conn = None
+    def get_connection(self, raise_errors: bool = False):
+        """
+        Context manager for a pooled database connection.
+
+        Nested calls in the same thread reuse the connection already checked out.
+        Database errors are printed, unless raise_errors is set or the thread is
+        inside transaction(); writers raise them so callers never take a failed
+        write for a stored one.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.depth += 1
+        else:
+            conn = self._acquire()
+            self._local.conn = conn
+            self._local.depth = 1
+            with self._lock:
+                self._stats["checkouts"] += 1
         try:
-            conn = sqlite3.connect(self.db_name)
             yield conn
         except sqlite3.Error as e:
+            with self._lock:
+                self._stats["errors"] += 1
+            if raise_errors or self._in_transaction():
+                # The caller must see the failure to know nothing was stored
+                raise
             print(f"Database error: {e}")
         finally:
-            if conn:
-                conn.close()
+            self._local.depth -= 1
+            if self._local.depth == 0:
+                self._local.conn = None
+                self._release(conn)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Run several writes of this thread in one transaction.
+
+        store_market_data and delete_market_data called inside the block do not
+        commit on their own: everything is committed when the block ends, or rolled
+        back if it raises. Database errors inside the block are raised, not printed.
+        Nested blocks join the outer transaction.
+        """
+        if self._in_transaction():
+            with self.get_connection() as conn:
+                yield conn
+            return
+        self._local.transaction = True
+        try:
+            with self.get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except BaseException:
+                    conn.rollback()
+                    raise
+                conn.commit()
+        finally:
+            self._local.transaction = False
+
+    def _in_transaction(self) -> bool:
+        return getattr(self._local, "transaction", False)
+
+    def _begin(self, cursor: sqlite3.Cursor):
+        """
+        Start a write transaction unless the thread is inside transaction().
+
+        IMMEDIATE takes the write lock up front: a deferred transaction that reads
+        first gets SQLITE_BUSY, without waiting, when it upgrades to write after
+        another connection committed.
+        """
+        if not self._in_transaction():
+            cursor.execute("BEGIN IMMEDIATE")
+
+    def _commit(self, conn: sqlite3.Connection):
+        """Commit unless the thread is inside transaction(), which commits at its end."""
+        if not self._in_transaction():
+            conn.commit()
+
+    def pool_stats(self) -> Dict[str, int]:
+        """Return connection pool statistics."""
+        with self._lock:
+            stats = dict(self._stats)
+        stats["size"] = self.pool_size
+        stats["idle"] = self._idle.qsize()
+        stats["in_use"] = stats["created"] - stats["idle"]
+        return stats
+
+    def close(self):
+        """Close all pooled connections; connections in use are closed when they are released."""
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
     def _create_tables(self):
-        """Create necessary tables in the database."""
+        """Create necessary tables in the database (once, and again in drop_market_data)."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS market_data (
-                    date TEXT NOT NULL,
-                    time TEXT NOT NULL,
-                    open REAL,
-                    high REAL,
-                    low REAL,
-                    close REAL,
-                    volume INTEGER,
-                    date_time TEXT PRIMARY KEY
-                )
-                """
-            )
+            self._migrate_market_data(cursor)
+            cursor.execute(MARKET_DATA_SCHEMA)
+            cursor.execute(MARKET_CATALOG_SCHEMA)
+            cursor.execute(SIGNALS_SCHEMA)
+            cursor.execute(SIGNAL_RUNS_SCHEMA)
+            cursor.execute(ROLLUP_DATA_SCHEMA)
+            cursor.execute(ROLLUP_CATALOG_SCHEMA)
+            cursor.execute(VERSION_FLOOR_SCHEMA)
+            for catalog in ("market_catalog", "rollup_catalog"):
+                catalog_columns = [row[1] for row in cursor.execute(f"PRAGMA table_info({catalog})")]
+                for column, definition in (
+                    ("version", "INTEGER NOT NULL DEFAULT 0"),
+                    ("dirty_from", "INTEGER"),
+                    ("clean_version", "INTEGER"),
+                ):
+                    if column not in catalog_columns:
+                        cursor.execute(f"ALTER TABLE {catalog} ADD COLUMN {column} {definition}")
             conn.commit()
 
+    def _migrate_market_data(self, cursor: sqlite3.Cursor):
+        """
+        Rebuild a single-series market_data table into the multi-symbol schema.
+
+        Covers tables written by pandas' to_sql (no date/time columns, no key) and
+        earlier keyed schemas; their bars are stored under the default symbol and timeframe.
+        """
+        columns = [row[1] for row in cursor.execute("PRAGMA table_info(market_data)")]
+        if not columns or "symbol" in columns:
+            return
+        legacy = pd.read_sql_query("SELECT * FROM market_data", cursor.connection)
+        legacy = legacy.dropna(subset=["date_time"])
+        if "date" not in legacy.columns or "time" not in legacy.columns:
+            parts = legacy["date_time"].astype(str).str.split(" ", n=1, expand=True)
+            legacy["date"] = parts[0]
+            legacy["time"] = parts[1] if 1 in parts.columns else ""
+        symbol, timeframe = DATABASE["DEFAULT_SYMBOL"], DATABASE["DEFAULT_TIMEFRAME"]
+        values = self._market_data_rows(legacy, symbol, timeframe)
+
+        cursor.execute("BEGIN IMMEDIATE")
+        cursor.execute("DROP TABLE market_data")
+        cursor.execute("DROP INDEX IF EXISTS idx_market_data_ts")
+        cursor.execute(MARKET_DATA_SCHEMA)
+        cursor.execute(MARKET_CATALOG_SCHEMA)
+        # The version counter spans both catalogs
+        cursor.execute(ROLLUP_DATA_SCHEMA)
+        cursor.execute(ROLLUP_CATALOG_SCHEMA)
+        cursor.execute(VERSION_FLOOR_SCHEMA)
+        cursor.executemany(INSERT_MARKET_DATA, values)
+        self._update_catalog(
+            cursor, symbol, timeframe, values, cursor.rowcount, cursor.rowcount, replace=True,
+            changed_from=MIN_TS,
+        )
+        if timeframe == DATABASE["ROLLUP_BASE"]:
+            self._update_rollups(cursor, symbol, None)
+        cursor.connection.commit()
+
     def drop_market_data(self):
-        """Drop the market_data table if it exists."""
+        """
+        Drop the market data, rollup, catalog and signal tables and the columnar mirror,
+        then create the tables again, empty, so reads and stores keep working.
+
+        Versions keep counting up from the last one handed out, so ETags and cached
+        responses of the dropped data never match data stored afterwards.
+        """
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            self._begin(cursor)
+            cursor.execute(
+                f"""
+                INSERT INTO version_floor (id, version) VALUES (1, {NEXT_VERSION} - 1)
+                ON CONFLICT (id) DO UPDATE SET version = max(version, excluded.version)
+                """
+            )
             cursor.execute("DROP TABLE IF EXISTS market_data")
-            conn.commit()
+            cursor.execute("DROP TABLE IF EXISTS market_catalog")
+            cursor.execute("DROP TABLE IF EXISTS market_rollups")
+            cursor.execute("DROP TABLE IF EXISTS rollup_catalog")
+            cursor.execute("DROP TABLE IF EXISTS signals")
+            cursor.execute("DROP TABLE IF EXISTS signal_runs")
+            self._commit(conn)
+        if self.mirror is not None:
+            self.mirror.remove()
+        self._create_tables()
 
-    def store_market_data(self, df: pd.DataFrame):
-        """Store market data in the database."""
-        print("Storing data in database:", df)  # Debugging statement
-        with self.get_connection() as conn:
-            print("Data before storing:", df)  # Debugging statement
-            df = df.copy()
-            df.columns = df.columns.str.lower()
+    @staticmethod
+    def _market_data_rows(df: pd.DataFrame, symbol: str, timeframe: str) -> List[tuple]:
+        """Normalize an uploaded frame to market_data rows, in table column order."""
+        df = df.copy()
+        df.columns = df.columns.str.lower()
+        df['symbol'] = symbol
+        df['timeframe'] = timeframe
+        df['date'] = df['date'].astype(str)
+        df['time'] = df['time'].astype(str)
+        if 'date_time' not in df.columns:
             # Combine date and time columns to create date_time
             df['date_time'] = df['date'] + ' ' + df['time']
-            df.drop(columns=['date', 'time'], inplace=True)
-            df.to_sql("market_data", conn, if_exists="replace", index=False)
-            conn.commit()
-        print("Data stored successfully.")  # Debugging statement
+        df['date_time'] = df['date_time'].astype(str)
+        if 'ts' not in df.columns:
+            df['ts'] = to_epoch_ns(df['date_time'])
+        columns = []
+        for column in MARKET_DATA_FIELDS:
+            if column not in df.columns:
+                columns.append([None] * len(df))
+                continue
+            # tolist() yields Python scalars, which sqlite3 can bind; NaN is stored as NULL
+            values = df[column].tolist()
+            if df[column].hasnans:
+                values = [None if pd.isna(v) else v for v in values]
+            columns.append(values)
+        return list(zip(*columns))
+
+    @staticmethod
+    def _update_catalog(
+        cursor: sqlite3.Cursor,
+        symbol: str,
+        timeframe: str,
+        values: List[tuple],
+        inserted: int,
+        changed: int,
+        replace: bool,
+        changed_from: int,
+        catalog: str = "market_catalog",
+    ):
+        """
+        Keep a series' catalog entry current from the rows just written, without rescanning it.
+
+        Every submitted timestamp is stored afterwards (inserted or already present),
+        so the first/last timestamps can be widened from the submitted rows. The
+        series gets a new version whenever its bars change, and changed_from (no bar
+        before it changed) lowers dirty_from.
+        """
+        if not replace and not changed:
+            return
+        ts = [row[-1] for row in values]
+        first_ts, last_ts = (min(ts), max(ts)) if ts else (None, None)
+        cursor.execute(
+            f"""
+            INSERT INTO {catalog} (symbol, timeframe, rows, first_ts, last_ts, modified_at, version, dirty_from)
+            VALUES (?1, ?2, ?3, ?4, ?5, ?6, {NEXT_VERSION}, ?8)
+            ON CONFLICT (symbol, timeframe) DO UPDATE SET
+                rows = CASE WHEN ?7 THEN excluded.rows ELSE rows + excluded.rows END,
+                first_ts = CASE WHEN ?7 THEN excluded.first_ts
+                                ELSE min(coalesce(first_ts, excluded.first_ts), excluded.first_ts) END,
+                last_ts = CASE WHEN ?7 THEN excluded.last_ts
+                               ELSE max(coalesce(last_ts, excluded.last_ts), excluded.last_ts) END,
+                modified_at = excluded.modified_at,
+                version = excluded.version,
+                dirty_from = min(coalesce(dirty_from, excluded.dirty_from), excluded.dirty_from)
+            """,
+            (symbol, timeframe, inserted, first_ts, last_ts, time.time_ns(), replace, changed_from),
+        )
+
+    def store_market_data(
+        self,
+        df: pd.DataFrame,
+        mode: str = "replace",
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        refresh_mirror: bool = False,
+    ) -> Dict[str, int]:
+        """
+        Store the bars of one series (symbol and timeframe) in a single transaction
+        (or as part of the one opened with transaction()).
+
+        Bars are keyed by (symbol, timeframe, ts), where ts is the epoch timestamp
+        derived from the Date and Time columns. Other series are never touched,
+        and the series' catalog entry is updated in the same transaction. Bars of
+        the ROLLUP_BASE timeframe also update the rolled-up timeframes (see _update_rollups),
+        which are kept apart from ingested series of the same timeframes.
+
+        Parameters:
+            df (pd.DataFrame): Bars with Date, Time, Open, High, Low, Close and optional Volume columns.
+            mode (str): "replace" deletes the series' existing bars first, "append" inserts only bars
+                whose timestamp is new, "upsert" also updates existing bars whose values differ
+                (default is "replace").
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe, e.g. "M1" (default from settings).
+            refresh_mirror (bool): Bring the columnar mirror of the changed series up to date now
+                instead of on its next read (default is False).
+
+        Returns:
+            Dict[str, int]: Counts of inserted, updated and skipped rows.
+        Raises:
+            ValueError: If the mode is unknown.
+            sqlite3.Error: If the write fails (nothing is stored then).
+        """
+        if mode not in STORE_MODES:
+            raise ValueError(f"mode must be one of {STORE_MODES}")
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        values = self._market_data_rows(df, symbol, timeframe)
+        counts = {"inserted": 0, "updated": 0, "skipped": 0}
+        changed, rolled_up = 0, []
+
+        with self.get_connection(raise_errors=True) as conn:
+            cursor = conn.cursor()
+            self._begin(cursor)
+            if mode == "replace":
+                cursor.execute(
+                    "DELETE FROM market_data WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+                )
+                previous_last_ts = None
+            else:
+                previous_last_ts = cursor.execute(
+                    "SELECT last_ts FROM market_catalog WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+                ).fetchone()
+                previous_last_ts = previous_last_ts[0] if previous_last_ts else None
+            before = conn.total_changes
+            cursor.executemany(INSERT_MARKET_DATA, values)
+            counts["inserted"] = conn.total_changes - before
+            if mode == "upsert" and counts["inserted"] < len(values):
+                before = conn.total_changes
+                cursor.executemany(
+                    """
+                    UPDATE market_data
+                    SET date = ?4, time = ?5, open = ?6, high = ?7, low = ?8, close = ?9,
+                        volume = ?10, date_time = ?11
+                    WHERE symbol = ?1 AND timeframe = ?2 AND ts = ?3
+                      AND (open IS NOT ?6 OR high IS NOT ?7 OR low IS NOT ?8
+                           OR close IS NOT ?9 OR volume IS NOT ?10)
+                    """,
+                    [v[:2] + v[-1:] + v[2:-1] for v in values],
+                )
+                counts["updated"] = conn.total_changes - before
+            changed = counts["inserted"] + counts["updated"]
+            self._update_catalog(
+                cursor, symbol, timeframe, values, counts["inserted"], changed, replace=mode == "replace",
+                changed_from=self._changed_from(values, previous_last_ts, counts),
+            )
+            if timeframe == DATABASE["ROLLUP_BASE"] and (changed or mode == "replace"):
+                span = None if mode == "replace" else (min(v[-1] for v in values), max(v[-1] for v in values))
+                rolled_up = self._update_rollups(cursor, symbol, span)
+            self._commit(conn)
+            counts["skipped"] = len(values) - changed
+        if refresh_mirror and self.mirror is not None and (changed or mode == "replace"):
+            for series_timeframe in [timeframe] + rolled_up:
+                self.refresh_mirror(symbol, series_timeframe)
+        return counts
+
+    @staticmethod
+    def _changed_from(values: List[tuple], previous_last_ts: Optional[int], counts: Dict[str, int]) -> int:
+        """Earliest ts a store may have changed: after the old last bar when it only added newer bars."""
+        if previous_last_ts is None or not values:
+            return MIN_TS
+        newer = {row[-1] for row in values if row[-1] > previous_last_ts}
+        if not counts["updated"] and counts["inserted"] == len(newer):
+            return previous_last_ts + 1
+        return min(row[-1] for row in values)
+
+    @staticmethod
+    def _bar_rows(symbol: str, timeframe: str, bars: Dict[str, np.ndarray]) -> List[tuple]:
+        """Build market_data rows from typed ts/open/high/low/close/volume arrays."""
+        stamps = np.datetime_as_string(bars["ts"].view("datetime64[ns]"), unit="s").tolist()
+        dates = [stamp[:10] for stamp in stamps]
+        times = [stamp[11:] for stamp in stamps]
+        return list(zip(
+            itertools.repeat(symbol), itertools.repeat(timeframe), dates, times,
+            bars["open"].tolist(), bars["high"].tolist(), bars["low"].tolist(),
+            bars["close"].tolist(), bars["volume"].tolist(),
+            [f"{date} {time_}" for date, time_ in zip(dates, times)], bars["ts"].tolist(),
+        ))
+
+    def _update_rollups(
+        self, cursor: sqlite3.Cursor, symbol: str, span: Optional[Tuple[int, int]]
+    ) -> List[str]:
+        """
+        Rebuild the rolled-up buckets touched by changed base bars.
+
+        Only buckets overlapping span (first and last changed ts) are recomputed,
+        from the base bars already in the table; a span of None rebuilds every bucket.
+        Buckets are written to market_rollups and rollup_catalog only.
+
+        Returns:
+            List[str]: The rolled-up timeframes that were written.
+        """
+        timeframes = list(DATABASE["ROLLUP_TIMEFRAMES"])
+        if not timeframes:
+            return []
+        placeholders = ", ".join("?" * len(timeframes))
+        replace = span is None
+        if replace:
+            cursor.execute(
+                f"DELETE FROM market_rollups WHERE symbol = ? AND timeframe IN ({placeholders})",
+                [symbol] + timeframes,
+            )
+        ranges = {}
+        if not replace:
+            first_ts, last_ts = span
+            for timeframe in timeframes:
+                width = TimeframeConverter.timeframe_ns(timeframe)
+                ranges[timeframe] = (first_ts - first_ts % width, last_ts - last_ts % width + width)
+        low = min((r[0] for r in ranges.values()), default=-(2 ** 63))
+        high = max((r[1] for r in ranges.values()), default=2 ** 63 - 1)
+
+        base = cursor.execute(
+            """
+            SELECT ts, open, high, low, close, volume FROM market_data
+            WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts < ? ORDER BY ts
+            """,
+            (symbol, DATABASE["ROLLUP_BASE"], low, high),
+        ).fetchall()
+        if base:
+            base = self._typed_columns(base, MIRROR_COLUMNS)
+        else:
+            base = {c: np.empty(0, dtype=MIRROR_DTYPES[c]) for c in MIRROR_COLUMNS}
+
+        for timeframe in timeframes:
+            start, stop = ranges.get(timeframe, (low, high))
+            i, j = np.searchsorted(base["ts"], [start, stop])
+            bars = TimeframeConverter.aggregate_ohlcv(
+                *(base[c][i:j] for c in MIRROR_COLUMNS), timeframe=timeframe
+            )
+            existing = 0
+            if not replace:
+                existing = cursor.execute(
+                    "DELETE FROM market_rollups WHERE symbol = ? AND timeframe = ? AND ts >= ? AND ts < ?",
+                    (symbol, timeframe, start, stop),
+                ).rowcount
+            rows = self._bar_rows(symbol, timeframe, bars)
+            cursor.executemany(REPLACE_ROLLUP_DATA, rows)
+            self._update_catalog(
+                cursor, symbol, timeframe, rows, len(rows) - existing, len(rows),
+                replace=replace, changed_from=MIN_TS if replace else start, catalog="rollup_catalog",
+            )
+        return timeframes
+
+    @staticmethod
+    def _recount_catalog(
+        cursor: sqlite3.Cursor,
+        symbol: str,
+        timeframe: str,
+        changed_from: int,
+        tables: Tuple[str, str] = MARKET_TABLES,
+    ):
+        """Set a series' catalog entry from its bars after rows were deleted, and give it a new version."""
+        table, catalog = tables
+        rows, first_ts, last_ts = cursor.execute(
+            f"SELECT COUNT(*), MIN(ts), MAX(ts) FROM {table} WHERE symbol = ? AND timeframe = ?",
+            (symbol, timeframe),
+        ).fetchone()
+        cursor.execute(
+            f"""
+            UPDATE {catalog}
+            SET rows = ?, first_ts = ?, last_ts = ?, modified_at = ?, version = {NEXT_VERSION},
+                dirty_from = min(coalesce(dirty_from, ?), ?)
+            WHERE symbol = ? AND timeframe = ?
+            """,
+            (rows, first_ts, last_ts, time.time_ns(), changed_from, changed_from, symbol, timeframe),
+        )
+
+    def delete_market_data(
+        self,
+        start=None,
+        end=None,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        refresh_mirror: bool = False,
+    ) -> int:
+        """
+        Delete the ingested bars of one series between two times, inclusive, in a single transaction
+        (or as part of the one opened with transaction()).
+
+        Rolled-up buckets overlapping the range are rebuilt from the remaining base bars.
+
+        Parameters:
+            start: First bar time to delete (datetime-like or epoch ns; default is the first bar).
+            end: Last bar time to delete (datetime-like or epoch ns; default is the last bar).
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+            refresh_mirror (bool): Bring the columnar mirror of the changed series up to date now
+                instead of on its next read (default is False).
+
+        Returns:
+            int: The number of bars deleted.
+        Raises:
+            sqlite3.Error: If the delete fails (nothing is deleted then).
+        """
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        first_ts, last_ts = self._ts_bounds(symbol, timeframe)
+        if first_ts is None:
+            return 0
+        start = first_ts if start is None else max(to_epoch_ns(start), first_ts)
+        end = last_ts if end is None else min(to_epoch_ns(end), last_ts)
+        if start > end:
+            return 0
+
+        deleted, rolled_up = 0, []
+        with self.get_connection(raise_errors=True) as conn:
+            cursor = conn.cursor()
+            self._begin(cursor)
+            deleted = cursor.execute(
+                "DELETE FROM market_data WHERE symbol = ? AND timeframe = ? AND ts BETWEEN ? AND ?",
+                (symbol, timeframe, start, end),
+            ).rowcount
+            if deleted:
+                self._recount_catalog(cursor, symbol, timeframe, start)
+                if timeframe == DATABASE["ROLLUP_BASE"]:
+                    rolled_up = self._update_rollups(cursor, symbol, (start, end))
+                    for rollup_timeframe in rolled_up:
+                        # Buckets left without base bars are gone, which may narrow the series
+                        self._recount_catalog(cursor, symbol, rollup_timeframe, start, ROLLUP_TABLES)
+            self._commit(conn)
+        if refresh_mirror and self.mirror is not None and deleted:
+            for series_timeframe in [timeframe] + rolled_up:
+                self.refresh_mirror(symbol, series_timeframe)
+        return deleted
+
+    def _ts_bounds(self, symbol: str, timeframe: str) -> Tuple[Optional[int], Optional[int]]:
+        """Return the first and last ts of an ingested series from the catalog."""
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT first_ts, last_ts FROM market_catalog WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe),
+            ).fetchone()
+        return tuple(row) if row else (None, None)
+
+    def find_overlap(
+        self, ts: np.ndarray, symbol: Optional[str] = None, timeframe: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Count the given timestamps that are already stored in a series.
+
+        The catalog answers disjoint ranges without touching market_data; otherwise
+        only the stored keys inside the incoming range are read, through the primary key.
+
+        Parameters:
+            ts (np.ndarray): Incoming bar times as int64 epoch nanoseconds, in any order.
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+
+        Returns:
+            Dict[str, Any]: rows (number of incoming timestamps already stored), first_ts and
+            last_ts (range of those timestamps, None if there are none).
+        """
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        overlap = {"rows": 0, "first_ts": None, "last_ts": None}
+        incoming = np.unique(np.asarray(ts, dtype=np.int64))
+        if not len(incoming):
+            return overlap
+        first_ts, last_ts = self._ts_bounds(symbol, timeframe)
+        if first_ts is None or incoming[-1] < first_ts or incoming[0] > last_ts:
+            return overlap
+
+        for chunk in self.iter_market_data(
+            symbol, timeframe, start=int(incoming[0]), end=int(incoming[-1]), columns=["ts"], as_arrays=True
+        ):
+            stored = chunk["ts"]
+            found = stored[np.isin(stored, incoming, assume_unique=True)]
+            if not len(found):
+                continue
+            overlap["rows"] += len(found)
+            if overlap["first_ts"] is None:
+                overlap["first_ts"] = int(found[0])
+            overlap["last_ts"] = int(found[-1])
+        return overlap
+
+    def get_catalog(self) -> pd.DataFrame:
+        """
+        Return one row per readable series: symbol, timeframe, rows, first/last bar time, last
+        modification time, version and rollup (1 for series served from rolled-up buckets).
+        """
+        with self.get_connection() as conn:
+            df = pd.read_sql_query(
+                f"""
+                SELECT {CATALOG_FIELDS}, 0 AS rollup FROM market_catalog m
+                WHERE m.rows > 0 OR NOT EXISTS (
+                    SELECT 1 FROM rollup_catalog r WHERE r.symbol = m.symbol AND r.timeframe = m.timeframe
+                )
+                UNION ALL
+                SELECT {CATALOG_FIELDS}, 1 AS rollup FROM rollup_catalog r
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM market_catalog m
+                    WHERE m.symbol = r.symbol AND m.timeframe = r.timeframe AND m.rows > 0
+                )
+                ORDER BY symbol, timeframe
+                """,
+                conn,
+            )
+            for column in ("first_ts", "last_ts", "modified_at"):
+                df[column] = pd.to_datetime(df[column], unit="ns")
+            return df.rename(columns={"first_ts": "first_date_time", "last_ts": "last_date_time"})
+        return pd.DataFrame()
+
+    @staticmethod
+    def _select_columns(columns: Optional[Sequence[str]]) -> List[str]:
+        # symbol and timeframe are constant within a series, so they are only returned on request
+        columns = list(columns) if columns is not None else MARKET_DATA_FIELDS[2:]
+        unknown = [c for c in columns if c not in MARKET_DATA_FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown market data columns: {unknown}")
+        return columns
+
+    def _series_tables(self, symbol: Optional[str], timeframe: Optional[str]) -> Tuple[str, str]:
+        """
+        Return the (bars, catalog) tables a series is read from.
+
+        Ingested bars win; rolled-up buckets serve rollup timeframes that hold no ingested bars.
+        """
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        if timeframe not in DATABASE["ROLLUP_TIMEFRAMES"]:
+            return MARKET_TABLES
+        rolled_up = None
+        with self.get_connection() as conn:
+            ingested = conn.execute(
+                "SELECT 1 FROM market_catalog WHERE symbol = ? AND timeframe = ? AND rows > 0",
+                (symbol, timeframe),
+            ).fetchone()
+            if ingested is not None:
+                return MARKET_TABLES
+            rolled_up = conn.execute(
+                "SELECT 1 FROM rollup_catalog WHERE symbol = ? AND timeframe = ?", (symbol, timeframe)
+            ).fetchone()
+        return ROLLUP_TABLES if rolled_up is not None else MARKET_TABLES
+
+    @staticmethod
+    def _series_conditions(symbol: Optional[str], timeframe: Optional[str], start, end):
+        conditions = ["symbol = ?", "timeframe = ?"]
+        params = [symbol or DATABASE["DEFAULT_SYMBOL"], timeframe or DATABASE["DEFAULT_TIMEFRAME"]]
+        if start is not None:
+            conditions.append("ts >= ?")
+            params.append(to_epoch_ns(start))
+        if end is not None:
+            conditions.append("ts <= ?")
+            params.append(to_epoch_ns(end))
+        return conditions, params
+
+    def get_market_data(
+        self,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        start=None,
+        end=None,
+        last_n: Optional[int] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> pd.DataFrame:
+        """
+        Retrieve the bars of one series from the database, ordered by time.
+
+        Range and tail queries are answered from the (symbol, timeframe, ts) key,
+        and date_time is rebuilt from ts without parsing strings. Rollup timeframes
+        without ingested bars are read from the rolled-up buckets.
+
+        Parameters:
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+            start: First bar time to include (anything pd.Timestamp accepts; default is no limit).
+            end: Last bar time to include (default is no limit).
+            last_n (Optional[int]): Only return the last n bars of the range (default is all).
+            columns (Optional[Sequence[str]]): Columns to return (default is all but symbol and timeframe).
+
+        Returns:
+            pd.DataFrame: The selected bars, oldest first.
+        Raises:
+            ValueError: If a column is unknown or last_n is negative.
+        """
+        columns = self._select_columns(columns)
+        if last_n is not None and last_n < 0:
+            raise ValueError("last_n must not be negative")
+
+        selected = ", ".join("ts AS date_time" if c == "date_time" else c for c in columns)
+        conditions, params = self._series_conditions(symbol, timeframe, start, end)
+        table = self._series_tables(symbol, timeframe)[0]
+        query = f"SELECT {selected} FROM {table} WHERE " + " AND ".join(conditions)
+        if last_n is not None:
+            query += " ORDER BY ts DESC LIMIT ?"
+            params.append(last_n)
+        else:
+            query += " ORDER BY ts"
 
-    def get_market_data(self) -> pd.DataFrame:
-        """Retrieve market data from the database."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(
@@ -73,7 +910,337 @@ class DatabaseManager:
             if not cursor.fetchone():
                 return pd.DataFrame()
 
-            df = pd.read_sql_query("SELECT * FROM market_data ORDER BY date_time", conn)
-            if not df.empty:
-                df["date_time"] = pd.to_datetime(df["date_time"])
-            return df
\ No newline at end of file
+            df = pd.read_sql_query(query, conn, params=params)
+            if last_n is not None:
+                df = df.iloc[::-1].reset_index(drop=True)
+            if "date_time" in df.columns:
+                df["date_time"] = pd.to_datetime(df["date_time"], unit="ns")
+            return df
+
+    @staticmethod
+    def _typed_columns(rows: List[tuple], columns: List[str]) -> Dict[str, np.ndarray]:
+        """
+        Turn fetched rows into one typed array per column.
+
+        Each row holds ts followed by the stored columns, i.e. columns without date_time and ts.
+        """
+        fields = iter(zip(*rows))
+        ts = np.fromiter(next(fields), dtype=np.int64, count=len(rows))
+        arrays = {}
+        for column in columns:
+            if column == "date_time":
+                arrays[column] = ts.view("datetime64[ns]")
+            elif column == "ts":
+                arrays[column] = ts
+            elif column in PRICE_FIELDS:
+                # NULL becomes NaN
+                arrays[column] = np.array(next(fields), dtype=np.float64)
+            elif column == "volume":
+                volume = np.array(next(fields), dtype=np.float64)
+                arrays[column] = np.nan_to_num(volume, nan=0.0).astype(np.int64)
+            else:
+                arrays[column] = np.array(next(fields), dtype=object)
+        return arrays
+
+    def iter_market_data(
+        self,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        start=None,
+        end=None,
+        columns: Optional[Sequence[str]] = None,
+        chunk_size: int = DATABASE["CHUNK_SIZE"],
+        as_arrays: bool = False,
+    ) -> Iterator[Union[pd.DataFrame, Dict[str, np.ndarray]]]:
+        """
+        Yield the bars of one series in time order, at most chunk_size bars at a time.
+
+        Each chunk is a separate keyset query (ts greater than the last ts seen), so
+        memory stays bounded by the chunk size and no read transaction is held open
+        between chunks. Columns are typed: prices as float64, volume as int64 (NULL
+        as 0), date_time as datetime64[ns] and ts as int64.
+
+        Parameters:
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+            start: First bar time to include (default is no limit).
+            end: Last bar time to include (default is no limit).
+            columns (Optional[Sequence[str]]): Columns to return (default is date_time,
+                open, high, low, close and volume).
+            chunk_size (int): Maximum number of bars per chunk (default from settings).
+            as_arrays (bool): Yield dicts of NumPy arrays instead of DataFrames (default is False).
+
+        Yields:
+            Union[pd.DataFrame, Dict[str, np.ndarray]]: Consecutive chunks of bars.
+        Raises:
+            ValueError: If a column is unknown or chunk_size is not positive.
+        """
+        columns = self._select_columns(columns if columns is not None else CHUNK_FIELDS)
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be a positive number")
+        conditions, params = self._series_conditions(symbol, timeframe, start, end)
+        stored = [c for c in columns if c not in ("date_time", "ts")]
+        table = self._series_tables(symbol, timeframe)[0]
+        query = (
+            f"SELECT {', '.join(['ts'] + stored)} FROM {table} WHERE "
+            + " AND ".join(conditions + ["ts > ?"])
+            + " ORDER BY ts LIMIT ?"
+        )
+
+        after = -(2 ** 63)
+        while True:
+            rows = []
+            with self.get_connection() as conn:
+                rows = conn.execute(query, params + [after, chunk_size]).fetchall()
+            if not rows:
+                return
+            after = rows[-1][0]
+            arrays = self._typed_columns(rows, columns)
+            yield arrays if as_arrays else pd.DataFrame(arrays, copy=False)
+            if len(rows) < chunk_size:
+                return
+
+    def _catalog_entry(self, symbol: str, timeframe: str) -> Optional[tuple]:
+        """Return (rows, last_ts, version, modified_at) of the series read for symbol and timeframe, or None."""
+        catalog = self._series_tables(symbol, timeframe)[1]
+        with self.get_connection() as conn:
+            return conn.execute(
+                f"SELECT rows, last_ts, version, modified_at FROM {catalog} "
+                "WHERE symbol = ? AND timeframe = ?",
+                (symbol, timeframe),
+            ).fetchone()
+
+    def refresh_mirror(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> bool:
+        """
+        Bring the columnar mirror of a series up to date from SQLite, which stays the source of truth.
+
+        The catalog keeps the earliest bar time changed since the mirrored version
+        (dirty_from), so the mirrored bars before it are copied from the current
+        mirror files and only the bars from there on are read from SQLite; appending
+        new bars costs a file copy and a read of the new bars, not a full reload.
+
+        Parameters:
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+
+        Returns:
+            bool: True if the mirror is now current.
+        """
+        if self.mirror is None:
+            return False
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        with self._mirror_lock:
+            catalog = self._series_tables(symbol, timeframe)[1]
+            with self.get_connection() as conn:
+                entry = conn.execute(
+                    f"SELECT rows, last_ts, version, modified_at, dirty_from, clean_version FROM {catalog} "
+                    "WHERE symbol = ? AND timeframe = ?",
+                    (symbol, timeframe),
+                ).fetchone()
+            if entry is None:
+                self.mirror.remove(symbol, timeframe)
+                return False
+            rows, last_ts, version, modified_at, dirty_from, clean_version = entry
+            manifest = self.mirror.manifest(symbol, timeframe)
+            if manifest is not None and (manifest["version"], manifest["modified_at"]) == (version, modified_at):
+                return True
+
+            start, chunks = None, []
+            if (
+                manifest is not None and manifest["rows"] and manifest["version"] == clean_version
+                and dirty_from is not None and dirty_from > MIN_TS
+            ):
+                # The mirrored bars before dirty_from are unchanged since the mirrored version
+                mirrored = self.mirror.open(symbol, timeframe, manifest, MIRROR_COLUMNS)
+                keep = int(np.searchsorted(mirrored["ts"], dirty_from))
+                if keep:
+                    chunks.append({c: mirrored[c][:keep] for c in MIRROR_COLUMNS})
+                    start = dirty_from
+            if rows:
+                chunks = itertools.chain(chunks, self.iter_market_data(
+                    symbol, timeframe, start=start, end=last_ts, columns=MIRROR_COLUMNS, as_arrays=True
+                ))
+            try:
+                self.mirror.write(symbol, timeframe, rows, chunks, version, modified_at)
+            except (OSError, ValueError) as e:
+                print(f"Error refreshing columnar mirror for {symbol} {timeframe}: {e}")
+                return False
+            with self.get_connection() as conn:
+                # Changes committed since the catalog was read keep their dirty_from
+                conn.execute(
+                    f"UPDATE {catalog} SET dirty_from = NULL, clean_version = ? "
+                    "WHERE symbol = ? AND timeframe = ? AND version = ?",
+                    (version, symbol, timeframe, version),
+                )
+                conn.commit()
+            return True
+
+    def get_market_columns(
+        self,
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        columns: Optional[Sequence[str]] = None,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Return whole columns of a series as NumPy arrays, memory-mapped from the columnar mirror.
+
+        The mirror is used when its version matches the catalog and is rebuilt
+        first when it is stale. Without a mirror the columns are read from SQLite.
+        Mapped arrays are read-only.
+
+        Parameters:
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+            columns (Optional[Sequence[str]]): Any of date_time, ts, open, high, low, close and volume
+                (default is date_time, open, high, low, close and volume).
+
+        Returns:
+            Dict[str, np.ndarray]: One array per requested column, oldest bar first.
+        Raises:
+            ValueError: If a column is not mirrored.
+        """
+        columns = list(columns) if columns is not None else CHUNK_FIELDS
+        unknown = [c for c in columns if c != "date_time" and c not in MIRROR_COLUMNS]
+        if unknown:
+            raise ValueError(f"Columns not available in the columnar mirror: {unknown}")
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+
+        entry = self._catalog_entry(symbol, timeframe)
+        if entry is not None and self.mirror is not None:
+            manifest = self.mirror.manifest(symbol, timeframe)
+            current = manifest is not None and (manifest["version"], manifest["modified_at"]) == entry[2:]
+            if current or self.refresh_mirror(symbol, timeframe):
+                manifest = self.mirror.manifest(symbol, timeframe)
+                return self.mirror.open(symbol, timeframe, manifest, columns)
+
+        chunks = list(self.iter_market_data(symbol, timeframe, columns=columns, as_arrays=True))
+        if not chunks:
+            return {c: np.empty(0, dtype=MIRROR_DTYPES.get(c, "datetime64[ns]")) for c in columns}
+        return {c: np.concatenate([chunk[c] for chunk in chunks]) for c in columns}
+
+    def data_version(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> int:
+        """Return the catalog version of a series (0 if it is not stored); it changes on every ingest that modifies it."""
+        entry = self._catalog_entry(
+            symbol or DATABASE["DEFAULT_SYMBOL"], timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        )
+        return entry[2] if entry is not None else 0
+
+    @staticmethod
+    def signal_params_key(params: Mapping[str, Any]) -> str:
+        """Canonical text key for a set of strategy parameters."""
+        return json.dumps(dict(params), sort_keys=True)
+
+    def store_signals(
+        self,
+        batch: TradingSignalBatch,
+        params: Mapping[str, Any],
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        data_version: Optional[int] = None,
+    ) -> int:
+        """
+        Store the signals computed for a series with the given strategy parameters.
+
+        Signals computed earlier for the same series and parameters are replaced.
+
+        Parameters:
+            batch (TradingSignalBatch): The signals.
+            params (Mapping[str, Any]): Strategy parameters the signals were computed with.
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+            data_version (Optional[int]): Version of the data the signals were computed on
+                (default is the current version). Pass the version read before loading the data.
+
+        Returns:
+            int: The number of signals stored.
+        """
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        if data_version is None:
+            data_version = self.data_version(symbol, timeframe)
+        key = (symbol, timeframe, self.signal_params_key(params))
+        rows = list(zip(
+            itertools.repeat(key[0]), itertools.repeat(key[1]), itertools.repeat(key[2]),
+            itertools.repeat(data_version), batch.ts.tolist(), batch.bar_index.tolist(),
+            batch.signal_type.tolist(), batch.price.tolist(), batch.strength.tolist(),
+        ))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            self._begin(cursor)
+            cursor.execute(
+                "DELETE FROM signals WHERE symbol = ? AND timeframe = ? AND params = ?", key
+            )
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO signals
+                (symbol, timeframe, params, data_version, ts, bar_index, signal_type, price, strength)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """,
+                rows,
+            )
+            cursor.execute(
+                """
+                INSERT OR REPLACE INTO signal_runs
+                (symbol, timeframe, params, data_version, signals, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                """,
+                key + (data_version, len(rows), time.time_ns()),
+            )
+            self._commit(conn)
+        return len(rows)
+
+    def get_signals(
+        self,
+        params: Mapping[str, Any],
+        symbol: Optional[str] = None,
+        timeframe: Optional[str] = None,
+        start=None,
+        end=None,
+        data_version: Optional[int] = None,
+    ) -> Optional[TradingSignalBatch]:
+        """
+        Fetch stored signals of a series, ordered by time.
+
+        Parameters:
+            params (Mapping[str, Any]): Strategy parameters the signals were computed with.
+            symbol (Optional[str]): The instrument (default from settings).
+            timeframe (Optional[str]): The bar timeframe (default from settings).
+            start: First signal time to include (default is no limit).
+            end: Last signal time to include (default is no limit).
+            data_version (Optional[int]): Required data version (default is the current version).
+
+        Returns:
+            Optional[TradingSignalBatch]: The signals, or None if none were stored for that data version.
+        """
+        symbol = symbol or DATABASE["DEFAULT_SYMBOL"]
+        timeframe = timeframe or DATABASE["DEFAULT_TIMEFRAME"]
+        if data_version is None:
+            data_version = self.data_version(symbol, timeframe)
+        key = [symbol, timeframe, self.signal_params_key(params)]
+        conditions, query_params = ["symbol = ?", "timeframe = ?", "params = ?"], list(key)
+        if start is not None:
+            conditions.append("ts >= ?")
+            query_params.append(to_epoch_ns(start))
+        if end is not None:
+            conditions.append("ts <= ?")
+            query_params.append(to_epoch_ns(end))
+
+        with self.get_connection() as conn:
+            run = conn.execute(
+                "SELECT data_version FROM signal_runs WHERE symbol = ? AND timeframe = ? AND params = ?",
+                key,
+            ).fetchone()
+            if run is None or run[0] != data_version:
+                return None
+            rows = conn.execute(
+                "SELECT ts, bar_index, signal_type, price, strength FROM signals WHERE "
+                + " AND ".join(conditions)
+                + " ORDER BY ts, signal_type",
+                query_params,
+            ).fetchall()
+            if not rows:
+                return TradingSignalBatch([], [], [], [], [])
+            return TradingSignalBatch(*zip(*rows))
+        return None
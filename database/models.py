@@ -2,7 +2,9 @@
 
 from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional
+from typing import Iterable, Iterator, Optional
+import numpy as np
+import pandas as pd
 
 @dataclass
 class MarketData:
@@ -42,4 +44,83 @@ class TradingSignal:
     signal_type: str
     price: float
     strength: float
-    id: Optional[int] = None
\ No newline at end of file
+    id: Optional[int] = None
+
+class TradingSignalBatch:
+    """
+    Many trading signals stored column-wise instead of one TradingSignal per signal.
+
+    Attributes:
+        ts (np.ndarray): Signal time as nanoseconds since the epoch (int64).
+        bar_index (np.ndarray): Index of the bar that produced the signal (int64).
+        signal_type (np.ndarray): Type of each signal, e.g. 'high', 'low', 'buy' or 'sell' (str).
+        price (np.ndarray): Price of each signal (float64).
+        strength (np.ndarray): Strength of each signal (float64).
+    """
+
+    __slots__ = ("ts", "bar_index", "signal_type", "price", "strength")
+
+    def __init__(self, ts, bar_index, signal_type, price, strength=None):
+        self.ts = np.asarray(ts, dtype=np.int64)
+        self.bar_index = np.asarray(bar_index, dtype=np.int64)
+        self.signal_type = np.asarray(signal_type, dtype=str)
+        self.price = np.asarray(price, dtype=np.float64)
+        if strength is None:
+            strength = np.ones(len(self.ts))
+        self.strength = np.asarray(strength, dtype=np.float64)
+
+    @classmethod
+    def from_hln(cls, result) -> "TradingSignalBatch":
+        """
+        Build a batch from an HLNResult; HLN points are confirmed, so their strength is 1.
+
+        Raises:
+            ValueError: If the result has no timestamps.
+        """
+        from strategy.hln_engine import HIGH, LOW
+        from strategy.hln_result import KIND_LABELS
+
+        if result.date_time is None:
+            raise ValueError("HLN result has no timestamps")
+        return cls(
+            np.asarray(result.date_time, dtype="datetime64[ns]").view(np.int64),
+            result.indices,
+            np.where(result.kinds == HIGH, KIND_LABELS[HIGH], KIND_LABELS[LOW]),
+            result.values,
+        )
+
+    @classmethod
+    def from_signals(cls, signals: Iterable[TradingSignal]) -> "TradingSignalBatch":
+        """Build a batch from TradingSignal objects; bar indices are unknown and set to -1."""
+        signals = list(signals)
+        return cls(
+            [pd.Timestamp(s.datetime).value for s in signals],
+            [-1] * len(signals),
+            [s.signal_type for s in signals],
+            [s.price for s in signals],
+            [s.strength for s in signals],
+        )
+
+    def __len__(self) -> int:
+        return len(self.ts)
+
+    def __iter__(self) -> Iterator[TradingSignal]:
+        """Yield the signals as TradingSignal objects."""
+        for ts, signal_type, price, strength in zip(
+            self.ts.tolist(), self.signal_type.tolist(), self.price.tolist(), self.strength.tolist()
+        ):
+            yield TradingSignal(pd.Timestamp(ts).to_pydatetime(), signal_type, price, strength)
+
+    def __repr__(self) -> str:
+        return f"TradingSignalBatch(signals={len(self)})"
+
+    def to_hln_result(self):
+        """Return the 'high'/'low' signals as an HLNResult."""
+        from strategy.hln_result import HLNResult, KIND_LABELS
+
+        codes = {label: kind for kind, label in KIND_LABELS.items()}
+        mask = np.isin(self.signal_type, list(codes))
+        kinds = np.array([codes[t] for t in self.signal_type[mask].tolist()], dtype=np.int8)
+        return HLNResult(
+            self.bar_index[mask], self.price[mask], kinds, self.ts[mask].view("datetime64[ns]")
+        )
@@ -30,10 +30,11 @@ class DataRangeDialog(QDialog):
 
         button_box = QDialogButtonBox()
         replace_btn = QPushButton("Complete Replacement")
+        replace_range_btn = QPushButton("Replace Overlapping Range")
         new_only_btn = QPushButton("Save Only New Data")
         cancel_btn = QPushButton("Cancel")
 
-        for btn in [replace_btn, new_only_btn, cancel_btn]:
+        for btn in [replace_btn, replace_range_btn, new_only_btn, cancel_btn]:
             btn.setStyleSheet(StyleSheet.BUTTON)
             button_box.addButton(btn, QDialogButtonBox.ActionRole)
 
@@ -50,6 +51,9 @@ class DataRangeDialog(QDialog):
         if button.text() == "Complete Replacement":
             self.parent().data_processor.set_mode("replace")
             self.accept()
+        elif button.text() == "Replace Overlapping Range":
+            self.parent().data_processor.set_mode("replace_range")
+            self.accept()
         elif button.text() == "Save Only New Data":
             self.parent().data_processor.set_mode("new_only")
             self.accept()
@@ -15,7 +15,8 @@ from .styles import StyleSheet
 from .dialogs import DataRangeDialog
 from utils.file_handler import FileHandler
 from database.db_manager import DatabaseManager
-from strategy.hln_calculator import HLNCalculator
+from utils.cache import CachedIndicators
+from strategy.strategy import VortexStrategy
 import pandas as pd
 
 
@@ -30,6 +31,7 @@ class MainWindow(QMainWindow):
         self.db_manager = db_manager
         self.data_processor = DataProcessor(db_manager)
         self.file_handler = FileHandler("output.json")
+        self.cached_indicators = CachedIndicators()
         self.setup_ui()
         self.check_database_status()
 
@@ -80,7 +82,7 @@ class MainWindow(QMainWindow):
         """
         Check the status of the database and update the status label accordingly.
         """
-        data = self.db_manager.get_market_data()
+        data = self.db_manager.get_market_data(columns=["date_time"])
         if data.empty:
             self.status_label.setText(
                 "Database Status: No market data available. Please upload data."
@@ -97,7 +99,7 @@ class MainWindow(QMainWindow):
         Open a file dialog to upload a CSV file and handle duplicates if found.
         """
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Select CSV File", "", "CSV Files (*.csv)"
+            self, "Select Market Data File", "", "Market Data (*.csv *.hst)"
         )
         if file_path:
             try:
@@ -108,6 +110,7 @@ class MainWindow(QMainWindow):
                         self.data_processor.set_file_path(file_path)
                         self.process_data()
                 else:
+                    self.data_processor.set_mode("replace")
                     self.data_processor.set_file_path(file_path)
                     self.process_data()
             except Exception as e:
@@ -132,7 +135,7 @@ class MainWindow(QMainWindow):
         """
         try:
             self.data_processor.process_and_save()
-            data = self.db_manager.get_market_data()
+            data = self.db_manager.get_market_data(columns=["ts"])
             record_count = len(data)
             QMessageBox.information(
                 self,
@@ -150,18 +153,14 @@ class MainWindow(QMainWindow):
         Handle the submit button click to write commands to a JSON file.
         """
         try:
-            market_data = self.db_manager.get_market_data()
-            
-            # Initialize HLNCalculator with market data
-            hln_calculator = HLNCalculator(data=market_data)
-            
-            # Calculate HLN lines
-            hln_values, hln_timestamps = hln_calculator.calculate_hln_lines()
+            # HLN lines are read from the signals table while the market data is unchanged
+            strategy = VortexStrategy(cache=self.cached_indicators)
+            signals = strategy.get_or_calculate_signals(self.db_manager)
             
             # Prepare data for JSON output
             hln_output = {
-                "hln_values": hln_values,
-                "hln_timestamps": hln_timestamps
+                "hln_values": signals["hln_points"],
+                "hln_timestamps": signals["timestamps"]
             }
             
             json_directory = self.json_path_edit.text()
@@ -3,6 +3,11 @@ import pandas as pd
 from typing import List, Tuple
 from utils.indicators import TechnicalIndicators
 from scipy.stats import norm
+from .hln_engine import HIGH, DEFAULT_CHUNK_SIZE, Anchor, detect_hln_events
+from .hln_result import HLNResult, bar_timestamps
+
+HLN_ENGINES = ("vectorized", "loop")
+DEFAULT_HLN_ENGINE = "vectorized"
 
 class HLNCalculator:
     def __init__(
@@ -10,6 +15,9 @@ class HLNCalculator:
         data: pd.DataFrame,
         tenkan_period: int = 9,
         confidence_level: float = 0.95,
+        engine: str = DEFAULT_HLN_ENGINE,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        anchor: Anchor = None,
     ):
         """
         Initialize the HLNCalculator with the given data and parameters.
@@ -18,11 +26,21 @@ class HLNCalculator:
         data (pd.DataFrame): The DataFrame containing market data.
         tenkan_period (int): The period for Tenkan-sen (default is 9).
         confidence_level (float): Confidence level for dynamic tolerance (default is 0.95).
+        engine (str): Detection backend, "vectorized" or the reference "loop" (default is "vectorized").
+        chunk_size (int): Maximum number of bars the vectorized engine scans per step.
+        anchor (Anchor): Point treated as confirmed before the first bar (default is None, which confirms no points).
+        Raises:
+        ValueError: If the engine is unknown.
         """
         self.data = data
         self.validate_data(data)
+        if engine not in HLN_ENGINES:
+            raise ValueError(f"engine must be one of {HLN_ENGINES}")
         self.tenkan_period = tenkan_period
         self.confidence_level = confidence_level
+        self.engine = engine
+        self.chunk_size = chunk_size
+        self.anchor = anchor
         self.indicators = TechnicalIndicators()
     
     @staticmethod
@@ -41,23 +59,81 @@ class HLNCalculator:
         if data.empty:
             raise ValueError("Empty dataset provided")
 
-    def detect_high_low_normal(self, period: int) -> Tuple[List[dict], List[dict]]:
-        # محاسبه تغییرات قیمت
-        self.data['Price_Change'] = self.data['close'].diff()
-        # محاسبه میانگین و انحراف معیار تغییرات قیمت
-        mean_change = self.data['Price_Change'].rolling(window=period).mean()
-        std_dev = self.data['Price_Change'].rolling(window=period).std()
+    def _dynamic_tolerance(self, period: int) -> pd.Series:
+        # محاسبه تغییرات قیمت (بدون تغییر دادن DataFrame ورودی)
+        price_change = self.data['close'].diff()
+        # محاسبه انحراف معیار تغییرات قیمت
+        std_dev = price_change.rolling(window=period).std()
         
         # محاسبه Z-score برای سطح اطمینان مشخص
         z = norm.ppf(1 - (1 - self.confidence_level) / 2)  # دو طرفه
         
         # محاسبه تلرانس پویا
-        tolerance = z * std_dev
+        return z * std_dev
+
+    def calculate_hln(self, period: int = None) -> HLNResult:
+        """
+        Detect High Normal and Low Normal points with the configured engine.
+
+        The input DataFrame is never modified, so one frame can be shared by
+        several calculators and threads.
+
+        Parameters:
+        period (int): The rolling period for the dynamic tolerance (default is tenkan_period).
+
+        Returns:
+            HLNResult: The confirmed points in bar order.
+        """
+        period = period or self.tenkan_period
+        if self.engine == "loop":
+            last_high = last_low = None
+            if self.anchor is not None:
+                point = {'index': self.anchor[1], 'value': self.anchor[2]}
+                if self.anchor[0] == HIGH:
+                    last_high = point
+                else:
+                    last_low = point
+            result = HLNResult.from_points(*self._detect_high_low_normal_loop(period, last_high, last_low))
+            timestamps = bar_timestamps(self.data)
+            if timestamps is not None:
+                result.date_time = timestamps[result.indices]
+            return result
+
+        tolerance = self._dynamic_tolerance(period)
+        indices, values, kinds, _ = detect_hln_events(
+            self.data['high'].to_numpy(dtype=np.float64),
+            self.data['low'].to_numpy(dtype=np.float64),
+            period + tolerance.to_numpy(dtype=np.float64),
+            anchor=self.anchor,
+            chunk_size=self.chunk_size,
+        )
+        return HLNResult.from_engine(indices, values, kinds, bar_timestamps(self.data))
+
+    def detect_high_low_normal(self, period: int) -> Tuple[List[dict], List[dict]]:
+        """
+        Detect High Normal and Low Normal points with the configured engine.
+
+        Parameters:
+        period (int): The rolling period for the dynamic tolerance.
+
+        Returns:
+            Tuple[List[dict], List[dict]]: Highs and lows as {'index', 'value'} dicts.
+        """
+        return self.calculate_hln(period).to_point_lists()
+
+    def _detect_high_low_normal_loop(
+        self, period: int, last_high: dict = None, last_low: dict = None
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Reference bar-by-bar implementation of detect_high_low_normal.
+
+        Kept for equivalence tests against the vectorized engine; last_high and
+        last_low seed the state machine as if earlier bars had confirmed them.
+        """
+        tolerance = self._dynamic_tolerance(period)
         
         highs = []
         lows = []
-        last_high = None
-        last_low = None
         
         for i in range(len(self.data)):
             # تشخیص High Normal
@@ -83,12 +159,5 @@ class HLNCalculator:
         Returns:
             Tuple[List[float], List[int]]: A tuple containing HLN points (highs and lows) and their timestamps.
         """
-        tenkan_highs, tenkan_lows = self.detect_high_low_normal(period=self.tenkan_period)
-
-        hln_points = tenkan_highs + tenkan_lows
-        hln_points = sorted(hln_points, key=lambda x: x['index'])
-        
-        hln_values = [point['value'] for point in hln_points]
-        hln_timestamps = [point['index'] for point in hln_points]
-
-        return hln_values, hln_timestamps
\ No newline at end of file
+        result = self.calculate_hln(self.tenkan_period)
+        return result.values.tolist(), result.indices.tolist()
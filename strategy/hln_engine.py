@@ -0,0 +1,211 @@
+# strategy/hln_engine.py
+
+import numpy as np
+from typing import Optional, Tuple
+
+HIGH = 1
+LOW = -1
+DEFAULT_CHUNK_SIZE = 65536
+_MIN_SEARCH_SIZE = 16
+
+# (kind, index, value) of the last confirmed point, or None when no point has been confirmed yet.
+Anchor = Optional[Tuple[int, int, float]]
+# Prices seed_anchor can treat as a confirmed point
+HLN_SEEDS = ("high", "low")
+
+
+def _first_true(predicate, start: int, stop: int, chunk_size: int) -> int:
+    """
+    Find the first position in [start, stop) where predicate is True.
+
+    The predicate is evaluated over growing slices so that nearby hits cost a
+    tiny array operation while long searches never exceed chunk_size elements.
+
+    Parameters:
+        predicate (callable): Function (start, end) -> boolean array for positions start..end-1.
+        start (int): First position to examine.
+        stop (int): Position to stop before.
+        chunk_size (int): Maximum number of positions evaluated at once.
+
+    Returns:
+        int: The first matching position, or -1 if there is none.
+    """
+    size = min(_MIN_SEARCH_SIZE, chunk_size)
+    while start < stop:
+        end = min(start + size, stop)
+        hits = np.flatnonzero(predicate(start, end))
+        if hits.size:
+            return start + int(hits[0])
+        start = end
+        size = min(size * 2, chunk_size)
+    return -1
+
+
+def seed_anchor(high: np.ndarray, low: np.ndarray, seed: Optional[str], index: int = 0) -> Anchor:
+    """
+    Anchor that treats the high or low of one bar as a confirmed point.
+
+    Without an anchor the state machine has nothing to compare against and
+    confirms no points, so a series analysed from its start needs a seed. The
+    first bar with a defined tolerance (index = period) lets the next bars confirm.
+
+    Parameters:
+        high (np.ndarray): High prices.
+        low (np.ndarray): Low prices.
+        seed (Optional[str]): "high", "low", or None for no anchor.
+        index (int): The bar to seed from (default is 0).
+
+    Returns:
+        Anchor: The seed anchor, or None when seed is None or the bar does not exist.
+
+    Raises:
+        ValueError: If the seed is unknown.
+    """
+    if seed is None:
+        return None
+    if seed not in HLN_SEEDS:
+        raise ValueError(f"seed must be one of {HLN_SEEDS}")
+    if not 0 <= index < len(high):
+        return None
+    if seed == "high":
+        return (HIGH, index, float(high[index]))
+    return (LOW, index, float(low[index]))
+
+
+def detect_hln_events(
+    high: np.ndarray,
+    low: np.ndarray,
+    window: np.ndarray,
+    anchor: Anchor = None,
+    offset: int = 0,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Anchor]:
+    """
+    Run the High/Low-Normal state machine over raw NumPy arrays.
+
+    Bar i confirms a High Normal when the last point is a low at index j with
+    i - j <= window[i] and high[i] > low value; it confirms a Low Normal when the
+    last point is a high and low[i] is below it. Within one bar the high check
+    runs before the low check, exactly like HLNCalculator's reference loop.
+
+    Runs of bars that confirm a high and a low back to back are emitted in bulk;
+    every other transition is found with a chunked vectorized search.
+
+    Parameters:
+        high (np.ndarray): High prices.
+        low (np.ndarray): Low prices.
+        window (np.ndarray): Allowed distance per bar (period + tolerance); NaN never matches.
+        anchor (Anchor): State carried over from earlier bars (default is None).
+        offset (int): Global index of the first element, used for indices and anchors (default is 0).
+        chunk_size (int): Maximum number of bars evaluated per search step.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray, Anchor]: Indices, values and kinds
+        (HIGH or LOW) of the confirmed points in bar order, and the final anchor.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    window = np.asarray(window, dtype=np.float64)
+    n = len(high)
+
+    # step[k]: bar k confirms both a high and a low when the last point is the low of bar k - 1.
+    step = np.empty(n, dtype=bool)
+    if n:
+        step[1:] = (window[1:] >= 1) & (high[1:] > low[:-1]) & (low[1:] < high[1:])
+        step[0] = (
+            anchor is not None
+            and anchor[0] == LOW
+            and anchor[1] == offset - 1
+            and window[0] >= 1
+            and high[0] > anchor[2]
+            and low[0] < high[0]
+        )
+    breaks = np.flatnonzero(~step)
+
+    segments = []
+    indices, values, kinds = [], [], []
+
+    def flush():
+        if indices:
+            segments.append(
+                (
+                    np.asarray(indices, dtype=np.int64),
+                    np.asarray(values, dtype=np.float64),
+                    np.asarray(kinds, dtype=np.int8),
+                )
+            )
+            indices.clear()
+            values.clear()
+            kinds.clear()
+
+    pos = 0
+    while pos < n and anchor is not None:
+        kind, last_index, last_value = anchor
+
+        if kind == LOW and last_index == offset + pos - 1 and step[pos]:
+            k = np.searchsorted(breaks, pos)
+            end = int(breaks[k]) if k < len(breaks) else n
+            flush()
+            run = np.arange(pos, end, dtype=np.int64)
+            segments.append(
+                (
+                    np.repeat(run + offset, 2),
+                    np.column_stack((high[pos:end], low[pos:end])).ravel(),
+                    np.tile(np.array([HIGH, LOW], dtype=np.int8), end - pos),
+                )
+            )
+            anchor = (LOW, offset + end - 1, float(low[end - 1]))
+            pos = end
+            continue
+
+        distance_base = offset - last_index
+        if kind == LOW:
+            i = _first_true(
+                lambda s, e: (np.arange(s + distance_base, e + distance_base) <= window[s:e])
+                & (high[s:e] > last_value),
+                pos,
+                n,
+                chunk_size,
+            )
+            if i < 0:
+                break
+            indices.append(offset + i)
+            values.append(float(high[i]))
+            kinds.append(HIGH)
+            if 0 <= window[i] and low[i] < high[i]:
+                indices.append(offset + i)
+                values.append(float(low[i]))
+                kinds.append(LOW)
+                anchor = (LOW, offset + i, float(low[i]))
+            else:
+                anchor = (HIGH, offset + i, float(high[i]))
+        else:
+            i = _first_true(
+                lambda s, e: (np.arange(s + distance_base, e + distance_base) <= window[s:e])
+                & (low[s:e] < last_value),
+                pos,
+                n,
+                chunk_size,
+            )
+            if i < 0:
+                break
+            indices.append(offset + i)
+            values.append(float(low[i]))
+            kinds.append(LOW)
+            anchor = (LOW, offset + i, float(low[i]))
+        pos = i + 1
+
+    flush()
+    if not segments:
+        return (
+            np.empty(0, dtype=np.int64),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.int8),
+            anchor,
+        )
+    return (
+        np.concatenate([s[0] for s in segments]),
+        np.concatenate([s[1] for s in segments]),
+        np.concatenate([s[2] for s in segments]),
+        anchor,
+    )
@@ -0,0 +1,152 @@
+# strategy/hln_result.py
+
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple
+from .hln_engine import HIGH, LOW
+
+KIND_LABELS = {HIGH: "high", LOW: "low"}
+
+
+class HLNResult:
+    """
+    Confirmed HLN points stored column-wise in bar order.
+
+    Attributes:
+        indices (np.ndarray): Bar index of each point (int64).
+        values (np.ndarray): Price of each point (float64).
+        kinds (np.ndarray): HIGH (1) or LOW (-1) for each point (int8).
+        date_time (Optional[np.ndarray]): Timestamp of each point (datetime64), if the data had one.
+    """
+
+    __slots__ = ("indices", "values", "kinds", "date_time")
+
+    def __init__(
+        self,
+        indices: np.ndarray,
+        values: np.ndarray,
+        kinds: np.ndarray,
+        date_time: Optional[np.ndarray] = None,
+    ):
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.kinds = np.asarray(kinds, dtype=np.int8)
+        self.date_time = date_time
+
+    @classmethod
+    def empty(cls) -> "HLNResult":
+        """Return a result without points."""
+        return cls(np.empty(0), np.empty(0), np.empty(0))
+
+    @classmethod
+    def from_engine(
+        cls,
+        indices: np.ndarray,
+        values: np.ndarray,
+        kinds: np.ndarray,
+        timestamps: Optional[np.ndarray] = None,
+        offset: int = 0,
+    ) -> "HLNResult":
+        """
+        Build a result from detect_hln_events output.
+
+        Parameters:
+            indices (np.ndarray): Indices of the confirmed points.
+            values (np.ndarray): Prices of the confirmed points.
+            kinds (np.ndarray): HIGH or LOW for each point.
+            timestamps (Optional[np.ndarray]): Timestamps of the bars the indices refer to.
+            offset (int): Index of the first element of timestamps (default is 0).
+        """
+        date_time = None
+        if timestamps is not None:
+            date_time = timestamps[indices - offset]
+        return cls(indices, values, kinds, date_time)
+
+    @classmethod
+    def from_points(cls, highs: List[dict], lows: List[dict]) -> "HLNResult":
+        """Build a result from {'index', 'value'} highs and lows lists, highs first within a bar."""
+        points = sorted(
+            [(p['index'], 0, p['value'], HIGH) for p in highs]
+            + [(p['index'], 1, p['value'], LOW) for p in lows]
+        )
+        if not points:
+            return cls.empty()
+        indices, _, values, kinds = zip(*points)
+        return cls(np.array(indices), np.array(values), np.array(kinds))
+
+    def __len__(self) -> int:
+        return len(self.indices)
+
+    def __repr__(self) -> str:
+        return f"HLNResult(points={len(self)}, highs={int((self.kinds == HIGH).sum())})"
+
+    def _select(self, mask: np.ndarray) -> "HLNResult":
+        date_time = self.date_time[mask] if self.date_time is not None else None
+        return HLNResult(self.indices[mask], self.values[mask], self.kinds[mask], date_time)
+
+    @property
+    def highs(self) -> "HLNResult":
+        """The High Normal points only."""
+        return self._select(self.kinds == HIGH)
+
+    @property
+    def lows(self) -> "HLNResult":
+        """The Low Normal points only."""
+        return self._select(self.kinds == LOW)
+
+    def to_point_lists(self) -> Tuple[List[dict], List[dict]]:
+        """Return highs and lows as the {'index', 'value'} lists used by detect_high_low_normal."""
+        highs, lows = self.highs, self.lows
+        return (
+            [{'index': i, 'value': v} for i, v in zip(highs.indices.tolist(), highs.values.tolist())],
+            [{'index': i, 'value': v} for i, v in zip(lows.indices.tolist(), lows.values.tolist())],
+        )
+
+    def to_dict(self) -> Dict[str, List[Any]]:
+        """Return JSON-serializable columns."""
+        output = {
+            "hln_values": self.values.tolist(),
+            "hln_timestamps": self.indices.tolist(),
+            "kinds": [KIND_LABELS[k] for k in self.kinds.tolist()],
+        }
+        if self.date_time is not None:
+            output["date_time"] = np.datetime_as_string(self.date_time, unit="s").tolist()
+        return output
+
+    def to_json(self, **kwargs) -> str:
+        """Serialize the result with json.dumps."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the points as a DataFrame with index, value, kind and date_time columns."""
+        frame = pd.DataFrame(
+            {
+                "index": self.indices,
+                "value": self.values,
+                "kind": pd.Categorical.from_codes(
+                    (self.kinds == LOW).astype(np.int8), categories=["high", "low"]
+                ),
+            }
+        )
+        if self.date_time is not None:
+            frame["date_time"] = self.date_time
+        return frame
+
+
+def bar_timestamps(data: pd.DataFrame) -> Optional[np.ndarray]:
+    """
+    Return the bar timestamps of a market data frame as datetime64 values, if it has any.
+
+    The 'date_time' column (as stored by DatabaseManager) is preferred, then
+    'datetime', then a DatetimeIndex.
+    """
+    for column in ("date_time", "datetime"):
+        if column in data.columns:
+            values = data[column]
+            if not pd.api.types.is_datetime64_any_dtype(values):
+                return None
+            return values.to_numpy(dtype="datetime64[ns]")
+    if isinstance(data.index, pd.DatetimeIndex):
+        return data.index.to_numpy(dtype="datetime64[ns]")
+    return None
@@ -0,0 +1,75 @@
+# strategy/hln_sweep.py
+
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, Tuple
+from scipy.stats import norm
+from .hln_calculator import HLNCalculator
+from .hln_engine import DEFAULT_CHUNK_SIZE, Anchor, detect_hln_events
+from .hln_result import HLNResult, bar_timestamps
+
+
+class HLNParameterSweep:
+    def __init__(self, data: pd.DataFrame, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        """
+        Evaluate HLN lines for many (period, confidence_level) pairs over the same data.
+
+        Price changes are computed once, the rolling standard deviation once per
+        distinct period, and z-scores for all confidence levels in a single call.
+
+        Parameters:
+        data (pd.DataFrame): The DataFrame containing market data.
+        chunk_size (int): Maximum number of bars the engine scans per step.
+        """
+        HLNCalculator.validate_data(data)
+        self.high = data['high'].to_numpy(dtype=np.float64)
+        self.low = data['low'].to_numpy(dtype=np.float64)
+        self.timestamps = bar_timestamps(data)
+        self.price_change = pd.Series(data['close'].to_numpy(dtype=np.float64)).diff()
+        self.chunk_size = chunk_size
+        self._std_dev: Dict[int, np.ndarray] = {}
+
+    def rolling_std(self, period: int) -> np.ndarray:
+        """Return the rolling standard deviation of price changes, computed once per period."""
+        if period not in self._std_dev:
+            self._std_dev[period] = self.price_change.rolling(window=period).std().to_numpy()
+        return self._std_dev[period]
+
+    @staticmethod
+    def z_scores(confidence_levels: Iterable[float]) -> Dict[float, float]:
+        """Convert two-sided confidence levels to z-scores in one vectorized call."""
+        levels = sorted(set(confidence_levels))
+        scores = norm.ppf(1 - (1 - np.asarray(levels, dtype=np.float64)) / 2)
+        return dict(zip(levels, scores.tolist()))
+
+    def run(
+        self, param_grid: Iterable[Tuple[int, float]], anchor: Anchor = None, offset: int = 0
+    ) -> Dict[Tuple[int, float], HLNResult]:
+        """
+        Calculate HLN lines for every parameter set in the grid.
+
+        Parameters:
+        param_grid (Iterable[Tuple[int, float]]): (period, confidence_level) pairs.
+        anchor (Anchor): Point treated as confirmed before the first bar, shared by every parameter set
+            (default is None, which confirms no points).
+        offset (int): Global index of the first bar, used for indices and the anchor (default is 0).
+
+        Returns:
+            Dict[Tuple[int, float], HLNResult]: Confirmed points keyed by parameter set.
+        """
+        param_grid = list(dict.fromkeys(param_grid))
+        z_scores = self.z_scores(confidence for _, confidence in param_grid)
+
+        results = {}
+        # Grouping by period keeps one rolling series hot while its confidence levels are evaluated
+        for period, confidence in sorted(param_grid):
+            if period <= 0:
+                raise ValueError("period must be a positive number")
+            window = period + z_scores[confidence] * self.rolling_std(period)
+            indices, values, kinds, _ = detect_hln_events(
+                self.high, self.low, window, anchor=anchor, offset=offset, chunk_size=self.chunk_size
+            )
+            results[(period, confidence)] = HLNResult.from_engine(
+                indices, values, kinds, self.timestamps, offset
+            )
+        return results
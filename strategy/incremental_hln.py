@@ -0,0 +1,131 @@
+# strategy/incremental_hln.py
+
+import math
+import numpy as np
+import pandas as pd
+from typing import Mapping
+from scipy.stats import norm
+from utils.streaming import RollingMoments
+from .hln_engine import HIGH, LOW, DEFAULT_CHUNK_SIZE, Anchor, detect_hln_events
+from .hln_result import HLNResult, bar_timestamps
+
+
+class IncrementalHLNCalculator:
+    def __init__(
+        self,
+        tenkan_period: int = 9,
+        confidence_level: float = 0.95,
+        anchor: Anchor = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ):
+        """
+        Streaming counterpart of HLNCalculator that keeps its state between bars.
+
+        Feeding bars one by one (update) or in batches (extend) confirms the same
+        points as running HLNCalculator over the whole history, but the work per
+        bar does not grow with the history.
+
+        Parameters:
+        tenkan_period (int): The period for Tenkan-sen (default is 9).
+        confidence_level (float): Confidence level for dynamic tolerance (default is 0.95).
+        anchor (Anchor): Last confirmed point carried over from an earlier run (default is None).
+        chunk_size (int): Maximum number of bars the engine scans per step in extend.
+        """
+        if tenkan_period <= 0:
+            raise ValueError("tenkan_period must be a positive number")
+        self.tenkan_period = tenkan_period
+        self.confidence_level = confidence_level
+        self.z = norm.ppf(1 - (1 - confidence_level) / 2)
+        self.anchor = anchor
+        self.chunk_size = chunk_size
+        self.bar_count = 0
+        self.last_close = None
+        self._moments = RollingMoments(tenkan_period)
+
+    @property
+    def last_high(self):
+        """The last confirmed High Normal as an {'index', 'value'} dict, if it is the current state."""
+        if self.anchor is not None and self.anchor[0] == HIGH:
+            return {'index': self.anchor[1], 'value': self.anchor[2]}
+        return None
+
+    @property
+    def last_low(self):
+        """The last confirmed Low Normal as an {'index', 'value'} dict, if it is the current state."""
+        if self.anchor is not None and self.anchor[0] == LOW:
+            return {'index': self.anchor[1], 'value': self.anchor[2]}
+        return None
+
+    def update(self, bar: Mapping[str, float]) -> HLNResult:
+        """
+        Process a single bar.
+
+        Parameters:
+        bar (Mapping[str, float]): A bar with 'high', 'low' and 'close' values (dict or pd.Series).
+
+        Returns:
+            HLNResult: Points confirmed by this bar.
+        """
+        high, low, close = float(bar['high']), float(bar['low']), float(bar['close'])
+        change = close - self.last_close if self.last_close is not None else math.nan
+        self._moments.update(change)
+        self.last_close = close
+
+        i = self.bar_count
+        self.bar_count += 1
+        window = self.tenkan_period + self.z * self._moments.std()
+
+        values, kinds = [], []
+        if self.anchor is not None and self.anchor[0] == LOW:
+            if i - self.anchor[1] <= window and high > self.anchor[2]:
+                values.append(high)
+                kinds.append(HIGH)
+                self.anchor = (HIGH, i, high)
+        if self.anchor is not None and self.anchor[0] == HIGH:
+            if i - self.anchor[1] <= window and low < self.anchor[2]:
+                values.append(low)
+                kinds.append(LOW)
+                self.anchor = (LOW, i, low)
+        if not values:
+            return HLNResult.empty()
+        date_time = None
+        if 'date_time' in bar:
+            date_time = np.array([bar['date_time']] * len(values), dtype="datetime64[ns]")
+        return HLNResult(np.full(len(values), i), values, kinds, date_time)
+
+    def extend(self, bars: pd.DataFrame) -> HLNResult:
+        """
+        Process a batch of bars with the vectorized engine.
+
+        Parameters:
+        bars (pd.DataFrame): New bars with 'high', 'low' and 'close' columns, in time order.
+
+        Returns:
+            HLNResult: Points confirmed by these bars.
+        """
+        if bars.empty:
+            return HLNResult.empty()
+        close = bars['close'].to_numpy(dtype=np.float64)
+        previous_close = self.last_close if self.last_close is not None else math.nan
+        changes = np.diff(close, prepend=previous_close)
+
+        # Only the tail of the previous window is needed to continue the rolling statistics
+        history = np.fromiter(self._moments.values, dtype=np.float64)
+        rolling = pd.Series(np.concatenate((history, changes))).rolling(window=self.tenkan_period)
+        std_dev = rolling.std().to_numpy()[len(history):]
+
+        indices, values, kinds, self.anchor = detect_hln_events(
+            bars['high'].to_numpy(dtype=np.float64),
+            bars['low'].to_numpy(dtype=np.float64),
+            self.tenkan_period + self.z * std_dev,
+            anchor=self.anchor,
+            offset=self.bar_count,
+            chunk_size=self.chunk_size,
+        )
+        result = HLNResult.from_engine(
+            indices, values, kinds, bar_timestamps(bars), offset=self.bar_count
+        )
+        self._moments.extend(changes[-self.tenkan_period:])
+        self.last_close = float(close[-1])
+        self.bar_count += len(bars)
+        return result
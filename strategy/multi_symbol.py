@@ -0,0 +1,198 @@
+# strategy/multi_symbol.py
+
+import os
+import time
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Union
+from .strategy import VortexStrategy
+
+PRICE_COLUMNS = ["high", "low", "close"]
+EXECUTORS = ("process", "thread")
+
+
+@dataclass
+class SymbolResult:
+    """
+    Outcome of running VortexStrategy on one instrument.
+
+    Attributes:
+        symbol (str): The instrument name.
+        signals (Optional[Dict[str, List[Any]]]): Output of calculate_signals(), or None on error.
+        rows (int): Number of bars processed.
+        load_time (float): Seconds spent getting the market data in the worker.
+        compute_time (float): Seconds spent in initialize() and calculate_signals().
+        elapsed (float): Seconds from submission until the result was received.
+        error (Optional[str]): The error message if the symbol failed.
+    """
+    symbol: str
+    signals: Optional[Dict[str, List[Any]]]
+    rows: int = 0
+    load_time: float = 0.0
+    compute_time: float = 0.0
+    elapsed: float = 0.0
+    error: Optional[str] = None
+
+
+def _compute_signals(symbol: str, market_data: pd.DataFrame, config, load_time: float) -> SymbolResult:
+    start = time.perf_counter()
+    strategy = VortexStrategy(config)
+    strategy.initialize(market_data)
+    signals = strategy.calculate_signals()
+    return SymbolResult(
+        symbol=symbol,
+        signals=signals,
+        rows=len(market_data),
+        load_time=load_time,
+        compute_time=time.perf_counter() - start,
+    )
+
+
+def _run_from_database(symbol: str, db_name: str, config) -> SymbolResult:
+    """Worker entry point: read the symbol's bars from its own SQLite connection."""
+    from database.db_manager import DatabaseManager
+
+    try:
+        start = time.perf_counter()
+        with DatabaseManager(db_name) as db_manager:
+            # Memory-mapped from the columnar mirror when it is current
+            columns = db_manager.get_market_columns(symbol=symbol)
+        if not len(columns["close"]):
+            return SymbolResult(symbol=symbol, signals=None, error=f"No market data for {symbol} in {db_name}")
+        market_data = pd.DataFrame(columns, copy=False)
+        return _compute_signals(symbol, market_data, config, time.perf_counter() - start)
+    except Exception as e:
+        return SymbolResult(symbol=symbol, signals=None, error=str(e))
+
+
+def _run_from_shared_memory(symbol: str, shm_name: str, rows: int, config) -> SymbolResult:
+    """Worker entry point: wrap the parent's shared-memory block in a DataFrame without copying it."""
+    try:
+        shm = shared_memory.SharedMemory(name=shm_name)
+    except Exception as e:
+        return SymbolResult(symbol=symbol, signals=None, error=str(e))
+    try:
+        start = time.perf_counter()
+        columns = np.ndarray((len(PRICE_COLUMNS), rows), dtype=np.float64, buffer=shm.buf)
+        result = _compute_signals(
+            symbol,
+            pd.DataFrame(columns.T, columns=PRICE_COLUMNS, copy=False),
+            config,
+            time.perf_counter() - start,
+        )
+        del columns
+        return result
+    except Exception as e:
+        return SymbolResult(symbol=symbol, signals=None, error=str(e))
+    finally:
+        shm.close()
+
+
+def _run_from_frame(symbol: str, market_data: pd.DataFrame, config) -> SymbolResult:
+    """Thread entry point: threads share the caller's DataFrame directly."""
+    try:
+        return _compute_signals(symbol, market_data, config, 0.0)
+    except Exception as e:
+        return SymbolResult(symbol=symbol, signals=None, error=str(e))
+
+
+class MultiSymbolRunner:
+    def __init__(
+        self,
+        config: Dict[str, Any] = None,
+        max_workers: int = None,
+        executor: str = "process",
+    ):
+        """
+        Run VortexStrategy over many instruments in parallel.
+
+        Parameters:
+        config (Dict[str, Any]): Strategy configuration shared by all symbols (default strategy config if None).
+        max_workers (int): Pool size (default is the number of CPUs).
+        executor (str): "process" for a process pool or "thread" for a thread pool (default is "process").
+        Raises:
+        ValueError: If the executor type is unknown.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor must be one of {EXECUTORS}")
+        VortexStrategy.validate_config(config)
+        self.config = config
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor = executor
+
+    def _share(self, market_data: pd.DataFrame) -> shared_memory.SharedMemory:
+        """Copy the price columns into a new shared-memory block, one contiguous row per column."""
+        rows = len(market_data)
+        shm = shared_memory.SharedMemory(create=True, size=max(len(PRICE_COLUMNS) * rows * 8, 1))
+        block = np.ndarray((len(PRICE_COLUMNS), rows), dtype=np.float64, buffer=shm.buf)
+        for i, column in enumerate(PRICE_COLUMNS):
+            block[i] = market_data[column].to_numpy(dtype=np.float64)
+        del block
+        return shm
+
+    def run(self, sources: Mapping[str, Union[str, pd.DataFrame]]) -> Iterator[SymbolResult]:
+        """
+        Calculate signals for every symbol and yield results as each symbol finishes.
+
+        Parameters:
+        sources (Mapping[str, Union[str, pd.DataFrame]]): Symbol to SQLite database path
+            (the symbol's series, read inside the worker) or to an in-memory DataFrame (shared with process
+            workers through shared memory).
+
+        Yields:
+            SymbolResult: One result per symbol, in completion order.
+        """
+        pool_class = ProcessPoolExecutor if self.executor == "process" else ThreadPoolExecutor
+        # Blocks are created and unlinked here; workers only attach to them
+        blocks = {}
+        with pool_class(max_workers=self.max_workers) as pool:
+            futures = {}
+            try:
+                for symbol, source in sources.items():
+                    submitted = time.perf_counter()
+                    if isinstance(source, str):
+                        future = pool.submit(_run_from_database, symbol, source, self.config)
+                    elif self.executor == "thread":
+                        future = pool.submit(_run_from_frame, symbol, source, self.config)
+                    else:
+                        missing = [c for c in PRICE_COLUMNS if c not in source.columns]
+                        if missing or source.empty:
+                            yield SymbolResult(
+                                symbol=symbol,
+                                signals=None,
+                                error=f"Data must contain columns: {PRICE_COLUMNS}" if missing else "Empty market data provided",
+                            )
+                            continue
+                        blocks[symbol] = self._share(source)
+                        future = pool.submit(
+                            _run_from_shared_memory, symbol, blocks[symbol].name, len(source), self.config
+                        )
+                    futures[future] = (symbol, submitted)
+
+                for future in as_completed(futures):
+                    symbol, submitted = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        result = SymbolResult(symbol=symbol, signals=None, error=str(e))
+                    result.elapsed = time.perf_counter() - submitted
+                    self._release(blocks.pop(symbol, None))
+                    yield result
+            finally:
+                for future in futures:
+                    future.cancel()
+                for shm in blocks.values():
+                    self._release(shm)
+
+    @staticmethod
+    def _release(shm: Optional[shared_memory.SharedMemory]):
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    def run_all(self, sources: Mapping[str, Union[str, pd.DataFrame]]) -> Dict[str, SymbolResult]:
+        """Run every symbol and return the results keyed by symbol."""
+        return {result.symbol: result for result in self.run(sources)}
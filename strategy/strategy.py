@@ -1,26 +1,39 @@
 # strategy/strategy.py
 from typing import Dict, Any, List, Tuple
 from .hln_calculator import HLNCalculator
+from .hln_engine import HLN_SEEDS, seed_anchor
+from .hln_result import HLNResult
+from .incremental_hln import IncrementalHLNCalculator
 from utils.indicators import TechnicalIndicators
+from utils.cache import CachedIndicators
+from database.models import TradingSignalBatch
+from scipy.stats import norm
 import pandas as pd
 
+DEFAULT_CONFIG = {
+    "tenkan_period": 9,
+    "kijun_period": 26,
+    "senkou_b_period": 52,
+    "z_score": 1.96,
+    "atr_multiplier": 0.5,
+}
+
 
 class VortexStrategy:
-    def __init__(self, config: Dict[str, Any] = None):
+    def __init__(self, config: Dict[str, Any] = None, cache: CachedIndicators = None):
         """
         Initialize the VortexStrategy with the given configuration.
         Parameters:
-        config (Dict[str, Any]): Configuration parameters for the strategy.
+        config (Dict[str, Any]): Configuration parameters for the strategy (default is DEFAULT_CONFIG).
+            The optional "hln_seed" ("high" or "low") treats that price of bar tenkan_period, the
+            first bar with a defined tolerance, as a confirmed HLN point; without it no points are confirmed.
+        cache (CachedIndicators): Optional cache that memoizes HLN results across calls.
         """
         self.validate_config(config)
-        self.config = config or {
-            "tenkan_period": 9,
-            "kijun_period": 26,
-            "senkou_b_period": 52,
-            "z_score": 1.96,
-            "atr_multiplier": 0.5,
-        }
+        self.config = config or dict(DEFAULT_CONFIG)
         self.hln_calculator = None
+        self.incremental_hln = None
+        self.cache = cache
         self.indicators = TechnicalIndicators()
 
     @staticmethod
@@ -30,13 +43,15 @@ class VortexStrategy:
         Parameters:
         config (Dict[str, Any]): Configuration parameters to validate.
         Raises:
-        ValueError: If any period is not a positive number.
+        ValueError: If any period is not a positive number or the HLN seed is unknown.
         """
         if config:
             for key in ["tenkan_period", "kijun_period", "senkou_b_period"]:
                 value = config.get(key, 0)
                 if value <= 0:
                     raise ValueError(f"{key} must be a positive number")
+            if config.get("hln_seed") not in (None,) + HLN_SEEDS:
+                raise ValueError(f"hln_seed must be one of {HLN_SEEDS}")
 
     def initialize(self, market_data: pd.DataFrame):
         """
@@ -49,14 +64,24 @@ class VortexStrategy:
         if market_data.empty:
             raise ValueError("Empty market data provided")
         self.market_data = market_data
+        self.anchor = seed_anchor(
+            market_data["high"].to_numpy(),
+            market_data["low"].to_numpy(),
+            self.config.get("hln_seed"),
+            index=self.config["tenkan_period"],
+        )
         self.hln_calculator = HLNCalculator(
             market_data,
             tenkan_period=self.config["tenkan_period"],
-            kijun_period=self.config["kijun_period"],
-            senkou_b_period=self.config["senkou_b_period"],
-            z_score=self.config["z_score"],
-            atr_multiplier=self.config["atr_multiplier"],
+            confidence_level=self.confidence_level,
+            anchor=self.anchor,
         )
+        self.incremental_hln = None
+
+    @property
+    def confidence_level(self) -> float:
+        """Two-sided confidence level equivalent to the configured z_score."""
+        return 2 * norm.cdf(self.config["z_score"]) - 1
 
     def calculate_signals(self) -> Dict[str, List[Any]]:
         """
@@ -65,12 +90,86 @@ class VortexStrategy:
         Returns:
             Dict[str, List[Any]]: A dictionary containing HLN points and timestamps.
 
+        Raises:
+            ValueError: If the strategy is not initialized with market data.
+        """
+        return self.format_signals(self.calculate_hln())
+
+    @staticmethod
+    def format_signals(result: HLNResult) -> Dict[str, List[Any]]:
+        """Return HLN points as the signals dictionary: point prices and their bar indices."""
+        return {"hln_points": result.values.tolist(), "timestamps": result.indices.tolist()}
+
+    def calculate_hln(self) -> HLNResult:
+        """
+        Calculate the HLN points of the market data, through the cache when one is set.
+
+        Raises:
+            ValueError: If the strategy is not initialized with market data.
+        """
+        if not self.hln_calculator:
+            raise ValueError("Strategy not initialized with market data")
+
+        if self.cache is not None:
+            return self.cache.calculate_hln(
+                self.market_data,
+                tenkan_period=self.config["tenkan_period"],
+                confidence_level=self.confidence_level,
+                anchor=self.anchor,
+            )
+        return self.hln_calculator.calculate_hln()
+
+    def get_or_calculate_signals(
+        self, db_manager, symbol: str = None, timeframe: str = None
+    ) -> Dict[str, List[Any]]:
+        """
+        Return the signals of a stored series, computing and storing them only when its data changed.
+
+        Parameters:
+        db_manager (DatabaseManager): The database holding the series and its signals.
+        symbol (str): The instrument (default from settings).
+        timeframe (str): The bar timeframe (default from settings).
+
+        Returns:
+            Dict[str, List[Any]]: The same dictionary as calculate_signals().
+        """
+        # Read the version before the data, so a concurrent ingest can only make the stored signals stale
+        version = db_manager.data_version(symbol, timeframe)
+        batch = db_manager.get_signals(self.config, symbol, timeframe, data_version=version)
+        if batch is None:
+            market_data = pd.DataFrame(
+                db_manager.get_market_columns(symbol, timeframe), copy=False
+            )
+            self.initialize(market_data)
+            batch = TradingSignalBatch.from_hln(self.calculate_hln())
+            db_manager.store_signals(batch, self.config, symbol, timeframe, data_version=version)
+        return self.format_signals(batch.to_hln_result())
+
+    def update_signals(self, new_bars: pd.DataFrame) -> Dict[str, List[Any]]:
+        """
+        Feed new bars to the strategy and return only the newly confirmed HLN points.
+
+        The first call replays the data passed to initialize() once; later calls
+        only process the new bars, so live feeds do not recompute the history.
+
+        Parameters:
+        new_bars (pd.DataFrame): Bars received since the previous call, in time order.
+
+        Returns:
+            Dict[str, List[Any]]: A dictionary containing the new HLN points and timestamps.
+
         Raises:
             ValueError: If the strategy is not initialized with market data.
         """
         if not self.hln_calculator:
             raise ValueError("Strategy not initialized with market data")
 
-        hln_points, timestamps = self.hln_calculator.calculate_hln_lines()
+        if self.incremental_hln is None:
+            self.incremental_hln = IncrementalHLNCalculator(
+                tenkan_period=self.config["tenkan_period"],
+                confidence_level=self.confidence_level,
+                anchor=self.anchor,
+            )
+            self.incremental_hln.extend(self.market_data)
 
-        return {"hln_points": hln_points, "timestamps": timestamps}
+        return self.format_signals(self.incremental_hln.extend(new_bars))
@@ -3,26 +3,22 @@ import os
 # Add the project root directory to sys.path
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import pandas as pd
-import sqlite3
 import matplotlib.pyplot as plt
 import mplfinance as mpf
 from utils.indicators import TechnicalIndicators
 from config.settings import TRADING_PARAMS, ICHIMOKU_COLORS
+from database.db_manager import DatabaseManager
 
 # اتصال به دیتابیس
 def get_market_data():
-    db_path = "..\\vortex.db"
-    query = "SELECT * FROM market_data ORDER BY date_time DESC LIMIT 1000"
-    df = pd.read_sql(query, sqlite3.connect(db_path))
-    df = df.sort_values(by="date_time")
-    return df
+    db_path = os.path.join(os.path.dirname(__file__), '..', 'vortex.db')
+    with DatabaseManager(db_path) as db_manager:
+        return db_manager.get_market_data(last_n=1000)
 
 # دریافت داده‌ها
 market_data = get_market_data()
 
 # ایجاد چارت کندل‌استیک
-market_data['date_time'] = pd.to_datetime(market_data['date_time'])
 market_data.set_index('date_time', inplace=True)
 
 # افزودن سری کندل‌استیک
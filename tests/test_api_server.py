@@ -0,0 +1,101 @@
+import importlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from config.settings import API
+from database.db_manager import DatabaseManager
+from strategy.strategy import DEFAULT_CONFIG
+from utils.cache import CachedIndicators, IndicatorCache
+
+
+class TestAPIServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # The module opens its default database in the working directory on import
+        cls.tmp = tempfile.TemporaryDirectory()
+        cwd = os.getcwd()
+        os.chdir(cls.tmp.name)
+        try:
+            cls.api_server = importlib.import_module("api.api_server")
+        finally:
+            os.chdir(cwd)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.api_server.db_manager.close()
+        cls.tmp.cleanup()
+
+    def setUp(self):
+        db_manager = DatabaseManager(":memory:")
+        self.addCleanup(db_manager.close)
+        for name, value in (
+            ("db_manager", db_manager),
+            ("indicator_cache", CachedIndicators()),
+            ("response_cache", IndicatorCache()),
+        ):
+            patcher = patch.object(self.api_server, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        seeded = patch.dict(DEFAULT_CONFIG, hln_seed="low")
+        seeded.start()
+        self.addCleanup(seeded.stop)
+        self.client = self.api_server.app.test_client()
+
+        periods = 120
+        rng = np.random.default_rng(1)
+        closes = 100 + np.cumsum(rng.normal(0, 1, periods))
+        times = pd.date_range("2024-01-01", periods=periods, freq="h")
+        self.csv = pd.DataFrame({
+            "Date": times.strftime("%Y-%m-%d"),
+            "Time": times.strftime("%H:%M:%S"),
+            "Open": closes,
+            "High": closes + rng.uniform(0, 2, periods),
+            "Low": closes - rng.uniform(0, 2, periods),
+            "Close": closes,
+            "Volume": rng.integers(1000, 10000, periods),
+        }).to_csv(index=False).encode()
+
+    def upload(self):
+        response = self.client.post("/upload_data", data={
+            "file": (io.BytesIO(self.csv), "bars.csv"), "symbol": "EURUSD", "timeframe": "H1",
+        })
+        self.assertEqual(response.status_code, 200)
+
+    def test_signals(self):
+        self.upload()
+        response = self.client.get("/signals?symbol=EURUSD&timeframe=H1")
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(len(response.get_json()["hln_timestamps"]), 0)
+
+        calculated = self.client.get("/calculate_signals?symbol=EURUSD&timeframe=H1").get_json()
+        self.assertEqual(calculated["timestamps"], response.get_json()["hln_timestamps"])
+
+    def test_signals_of_missing_or_changed_series(self):
+        response = self.client.get("/signals?symbol=NONE")
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.get_json()["status"], "error")
+
+        self.upload()
+        # The stored signals went stale between the calculation and the read
+        with patch.object(self.api_server.db_manager, "get_signals", return_value=None):
+            response = self.client.get("/signals?symbol=EURUSD&timeframe=H1")
+        self.assertEqual(response.status_code, 409)
+
+    def test_bulk_ingest_stays_inside_root(self):
+        with tempfile.TemporaryDirectory() as root, patch.dict(API, BULK_INGEST_ROOT=root):
+            with open(os.path.join(root, "EURUSD_H1.csv"), "wb") as f:
+                f.write(self.csv)
+            for source in ("/etc", "../*.csv"):
+                response = self.client.post("/bulk_ingest", data={"source": source})
+                self.assertEqual(response.status_code, 400, source)
+            response = self.client.post("/bulk_ingest", data={"source": "*.csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()["files"][0]["counts"]["inserted"], 120)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+import asyncio
+import io
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest.mock import AsyncMock, patch
+import numpy as np
+import pandas as pd
+from api.asgi_server import VortexASGI
+from config.settings import API
+from data.data_processor import DataProcessor
+from database.async_db import AsyncDatabaseManager
+from database.db_manager import DatabaseManager
+from strategy.strategy import DEFAULT_CONFIG, VortexStrategy
+
+
+def send_request(app, method, path, query="", body=b"", headers=()):
+    """Drive one HTTP request through the ASGI app and return (status, response headers, raw body)."""
+    async def call():
+        messages = [{"type": "http.request", "body": body, "more_body": False}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            "type": "http", "method": method, "path": path, "query_string": query.encode(),
+            "headers": [(name.encode(), value.encode()) for name, value in headers],
+        }
+        await app(scope, receive, send)
+        response_headers = {name.decode(): value.decode() for name, value in sent[0]["headers"]}
+        return sent[0]["status"], response_headers, sent[1]["body"]
+
+    return asyncio.run(call())
+
+
+def request(app, method, path, query="", body=b""):
+    """Drive one HTTP request through the ASGI app and return (status, decoded JSON)."""
+    status, _, raw = send_request(app, method, path, query, body)
+    return status, json.loads(raw)
+
+
+class TestASGIServer(unittest.TestCase):
+    def setUp(self):
+        # Seed the HLN state machine so the served signals are not empty
+        seeded = patch.dict(DEFAULT_CONFIG, hln_seed="low")
+        seeded.start()
+        self.addCleanup(seeded.stop)
+        self.app = VortexASGI(db_name=":memory:", compute_workers=2)
+        periods = 120
+        rng = np.random.default_rng(1)
+        closes = 100 + np.cumsum(rng.normal(0, 1, periods))
+        times = pd.date_range("2024-01-01", periods=periods, freq="h")
+        self.csv = pd.DataFrame({
+            "Date": times.strftime("%Y-%m-%d"),
+            "Time": times.strftime("%H:%M:%S"),
+            "Open": closes,
+            "High": closes + rng.uniform(0, 2, periods),
+            "Low": closes - rng.uniform(0, 2, periods),
+            "Close": closes,
+            "Volume": rng.integers(1000, 10000, periods),
+        }).to_csv(index=False).encode()
+
+    def tearDown(self):
+        self.app.shutdown()
+
+    def test_upload_and_signals(self):
+        status, payload = request(
+            self.app, "POST", "/upload_data", "symbol=EURUSD&timeframe=H1", self.csv)
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["counts"]["inserted"], 120)
+
+        status, signals = request(
+            self.app, "GET", "/calculate_signals", "symbol=EURUSD&timeframe=H1")
+        self.assertEqual(status, 200)
+        self.assertGreater(len(signals["timestamps"]), 0)
+        market_data = self.app.db.db_manager.get_market_data(symbol="EURUSD", timeframe="H1")
+        expected = VortexStrategy()
+        expected.initialize(market_data)
+        self.assertEqual(signals, expected.calculate_signals())
+
+        status, catalog = request(self.app, "GET", "/catalog")
+        self.assertEqual([(row["symbol"], row["rows"]) for row in catalog], [("EURUSD", 120)])
+
+    def test_signals_etag(self):
+        request(self.app, "POST", "/upload_data", "symbol=EURUSD&timeframe=H1", self.csv)
+        query = "symbol=EURUSD&timeframe=H1"
+
+        status, headers, body = send_request(self.app, "GET", "/calculate_signals", query)
+        self.assertEqual(status, 200)
+        self.assertGreater(len(json.loads(body)["timestamps"]), 0)
+        etag = headers["etag"]
+
+        # Unchanged data: answered from the response cache, or with 304 when the client has it
+        with patch.object(self.app, "_ensure_signals", side_effect=AssertionError):
+            self.assertEqual(send_request(self.app, "GET", "/calculate_signals", query)[2], body)
+            status, headers, cached = send_request(
+                self.app, "GET", "/calculate_signals", query, headers=[("If-None-Match", f'"x", W/{etag}')])
+        self.assertEqual((status, headers["etag"], cached), (304, etag, b""))
+        self.assertEqual(self.app.response_cache.stats()["hits"], 1)
+
+        # A new bar bumps the data version, so the old tag no longer matches
+        times = pd.date_range("2024-01-06", periods=1, freq="h")
+        bar = pd.DataFrame({
+            "Date": times.strftime("%Y-%m-%d"), "Time": times.strftime("%H:%M:%S"),
+            "Open": 100.0, "High": 101.0, "Low": 99.0, "Close": 100.5, "Volume": 1000,
+        }).to_csv(index=False).encode()
+        request(self.app, "POST", "/upload_data", "symbol=EURUSD&timeframe=H1&mode=append", bar)
+        status, headers, body = send_request(
+            self.app, "GET", "/calculate_signals", query, headers=[("If-None-Match", etag)])
+        self.assertEqual(status, 200)
+        self.assertNotEqual(headers["etag"], etag)
+        # The new response is computed over the appended data, not served from the old entry
+        expected = VortexStrategy()
+        expected.initialize(self.app.db.db_manager.get_market_data(symbol="EURUSD", timeframe="H1"))
+        self.assertEqual(len(expected.market_data), 121)
+        self.assertEqual(json.loads(body), expected.calculate_signals())
+        self.assertEqual(json.loads(body)["timestamps"][-1], 120)
+        self.assertEqual(send_request(self.app, "GET", "/calculate_signals", query)[2], body)
+
+    def test_ingest_runs_outside_the_database_executor(self):
+        threads = []
+        save = DataProcessor.save_dataframe
+
+        def record(*args, **kwargs):
+            threads.append(threading.current_thread().name)
+            return save(*args, **kwargs)
+
+        with patch.object(DataProcessor, "save_dataframe", autospec=True, side_effect=record):
+            status, _ = request(self.app, "POST", "/upload_data", "symbol=EURUSD&timeframe=H1", self.csv)
+        self.assertEqual(status, 200)
+        self.assertTrue(threads[0].startswith("vortex-ingest"), threads)
+
+    def test_process_pool_signals(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            app = VortexASGI(db_name=os.path.join(tmp, "test.db"), compute_workers=1)
+            try:
+                request(app, "POST", "/upload_data", "symbol=EURUSD&timeframe=H1", self.csv)
+                # The strategy config travels with the call, so the spawned worker sees the seed
+                status, signals = request(app, "GET", "/calculate_signals", "symbol=EURUSD&timeframe=H1")
+                self.assertEqual(status, 200)
+                self.assertGreater(len(signals["timestamps"]), 0)
+                status, signals = request(app, "GET", "/calculate_signals", "symbol=GBPUSD&timeframe=H1")
+                self.assertEqual(status, 500)
+            finally:
+                app.shutdown()
+
+    def test_signals_of_missing_or_changed_series(self):
+        self.assertEqual(request(self.app, "GET", "/signals", "symbol=NONE")[0], 404)
+        request(self.app, "POST", "/upload_data", "symbol=EURUSD&timeframe=H1", self.csv)
+        status, points = request(self.app, "GET", "/signals", "symbol=EURUSD&timeframe=H1")
+        self.assertEqual(status, 200)
+        self.assertGreater(len(points["hln_timestamps"]), 0)
+
+        # The stored signals went stale between the calculation and the read
+        with patch.object(self.app.db, "get_signals", AsyncMock(return_value=None)), \
+                patch.object(self.app, "_ensure_signals", AsyncMock()):
+            status, payload = request(self.app, "GET", "/signals", "symbol=EURUSD&timeframe=H1")
+        self.assertEqual((status, payload["status"]), (409, "error"))
+
+    def test_bulk_ingest_stays_inside_root(self):
+        with tempfile.TemporaryDirectory() as root, patch.dict(API, BULK_INGEST_ROOT=root):
+            with open(os.path.join(root, "EURUSD_H1.csv"), "wb") as f:
+                f.write(self.csv)
+            for source in ("/etc", "../*.csv"):
+                status, _ = request(self.app, "POST", "/bulk_ingest", f"source={source}")
+                self.assertEqual(status, 400, source)
+            status, payload = request(self.app, "POST", "/bulk_ingest", "source=.")
+        self.assertEqual(status, 200)
+        self.assertEqual(payload["files"][0]["counts"]["inserted"], 120)
+
+    def test_unknown_route_and_errors(self):
+        self.assertEqual(request(self.app, "GET", "/missing")[0], 404)
+        status, payload = request(self.app, "GET", "/calculate_signals", "symbol=NONE")
+        self.assertEqual(status, 500)
+        self.assertEqual(payload["status"], "error")
+
+    def test_async_database_manager(self):
+        async def run():
+            async with AsyncDatabaseManager(DatabaseManager(":memory:"), max_workers=4) as db:
+                frame = pd.read_csv(io.BytesIO(self.csv))
+                await db.store_market_data(frame, symbol="EURUSD", timeframe="H1")
+                results = await asyncio.gather(*[
+                    db.get_market_data(symbol="EURUSD", timeframe="H1", last_n=10)
+                    for _ in range(8)
+                ])
+                return results, await db.data_version("EURUSD", "H1")
+
+        results, version = asyncio.run(run())
+        self.assertTrue(all(len(result) == 10 for result in results))
+        self.assertEqual(version, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import unittest
+from unittest.mock import patch
+import pandas as pd
+from data.bulk_ingest import BulkIngestor, _parse_file, main, series_from_name
+from database.db_manager import DatabaseManager
+
+
+def write_bars(path, start, periods, mode="w", header=True):
+    times = pd.date_range(start, periods=periods, freq='min')
+    pd.DataFrame({
+        'Date': times.strftime('%Y.%m.%d'), 'Time': times.strftime('%H:%M'),
+        'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 10,
+    }).to_csv(path, mode=mode, header=header, index=False)
+
+
+class TestBulkIngest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.db_manager = DatabaseManager(":memory:")
+        self.addCleanup(self.db_manager.close)
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_series_from_name(self):
+        self.assertEqual(series_from_name("/data/EURUSD_M1.csv"), ("EURUSD", "M1"))
+        self.assertEqual(series_from_name("GBP_USD-h1.csv"), ("GBP_USD", "H1"))
+        self.assertEqual(series_from_name("EURUSD1.csv"), ("EURUSD1", None))
+
+    def test_ingest_directory(self):
+        write_bars(self.path("EURUSD_M1.csv"), '2023-10-01 10:00', 30)
+        write_bars(self.path("EURUSD-M1.csv"), '2023-10-01 10:20', 30)
+        write_bars(self.path("GBPUSD_M30.csv"), '2023-10-01', 5)
+        with open(self.path("broken.csv"), "w") as f:
+            f.write("Date,Time,Open\n2023.10.01,xx,1\n")
+        ingestor = BulkIngestor(self.db_manager, max_workers=2, executor="thread")
+
+        results = {os.path.basename(r.path): r for r in ingestor.ingest(self.tmp.name)}
+
+        self.assertEqual(results["GBPUSD_M30.csv"].counts["inserted"], 5)
+        self.assertEqual((results["GBPUSD_M30.csv"].symbol, results["GBPUSD_M30.csv"].timeframe),
+                         ("GBPUSD", "M30"))
+        self.assertIsNotNone(results["broken.csv"].error)
+        catalog = self.db_manager.get_catalog().set_index(['symbol', 'timeframe'])
+        self.assertEqual(catalog.loc[('EURUSD', 'M1'), 'rows'], 50)
+        self.assertEqual(
+            results["EURUSD_M1.csv"].counts["skipped"] + results["EURUSD-M1.csv"].counts["skipped"], 10)
+        # Nothing new: nothing is read again
+        self.assertEqual(ingestor.ingest(self.tmp.name), [])
+
+    def test_sources_stay_inside_root(self):
+        root = self.path("incoming")
+        os.makedirs(os.path.join(root, "daily", "old"))
+        write_bars(os.path.join(root, "daily", "EURUSD_M1.csv"), '2023-10-01 10:00', 5)
+        write_bars(self.path("GBPUSD_M1.csv"), '2023-10-01 10:00', 5)
+        os.symlink(self.path("GBPUSD_M1.csv"), os.path.join(root, "daily", "GBPUSD_M1.csv"))
+        ingestor = BulkIngestor(self.db_manager, executor="thread", root=root)
+
+        for source in ("..", "../*.csv", self.tmp.name, "daily/*/../../../GBPUSD_M1.csv", "daily"):
+            with self.assertRaises(ValueError, msg=source):
+                ingestor.ingest(source)
+        self.assertTrue(self.db_manager.get_catalog().empty)
+
+        os.remove(os.path.join(root, "daily", "GBPUSD_M1.csv"))
+        self.assertEqual(
+            ingestor.files("daily"), [os.path.join(os.path.realpath(root), "daily", "EURUSD_M1.csv")])
+        self.assertEqual(ingestor.ingest(os.path.join(root, "daily", "*.csv"))[0].counts["inserted"], 5)
+
+    def test_files_are_parsed_in_bounded_slices(self):
+        write_bars(self.path("EURUSD_M1.csv"), '2023-10-01 10:00', 50)
+        write_bars(self.path("GBPUSD_M1.csv"), '2023-10-01 10:00', 40)
+        # A bar repeated across a slice boundary is still reported as a duplicate
+        write_bars(self.path("GBPUSD_M1.csv"), '2023-10-01 10:39', 1, mode="a", header=False)
+        in_flight, peak = 0, 0
+        lock = threading.Lock()
+
+        def parse(*args):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            try:
+                return _parse_file(*args)
+            finally:
+                with lock:
+                    in_flight -= 1
+
+        ingestor = BulkIngestor(self.db_manager, max_workers=2, executor="thread", chunk_bytes=200)
+        with patch("data.bulk_ingest._parse_file", side_effect=parse) as parsed:
+            results = {os.path.basename(r.path): r for r in ingestor.ingest(self.tmp.name)}
+
+        self.assertGreater(parsed.call_count, 10)
+        self.assertLessEqual(peak, 2)
+        self.assertEqual((results["EURUSD_M1.csv"].rows, results["EURUSD_M1.csv"].counts["inserted"]), (50, 50))
+        self.assertEqual(results["GBPUSD_M1.csv"].counts, {"inserted": 40, "updated": 0, "skipped": 1})
+        self.assertEqual(results["GBPUSD_M1.csv"].validation["counts"], {"duplicate": 1})
+        self.assertEqual(results["EURUSD_M1.csv"].offset, os.path.getsize(self.path("EURUSD_M1.csv")))
+        self.assertEqual(len(self.db_manager.get_market_data(symbol="EURUSD")), 50)
+
+    def test_locked_database_is_retried(self):
+        path = self.path("EURUSD_M1.csv")
+        write_bars(path, '2023-10-01 10:00', 10)
+        db_name = self.path("test.db")
+        pragmas = {"journal_mode": "WAL", "busy_timeout": 200}
+        with DatabaseManager(db_name, pragmas=pragmas, mirror_dir=self.path("columns")) as db_manager:
+            ingestor = BulkIngestor(db_manager, executor="thread")
+            blocker = sqlite3.connect(db_name, isolation_level=None)
+            blocker.execute("BEGIN IMMEDIATE")
+            with patch("builtins.print"):
+                results = ingestor.ingest(path)
+            blocker.rollback()
+            blocker.close()
+
+            self.assertIsNotNone(results[0].error)
+            self.assertIsNone(results[0].counts)
+            self.assertNotIn(path, ingestor.offsets)
+            self.assertEqual(len(db_manager.get_market_data(symbol="EURUSD")), 0)
+
+            results = ingestor.ingest(path)
+            self.assertEqual((results[0].error, results[0].counts["inserted"]), (None, 10))
+            self.assertEqual(len(db_manager.get_market_data(symbol="EURUSD")), 10)
+
+    def test_appended_bytes_are_picked_up(self):
+        path = self.path("EURUSD_M1.csv")
+        write_bars(path, '2023-10-01 10:00', 10)
+        ingestor = BulkIngestor(self.db_manager, executor="thread")
+        ingestor.ingest(path)
+
+        write_bars(path, '2023-10-01 10:10', 5, mode="a", header=False)
+        with open(path, "a") as f:
+            f.write("2023.10.01,10:15,1.0,2.0")
+        results = list(ingestor.run(path, complete_lines=True))
+        self.assertEqual((results[0].rows, results[0].counts["inserted"]), (5, 5))
+        self.assertEqual(results[0].offset, os.path.getsize(path) - len("2023.10.01,10:15,1.0,2.0"))
+
+        with open(path, "a") as f:
+            f.write(",0.5,1.5,10\n")
+        results = list(ingestor.run(path, complete_lines=True))
+        self.assertEqual(results[0].rows, 1)
+        self.assertEqual(len(self.db_manager.get_market_data(symbol="EURUSD")), 16)
+
+        # A rewritten (shorter) file is read from the start
+        write_bars(path, '2023-10-02', 3)
+        results = list(ingestor.run(path, complete_lines=True))
+        self.assertEqual(results[0].counts["inserted"], 3)
+
+    def test_watch(self):
+        path = self.path("EURUSD_M1.csv")
+        write_bars(path, '2023-10-01 10:00', 10)
+        ingestor = BulkIngestor(self.db_manager, executor="thread")
+        stop = threading.Event()
+        results = []
+
+        def on_result(result):
+            results.append(result)
+            if len(results) == 1:
+                write_bars(path, '2023-10-01 10:10', 5, mode="a", header=False)
+            else:
+                stop.set()
+
+        ingestor.watch(self.tmp.name, interval=0.01, stop=stop, on_result=on_result)
+        self.assertEqual([r.rows for r in results], [10, 5])
+
+    def test_process_workers_and_cli(self):
+        write_bars(self.path("EURUSD_M1.csv"), '2023-10-01 10:00', 10)
+        write_bars(self.path("GBPUSD_M1.csv"), '2023-10-01 10:00', 20)
+        db_name = self.path("test.db")
+        with patch("builtins.print"):
+            self.assertEqual(main([os.path.join(self.tmp.name, "*.csv"), "--db", db_name, "--workers", "2"]), 0)
+        with DatabaseManager(db_name) as db_manager:
+            catalog = db_manager.get_catalog().set_index(['symbol', 'timeframe'])
+            self.assertEqual(catalog.loc[('GBPUSD', 'M1'), 'rows'], 20)
+            self.assertEqual(catalog.loc[('EURUSD', 'H1'), 'rows'], 1)
+            self.assertEqual(len(db_manager.get_market_columns(symbol='GBPUSD')['close']), 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
+import os
+import sqlite3
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
+import numpy as np
 import pandas as pd
 from data.data_processor import DataProcessor
 from database.db_manager import DatabaseManager
+from utils.helpers import DataHelper
 
 
 class TestDataProcessor(unittest.TestCase):
@@ -15,28 +20,104 @@ class TestDataProcessor(unittest.TestCase):
         self.data_processor.set_file_path(file_path)
         self.assertEqual(self.data_processor.file_path, file_path)
 
-    @patch('pandas.read_csv')
-    def test_check_duplicates(self, mock_read_csv):
-        existing_data = pd.DataFrame({
-            'date': ['2023-10-01'],
-            'time': ['10:00:00'],
-            'date_time': ['2023-10-01 10:00:00']
+    def test_check_duplicates(self):
+        existing = pd.DataFrame({
+            'Date': ['2023-10-01', '2023-10-01'],
+            'Time': ['10:00:00', '10:01:00'],
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1
         })
-        self.db_manager.get_market_data.return_value = existing_data
-
         new_data = pd.DataFrame({
-            'Date': ['2023-10-01'],
-            'Time': ['10:00:00'],
-            'date_time': ['2023-10-01 10:00:00']
+            'Date': ['2023.10.01', '2023.10.01', '2023.10.01'],
+            'Time': ['09:59', '10:01', '10:02'],
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, "file.csv")
+            new_data.to_csv(file_path, index=False)
+            with DatabaseManager(":memory:") as db_manager:
+                data_processor = DataProcessor(db_manager)
+                self.assertFalse(data_processor.check_duplicates(file_path))
+                db_manager.store_market_data(existing)
+
+                self.assertTrue(data_processor.check_duplicates(file_path))
+                self.assertFalse(data_processor.check_duplicates(file_path, symbol="OTHER"))
+                overlap = data_processor.find_overlap(file_path)
+                ts = pd.to_datetime(['2023-10-01 09:59', '2023-10-01 10:01', '2023-10-01 10:02'])
+                self.assertEqual(overlap, {
+                    "rows": 1, "first_ts": ts[1].value, "last_ts": ts[1].value,
+                    "file_first_ts": ts[0].value, "file_last_ts": ts[2].value})
+
+    def test_ingest_modes(self):
+        times = pd.date_range('2023-10-01 10:00', periods=6, freq='min')
+        stored = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1
         })
-        mock_read_csv.return_value = new_data
+        # Bars 10:02 and 10:04 with new values, 10:03 missing, 10:07 new
+        new_data = stored.iloc[[2, 4]].assign(Volume=5)
+        new_data = pd.concat([new_data, pd.DataFrame({
+            'Date': ['2023-10-01'], 'Time': ['10:07:00'],
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 5})])
+        with self.assertRaises(ValueError):
+            self.data_processor.set_mode("merge")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, "file.csv")
+            new_data.to_csv(file_path, index=False)
+            for mode, expected_volume in (
+                ("new_only", {"10:00": 1, "10:01": 1, "10:02": 1, "10:03": 1, "10:04": 1,
+                              "10:05": 1, "10:07": 5}),
+                # Every stored bar from the file's first (10:02) to last (10:07) bar is replaced
+                ("replace_range", {"10:00": 1, "10:01": 1, "10:02": 5, "10:04": 5, "10:07": 5}),
+            ):
+                with DatabaseManager(":memory:") as db_manager:
+                    db_manager.store_market_data(stored)
+                    data_processor = DataProcessor(db_manager)
+                    data_processor.set_file_path(file_path)
+                    data_processor.set_mode(mode)
+
+                    counts = data_processor.process_and_save(chunk_size=2)
+
+                    result = db_manager.get_market_data()
+                    volumes = dict(zip(result['date_time'].dt.strftime('%H:%M'), result['volume']))
+                    self.assertEqual(volumes, expected_volume, mode)
+                    if mode == "replace_range":
+                        self.assertEqual(counts, {"inserted": 3, "updated": 0, "skipped": 0, "deleted": 4})
+
+    def test_replace_is_atomic(self):
+        times = pd.date_range('2023-10-01 10:00', periods=6, freq='min')
+        stored = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, "file.csv")
+            stored.assign(Volume=5).to_csv(file_path, index=False)
+            for mode in ("replace", "replace_range"):
+                with DatabaseManager(":memory:") as db_manager:
+                    db_manager.store_market_data(stored)
+                    version = db_manager.data_version()
+                    data_processor = DataProcessor(db_manager)
+                    data_processor.set_file_path(file_path)
+                    store = db_manager.store_market_data
+
+                    def fail_on_second_chunk(*args, **kwargs):
+                        if fail_on_second_chunk.calls:
+                            raise sqlite3.OperationalError("disk I/O error")
+                        fail_on_second_chunk.calls += 1
+                        return store(*args, **kwargs)
 
-        has_duplicates = self.data_processor.check_duplicates(
-            "path/to/file.csv")
-        self.assertTrue(has_duplicates)
+                    fail_on_second_chunk.calls = 0
+                    with patch.object(db_manager, "store_market_data", side_effect=fail_on_second_chunk), \
+                            patch('builtins.print'), self.assertRaises(sqlite3.OperationalError):
+                        data_processor.process_and_save(mode=mode, chunk_size=2)
 
-    @patch('pandas.read_csv')
-    def test_process_and_save(self, mock_read_csv):
+                    # Neither the delete nor the first chunk was committed
+                    result = db_manager.get_market_data()
+                    self.assertEqual(result['volume'].tolist(), [1] * 6, mode)
+                    self.assertEqual(db_manager.data_version(), version)
+
+    def test_process_and_save(self):
         data = pd.DataFrame({
             'Date': ['2023-10-01'],
             'Time': ['10:00:00'],
@@ -44,15 +125,77 @@ class TestDataProcessor(unittest.TestCase):
             'High': [105.0],
             'Low': [95.0],
             'Close': [102.0],
-            'Volume': [1000]
+            'Volume': [1000.0]
         })
-        mock_read_csv.return_value = data
-        self.data_processor.set_file_path("path/to/file.csv")
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, "file.csv")
+            data.to_csv(file_path, index=False)
+            self.data_processor.set_file_path(file_path)
+
+            self.db_manager.store_market_data.return_value = {
+                "inserted": 1, "updated": 0, "skipped": 0}
+
+            counts = self.data_processor.process_and_save(
+                mode="append", symbol="EURUSD")
+
+        self.db_manager.drop_market_data.assert_not_called()
+        self.db_manager.store_market_data.assert_called_once()
+        args, kwargs = self.db_manager.store_market_data.call_args
+        expected = data.assign(
+            date_time=['2023-10-01 10:00:00'],
+            ts=[pd.Timestamp('2023-10-01 10:00:00').value])
+        pd.testing.assert_frame_equal(args[0], expected, check_dtype=False)
+        self.assertEqual(
+            kwargs, {"mode": "append", "symbol": "EURUSD", "timeframe": None})
+        self.assertEqual(counts["inserted"], 1)
+
+    def test_process_and_save_streams_chunks(self):
+        times = pd.date_range('2023-10-01 10:00', periods=7, freq='min')
+        data = pd.DataFrame({
+            'Date': times.strftime('%Y.%m.%d'),
+            'Time': times.strftime('%H:%M'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 10,
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            file_path = os.path.join(tmp, "file.csv")
+            data.to_csv(file_path, index=False)
+            with DatabaseManager(os.path.join(tmp, "test.db")) as db_manager:
+                db_manager.store_market_data(data.iloc[:1].assign(Date='2020.01.01'))
+                data_processor = DataProcessor(db_manager)
+                data_processor.set_file_path(file_path)
+                progress = []
+
+                counts = data_processor.process_and_save(
+                    chunk_size=3, progress=lambda *args: progress.append(args))
+
+                stored = db_manager.get_market_columns()
+                self.assertEqual(counts, {"inserted": 7, "updated": 0, "skipped": 0})
+                # The first chunk replaced the stored series, later chunks were appended
+                np.testing.assert_array_equal(
+                    stored["date_time"], times.to_numpy(dtype="datetime64[ns]"))
+                self.assertEqual(stored["volume"].tolist(), [10] * 7)
+                self.assertEqual([p[0] for p in progress], [3, 6, 7])
+                size = os.path.getsize(file_path)
+                self.assertEqual(progress[-1][1:], (size, size))
+
+
+class TestParseTimestamps(unittest.TestCase):
+    def test_fixed_formats(self):
+        times = pd.date_range('1899-12-31 23:00', periods=1000, freq='37h')
+        expected = times.as_unit('ns').asi8
+        for date_format, time_format in [('%Y.%m.%d', '%H:%M'), ('%Y-%m-%d', '%H:%M:%S')]:
+            parsed = DataHelper.parse_timestamps(
+                times.strftime(date_format), times.strftime(time_format))
+            np.testing.assert_array_equal(parsed, expected)
 
-        self.data_processor.process_and_save()
+    def test_falls_back_for_other_formats(self):
+        parsed = DataHelper.parse_timestamps(['2023/10/01', '2024/02/29'], ['1:05', '23:59'])
+        expected = [pd.Timestamp('2023-10-01 01:05').value, pd.Timestamp('2024-02-29 23:59').value]
+        self.assertEqual(parsed.tolist(), expected)
 
-        self.db_manager.drop_market_data.assert_called_once()
-        self.db_manager.store_market_data.assert_called_once_with(data)
+    def test_invalid_dates_are_rejected(self):
+        with self.assertRaises(ValueError):
+            DataHelper.parse_timestamps(['2023.02.30'], ['10:00'])
 
 
 if __name__ == '__main__':
@@ -1,21 +1,68 @@
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest.mock import patch
 import unittest
-from unittest.mock import patch, MagicMock
 import sqlite3
+import numpy as np
 import pandas as pd
+from config.settings import DATABASE
+from database.columnar import ColumnarMirror
 from database.db_manager import DatabaseManager
+from database.models import TradingSignalBatch
+from strategy.hln_engine import HIGH, LOW
+from strategy.hln_result import HLNResult
+from utils.helpers import TimeframeConverter
 
 
 class TestDatabaseManager(unittest.TestCase):
     def setUp(self):
         self.db_manager = DatabaseManager(db_name=":memory:")
 
-    @patch('sqlite3.connect')
-    def test_get_connection(self, mock_connect):
-        mock_conn = MagicMock()
-        mock_connect.return_value = mock_conn
+    def test_get_connection(self):
         with self.db_manager.get_connection() as conn:
-            self.assertEqual(conn, mock_conn)
-        mock_conn.close.assert_called_once()
+            first = conn
+            with self.db_manager.get_connection() as nested:
+                self.assertIs(nested, first)
+        with self.db_manager.get_connection() as conn:
+            self.assertIs(conn, first)
+        stats = self.db_manager.pool_stats()
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["in_use"], 0)
+
+        self.db_manager.close()
+        with self.assertRaises(sqlite3.ProgrammingError):
+            first.execute("SELECT 1")
+
+    def test_connection_pragmas(self):
+        with tempfile.TemporaryDirectory() as directory:
+            db_manager = DatabaseManager(db_name=os.path.join(directory, "test.db"))
+            with db_manager.get_connection() as conn:
+                self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+            db_manager.close()
+
+    def test_concurrent_readers_share_pool(self):
+        db_manager = DatabaseManager(db_name=":memory:", pool_size=2)
+        barrier = threading.Barrier(2)
+        errors = []
+
+        def read():
+            try:
+                with db_manager.get_connection() as conn:
+                    barrier.wait(timeout=5)
+                    conn.execute("SELECT COUNT(*) FROM market_data").fetchone()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=read) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(db_manager.pool_stats()["created"], 2)
 
     def test_create_tables(self):
         with self.db_manager.get_connection() as conn:
@@ -26,21 +73,101 @@ class TestDatabaseManager(unittest.TestCase):
             self.assertIsNotNone(table_exists)
 
     def test_drop_market_data(self):
-        with self.db_manager.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='market_data'")
-            table_exists = cursor.fetchone()
-            self.assertIsNotNone(table_exists)
+        times = pd.date_range('2023-10-01 10:00', periods=120, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1,
+        })
+        self.db_manager.store_market_data(df)
+        self.assertEqual(len(self.db_manager.get_market_data(timeframe="H1")), 2)
+        versions = self.db_manager.get_catalog()['version']
 
         self.db_manager.drop_market_data()
 
+        # The schema is recreated empty, so reads of any timeframe find no bars
         with self.db_manager.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "SELECT name FROM sqlite_master WHERE type='table' AND name='market_data'")
-            table_exists = cursor.fetchone()
-            self.assertIsNone(table_exists)
+            cursor.execute("SELECT COUNT(*) FROM market_data")
+            self.assertEqual(cursor.fetchone()[0], 0)
+        self.assertEqual(len(self.db_manager.get_market_data(timeframe="H1")), 0)
+        self.assertEqual(len(self.db_manager.get_market_data()), 0)
+        self.assertTrue(self.db_manager.get_catalog().empty)
+
+        # Versions do not restart, so a version of the dropped data never comes back
+        self.db_manager.drop_market_data()
+        self.db_manager.store_market_data(df)
+        self.assertGreater(self.db_manager.data_version(), versions.max())
+
+    def test_transaction(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01', '2023-10-01'], 'Time': ['10:00:00', '10:01:00'],
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1,
+        })
+        with self.db_manager.transaction():
+            self.db_manager.store_market_data(df.iloc[:1])
+            self.db_manager.store_market_data(df.iloc[1:], mode="append")
+        self.assertEqual(len(self.db_manager.get_market_data()), 2)
+
+        # Errors inside the block are raised and undo every write in it
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.db_manager.transaction() as conn:
+                self.db_manager.delete_market_data()
+                self.db_manager.store_market_data(df.iloc[:1].assign(Volume=7), mode="append")
+                conn.execute("SELECT * FROM missing_table")
+        self.assertEqual(self.db_manager.get_market_data()['volume'].tolist(), [1, 1])
+        self.assertFalse(self.db_manager._in_transaction())
+
+    def test_write_transactions_lock_up_front(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01'] * 20, 'Time': [f'10:{i:02d}:00' for i in range(20)],
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1,
+        })
+        with tempfile.TemporaryDirectory() as directory:
+            db_name = os.path.join(directory, "test.db")
+            managers = [DatabaseManager(db_name, mirror_dir=None) for _ in range(2)]
+            other = sqlite3.connect(db_name, timeout=0)
+            with managers[0].transaction():
+                # Nothing is written yet, but the write lock is already held
+                with self.assertRaises(sqlite3.OperationalError):
+                    other.execute("BEGIN IMMEDIATE")
+            other.close()
+
+            # Stores read the catalog before writing; concurrent ones wait instead of failing
+            errors = []
+
+            def write(db_manager, offset):
+                try:
+                    for i in range(10):
+                        db_manager.store_market_data(df.iloc[offset + i:offset + i + 1], mode="upsert")
+                except sqlite3.Error as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=write, args=(m, 10 * n)) for n, m in enumerate(managers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(errors, [])
+            self.assertEqual(len(managers[0].get_market_data()), 20)
+            for db_manager in managers:
+                db_manager.close()
+
+    def test_schema_created_once(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01'], 'Time': ['10:00:00'],
+            'Open': [100.0], 'High': [105.0], 'Low': [95.0], 'Close': [102.0], 'Volume': [1000],
+        })
+        with patch.object(self.db_manager, "_create_tables", wraps=self.db_manager._create_tables) as create:
+            self.db_manager.store_market_data(df)
+            self.db_manager.store_market_data(df, mode="append")
+            self.assertEqual(create.call_count, 0)
+
+            # drop_market_data recreates the schema; stores after it do not
+            self.db_manager.drop_market_data()
+            self.db_manager.store_market_data(df)
+            self.db_manager.store_market_data(df, mode="append")
+            self.assertEqual(create.call_count, 1)
+        self.assertEqual(len(self.db_manager.get_market_data()), 1)
 
     def test_store_market_data(self):
         df = pd.DataFrame({
@@ -57,11 +184,101 @@ class TestDatabaseManager(unittest.TestCase):
 
         with self.db_manager.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT * FROM market_data")
+            cursor.execute("SELECT * FROM market_data WHERE timeframe = 'M1'")
             stored_data = cursor.fetchall()
             self.assertEqual(len(stored_data), 1)
-            self.assertEqual(stored_data[0], ('2023-10-01', '10:00:00',
-                             100.0, 105.0, 95.0, 102.0, 1000, '2023-10-01 10:00:00'))
+            self.assertEqual(stored_data[0], ('DEFAULT', 'M1', '2023-10-01', '10:00:00',
+                             100.0, 105.0, 95.0, 102.0, 1000, '2023-10-01 10:00:00',
+                             1696154400000000000))
+
+    def test_store_market_data_modes(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01', '2023-10-01'],
+            'Time': ['10:00:00', '10:01:00'],
+            'Open': [100.0, 102.0],
+            'High': [105.0, 103.0],
+            'Low': [95.0, 101.0],
+            'Close': [102.0, 102.5],
+            'Volume': [1000, 500]
+        })
+        counts = self.db_manager.store_market_data(df, mode="append")
+        self.assertEqual(counts, {"inserted": 2, "updated": 0, "skipped": 0})
+
+        new_bars = pd.DataFrame({
+            'Date': ['2023-10-01', '2023-10-01', '2023-10-01'],
+            'Time': ['10:00:00', '10:01:00', '10:02:00'],
+            'Open': [100.0, 102.0, 102.5],
+            'High': [105.0, 104.0, 103.0],
+            'Low': [95.0, 101.0, 102.0],
+            'Close': [102.0, 103.5, 102.8],
+            'Volume': [1000, 600, 300]
+        })
+        counts = self.db_manager.store_market_data(new_bars, mode="append")
+        self.assertEqual(counts, {"inserted": 1, "updated": 0, "skipped": 2})
+
+        counts = self.db_manager.store_market_data(new_bars, mode="upsert")
+        self.assertEqual(counts, {"inserted": 0, "updated": 1, "skipped": 2})
+        stored = self.db_manager.get_market_data()
+        self.assertEqual(len(stored), 3)
+        self.assertEqual(stored['close'].tolist(), [102.0, 103.5, 102.8])
+
+        counts = self.db_manager.store_market_data(df, mode="replace")
+        self.assertEqual(counts["inserted"], 2)
+        self.assertEqual(len(self.db_manager.get_market_data()), 2)
+
+        with self.assertRaises(ValueError):
+            self.db_manager.store_market_data(df, mode="merge")
+
+    def test_store_market_data_migrates_legacy_table(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "legacy.db")
+            with sqlite3.connect(db_name) as conn:
+                pd.DataFrame({
+                    'open': [100.0], 'high': [105.0], 'low': [95.0], 'close': [102.0],
+                    'volume': [1000], 'date_time': ['2023-10-01 10:00:00']
+                }).to_sql("market_data", conn, index=False)
+            conn.close()
+
+            df = pd.DataFrame({
+                'Date': ['2023-10-01'], 'Time': ['10:01:00'], 'Open': [102.0],
+                'High': [103.0], 'Low': [101.0], 'Close': [102.5], 'Volume': [500]
+            })
+            with DatabaseManager(db_name, mirror_dir=os.path.join(tmp, "columns")) as db_manager:
+                counts = db_manager.store_market_data(df, mode="append")
+
+                self.assertEqual(counts["inserted"], 1)
+                with db_manager.get_connection() as conn:
+                    stored = conn.execute(
+                        "SELECT date, time, date_time FROM market_data WHERE timeframe = 'M1' "
+                        "ORDER BY date_time").fetchall()
+        self.assertEqual(stored, [
+            ('2023-10-01', '10:00:00', '2023-10-01 10:00:00'),
+            ('2023-10-01', '10:01:00', '2023-10-01 10:01:00'),
+        ])
+
+    def test_migrated_legacy_table_is_rolled_up(self):
+        times = pd.date_range('2023-10-01 21:30', periods=300, freq='min')
+        rng = np.random.default_rng(3)
+        bars = pd.DataFrame({
+            'open': rng.random(300), 'high': rng.random(300) + 1, 'low': rng.random(300) - 1,
+            'close': rng.random(300), 'volume': rng.integers(0, 100, 300),
+        })
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "legacy.db")
+            with sqlite3.connect(db_name) as conn:
+                bars.assign(date_time=times.strftime('%Y-%m-%d %H:%M:%S')).to_sql(
+                    "market_data", conn, index=False)
+            conn.close()
+
+            with DatabaseManager(db_name, mirror_dir=os.path.join(tmp, "columns")) as db_manager:
+                stored = db_manager.get_market_data(timeframe='H1')
+                catalog = db_manager.get_catalog().set_index('timeframe')
+
+        expected = TimeframeConverter.resample_ohlcv(bars.assign(datetime=times), '1h')
+        np.testing.assert_array_equal(stored['date_time'].to_numpy(), expected['datetime'].to_numpy())
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            np.testing.assert_allclose(stored[column], expected[column])
+        self.assertEqual(catalog.loc['H1', 'rows'], len(expected))
 
     def test_get_market_data(self):
         df = pd.DataFrame({
@@ -81,6 +298,426 @@ class TestDatabaseManager(unittest.TestCase):
         self.assertEqual(len(retrieved_data), 1)
         self.assertEqual(retrieved_data.iloc[0]['open'], 100.0)
 
+    def test_get_market_data_range_and_tail(self):
+        times = pd.date_range('2023-10-01 10:00', periods=10, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'),
+            'Time': times.strftime('%H:%M:%S'),
+            'Open': range(10),
+            'High': range(1, 11),
+            'Low': range(10),
+            'Close': range(10),
+            'Volume': [100] * 10
+        })
+        self.db_manager.store_market_data(df.iloc[::-1])
+
+        window = self.db_manager.get_market_data(
+            start='2023-10-01 10:02', end='2023-10-01 10:05')
+        self.assertEqual(window['open'].tolist(), [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(window['date_time'].tolist(), list(times[2:6]))
+
+        tail = self.db_manager.get_market_data(last_n=3, columns=['date_time', 'close'])
+        self.assertEqual(list(tail.columns), ['date_time', 'close'])
+        self.assertEqual(tail['close'].tolist(), [7.0, 8.0, 9.0])
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(tail['date_time']))
+
+        tail = self.db_manager.get_market_data(end='2023-10-01 10:04', last_n=2)
+        self.assertEqual(tail['open'].tolist(), [3.0, 4.0])
+
+        with self.assertRaises(ValueError):
+            self.db_manager.get_market_data(columns=['bid'])
+
+    def test_time_key_is_used(self):
+        with self.db_manager.get_connection() as conn:
+            plan = conn.execute(
+                "EXPLAIN QUERY PLAN SELECT * FROM market_data "
+                "WHERE symbol = ? AND timeframe = ? AND ts >= ? ORDER BY ts",
+                ('EURUSD', 'M1', 0)).fetchall()
+        plan = ' '.join(str(row) for row in plan)
+        self.assertIn('PRIMARY KEY', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_symbols_and_catalog(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01', '2023-10-01'],
+            'Time': ['10:00:00', '10:01:00'],
+            'Open': [1.1, 1.2], 'High': [1.2, 1.3], 'Low': [1.0, 1.1],
+            'Close': [1.15, 1.25], 'Volume': [10, 20]
+        })
+        self.db_manager.store_market_data(df, symbol='EURUSD', timeframe='M1')
+        self.db_manager.store_market_data(df.iloc[:1], symbol='GBPUSD', timeframe='M1')
+        self.db_manager.store_market_data(df, symbol='EURUSD', timeframe='M30')
+
+        counts = self.db_manager.store_market_data(
+            pd.concat([df, df.assign(Time=['10:02:00', '10:03:00'])]),
+            mode='append', symbol='EURUSD', timeframe='M1')
+        self.assertEqual(counts, {"inserted": 2, "updated": 0, "skipped": 2})
+
+        eurusd = self.db_manager.get_market_data(symbol='EURUSD', timeframe='M1')
+        self.assertEqual(len(eurusd), 4)
+        gbpusd = self.db_manager.get_market_data(symbol='GBPUSD', timeframe='M1')
+        self.assertEqual(gbpusd['close'].tolist(), [1.15])
+        self.assertTrue(self.db_manager.get_market_data().empty)
+
+        catalog = self.db_manager.get_catalog().set_index(['symbol', 'timeframe'])
+        self.assertEqual(catalog.loc[('EURUSD', 'M1'), 'rows'], 4)
+        self.assertEqual(catalog.loc[('EURUSD', 'M30'), 'rows'], 2)
+        self.assertEqual(catalog.loc[('GBPUSD', 'M1'), 'rows'], 1)
+        self.assertEqual(catalog.loc[('EURUSD', 'M1'), 'first_date_time'],
+                         pd.Timestamp('2023-10-01 10:00:00'))
+        self.assertEqual(catalog.loc[('EURUSD', 'M1'), 'last_date_time'],
+                         pd.Timestamp('2023-10-01 10:03:00'))
+
+        self.db_manager.store_market_data(df.iloc[:1], symbol='EURUSD', timeframe='M1')
+        catalog = self.db_manager.get_catalog().set_index(['symbol', 'timeframe'])
+        self.assertEqual(catalog.loc[('EURUSD', 'M1'), 'rows'], 1)
+        self.assertEqual(catalog.loc[('EURUSD', 'M1'), 'last_date_time'],
+                         pd.Timestamp('2023-10-01 10:00:00'))
+
+    def test_iter_market_data_chunks(self):
+        times = pd.date_range('2023-10-01 10:00', periods=25, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'),
+            'Time': times.strftime('%H:%M:%S'),
+            'Open': np.arange(25.0),
+            'High': np.arange(25.0) + 1,
+            'Low': np.arange(25.0) - 1,
+            'Close': np.arange(25.0) + 0.5,
+            'Volume': [100] * 24 + [None]
+        })
+        self.db_manager.store_market_data(df, symbol='EURUSD')
+
+        chunks = list(self.db_manager.iter_market_data(symbol='EURUSD', chunk_size=10))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        combined = pd.concat(chunks, ignore_index=True)
+        expected = self.db_manager.get_market_data(
+            symbol='EURUSD', columns=['date_time', 'open', 'high', 'low', 'close'])
+        pd.testing.assert_frame_equal(combined.drop(columns='volume'), expected)
+        self.assertEqual(combined['volume'].dtype, np.int64)
+        self.assertEqual(combined['volume'].iloc[-1], 0)
+
+        arrays = list(self.db_manager.iter_market_data(
+            symbol='EURUSD', start=times[5], end=times[14], columns=['ts', 'close'],
+            chunk_size=4, as_arrays=True))
+        self.assertEqual([len(chunk['ts']) for chunk in arrays], [4, 4, 2])
+        self.assertEqual(arrays[0]['ts'].dtype, np.int64)
+        np.testing.assert_array_equal(
+            np.concatenate([chunk['close'] for chunk in arrays]), np.arange(5.0, 15.0) + 0.5)
+
+        self.assertEqual(list(self.db_manager.iter_market_data(symbol='GBPUSD')), [])
+        with self.assertRaises(ValueError):
+            next(self.db_manager.iter_market_data(chunk_size=0))
+
+    def test_columnar_mirror(self):
+        times = pd.date_range('2023-10-01 10:00', periods=20, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'),
+            'Time': times.strftime('%H:%M:%S'),
+            'Open': np.arange(20.0), 'High': np.arange(20.0) + 1,
+            'Low': np.arange(20.0) - 1, 'Close': np.arange(20.0) + 0.5,
+            'Volume': range(20)
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, 'vortex.db')
+            with DatabaseManager(db_path) as db_manager:
+                self.assertEqual(db_manager.mirror.root, Path(f'{db_path}.columns'))
+                db_manager.store_market_data(df.iloc[:15], symbol='EURUSD')
+                columns = db_manager.get_market_columns(symbol='EURUSD')
+                self.assertIsInstance(columns['close'], np.memmap)
+                np.testing.assert_array_equal(columns['close'], np.arange(15.0) + 0.5)
+                np.testing.assert_array_equal(columns['date_time'], times[:15].to_numpy())
+                version = db_manager.mirror.manifest('EURUSD', 'M1')['version']
+
+                # Stores leave the mirror stale; the next read brings it up to date
+                db_manager.store_market_data(df, mode='append', symbol='EURUSD')
+                self.assertEqual(db_manager.mirror.manifest('EURUSD', 'M1')['version'], version)
+                columns = db_manager.get_market_columns(symbol='EURUSD')
+                np.testing.assert_array_equal(columns['close'], np.arange(20.0) + 0.5)
+                manifest = db_manager.mirror.manifest('EURUSD', 'M1')
+                self.assertGreater(manifest['version'], version)
+                self.assertEqual(manifest['rows'], 20)
+                # Skipped-only ingests do not touch the mirror
+                db_manager.store_market_data(df, mode='append', symbol='EURUSD')
+                db_manager.get_market_columns(symbol='EURUSD')
+                self.assertEqual(db_manager.mirror.manifest('EURUSD', 'M1'), manifest)
+
+            # An ingest that bypassed the mirror leaves it stale; readers rebuild it
+            with patch.dict(DATABASE, {'COLUMNAR_MIRROR': False}):
+                with DatabaseManager(db_path) as db_manager:
+                    self.assertIsNone(db_manager.mirror)
+                    db_manager.store_market_data(df.iloc[:5], symbol='EURUSD')
+            with DatabaseManager(db_path) as db_manager:
+                columns = db_manager.get_market_columns(symbol='EURUSD', columns=['ts', 'volume'])
+                self.assertEqual(len(columns['ts']), 5)
+                self.assertEqual(columns['volume'].dtype, np.int64)
+                self.assertEqual(len(db_manager.get_market_columns(symbol='GBPUSD')['close']), 0)
+
+    def test_columnar_mirror_reads_only_changed_bars(self):
+        times = pd.date_range('2023-10-01 10:00', periods=30, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': np.arange(30.0), 'Volume': 1
+        })
+        ts = times.as_unit('ns').asi8
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with DatabaseManager(os.path.join(tmp_dir, 'vortex.db')) as db_manager:
+                db_manager.store_market_data(df.iloc[:20], symbol='EURUSD')
+                db_manager.get_market_columns(symbol='EURUSD')
+                iter_market_data = db_manager.iter_market_data
+                starts = []
+
+                def spy(*args, **kwargs):
+                    starts.append(kwargs.get('start'))
+                    return iter_market_data(*args, **kwargs)
+
+                with patch.object(db_manager, 'iter_market_data', side_effect=spy):
+                    # Appended bars: only the new tail is read
+                    db_manager.store_market_data(df.iloc[15:25], mode='append', symbol='EURUSD')
+                    close = db_manager.get_market_columns(symbol='EURUSD', columns=['close'])['close']
+                    np.testing.assert_array_equal(close, np.arange(25.0))
+                    self.assertEqual(starts, [ts[19] + 1])
+
+                    # An update inside the series rereads from the first changed bar
+                    changed = df.iloc[[10, 26]].assign(Close=[-1.0, 26.0])
+                    db_manager.store_market_data(changed, mode='upsert', symbol='EURUSD')
+                    close = db_manager.get_market_columns(symbol='EURUSD', columns=['close'])['close']
+                    np.testing.assert_array_equal(
+                        close, np.r_[np.arange(10.0), -1.0, np.arange(11.0, 25.0), 26.0])
+                    self.assertEqual(starts[-1], ts[10])
+
+                    # Deleted bars, two changes between refreshes and a replace
+                    db_manager.delete_market_data(times[3], times[4], symbol='EURUSD')
+                    db_manager.store_market_data(df.iloc[27:], mode='append', symbol='EURUSD')
+                    columns = db_manager.get_market_columns(symbol='EURUSD', columns=['ts'])
+                    self.assertEqual(starts[-1], ts[3])
+                    np.testing.assert_array_equal(columns['ts'], np.delete(ts, [3, 4, 25]))
+                    db_manager.store_market_data(df.iloc[:5], symbol='EURUSD')
+                    np.testing.assert_array_equal(
+                        db_manager.get_market_columns(symbol='EURUSD', columns=['ts'])['ts'], ts[:5])
+                    self.assertIsNone(starts[-1])
+
+    def test_columnar_mirror_unsafe_names(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01', '2023-10-01'], 'Time': ['10:00:00', '10:01:00'], 'Open': [1.0, 2.0],
+            'High': [2.0, 3.0], 'Low': [0.5, 1.5], 'Close': [1.5, 2.5], 'Volume': [10, 20]
+        })
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            db_path = os.path.join(tmp_dir, 'vortex.db')
+            with DatabaseManager(db_path) as db_manager:
+                for symbol, timeframe in (('..', '..'), ('.', 'M1'), ('a/../../b', 'M1')):
+                    db_manager.store_market_data(df, symbol=symbol, timeframe=timeframe)
+                    columns = db_manager.get_market_columns(symbol=symbol, timeframe=timeframe)
+                    self.assertEqual(columns['close'].tolist(), [1.5, 2.5])
+                    series_dir = db_manager.mirror.series_dir(symbol, timeframe)
+                    self.assertIn(db_manager.mirror.root.resolve(), series_dir.resolve().parents)
+                    db_manager.store_market_data(df.iloc[:1], symbol=symbol, timeframe=timeframe)
+                    db_manager.delete_market_data(symbol=symbol, timeframe=timeframe)
+                self.assertEqual(db_manager.mirror.series_dir('..', '..').name, '%2e2e')
+                self.assertTrue(os.path.exists(db_path))
+                self.assertEqual(len(db_manager.get_market_data(symbol='..', timeframe='..')), 0)
+            self.assertEqual(sorted(os.listdir(tmp_dir))[0], 'vortex.db')
+            self.assertTrue(os.path.isdir(f'{db_path}.columns'))
+
+    def test_columnar_mirror_publishes_whole_versions(self):
+        def chunks(close):
+            yield {'ts': np.arange(3), 'open': close, 'high': close, 'low': close, 'close': close,
+                   'volume': np.arange(3)}
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            mirror = ColumnarMirror(tmp_dir)
+            series_dir = mirror.series_dir('EURUSD', 'M1')
+            mirror.write('EURUSD', 'M1', 3, chunks(np.ones(3)), 1, 100)
+            # Another process is still writing its copy of a later version
+            (series_dir / '.v2-200.123-abc.tmp').mkdir()
+
+            # A version already in place is kept, not rewritten under readers
+            mirror.write('EURUSD', 'M1', 3, chunks(np.zeros(3)), 1, 100)
+            manifest = mirror.manifest('EURUSD', 'M1')
+            self.assertEqual(mirror.open('EURUSD', 'M1', manifest, ['close'])['close'].tolist(), [1.0] * 3)
+
+            # A failed write leaves neither a directory nor a new manifest behind
+            with self.assertRaises(ValueError):
+                mirror.write('EURUSD', 'M1', 4, chunks(np.zeros(3)), 3, 300)
+            self.assertEqual(mirror.manifest('EURUSD', 'M1'), manifest)
+            self.assertEqual(sorted(p.name for p in series_dir.iterdir()),
+                             ['.v2-200.123-abc.tmp', 'manifest.json', 'v1-100'])
+
+            mirror.write('EURUSD', 'M1', 3, chunks(np.full(3, 4.0)), 4, 400)
+            # An older version finishing late does not replace the newer one
+            mirror.write('EURUSD', 'M1', 3, chunks(np.zeros(3)), 2, 200)
+            self.assertEqual(mirror.manifest('EURUSD', 'M1')['version'], 4)
+            self.assertIn('.v2-200.123-abc.tmp', os.listdir(series_dir))
+            self.assertNotIn('v1-100', os.listdir(series_dir))
+
+    def test_market_columns_without_mirror(self):
+        self.assertIsNone(self.db_manager.mirror)
+        df = pd.DataFrame({
+            'Date': ['2023-10-01'], 'Time': ['10:00:00'], 'Open': [1.0],
+            'High': [2.0], 'Low': [0.5], 'Close': [1.5], 'Volume': [10]
+        })
+        self.db_manager.store_market_data(df)
+        columns = self.db_manager.get_market_columns(columns=['close'])
+        np.testing.assert_array_equal(columns['close'], [1.5])
+        with self.assertRaises(ValueError):
+            self.db_manager.get_market_columns(columns=['date'])
+
+    def test_rollups_follow_base_ingest(self):
+        rng = np.random.default_rng(7)
+        times = pd.date_range('2023-10-01 21:30', periods=600, freq='min')
+        times = times[np.sort(rng.choice(600, 450, replace=False))]
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'),
+            'Time': times.strftime('%H:%M:%S'),
+            'Open': rng.random(450), 'High': rng.random(450) + 1,
+            'Low': rng.random(450) - 1, 'Close': rng.random(450),
+            'Volume': rng.integers(0, 100, 450)
+        })
+        self.db_manager.store_market_data(df.iloc[:300])
+        self.db_manager.store_market_data(df.iloc[250:], mode='append')
+
+        bars = df.rename(columns=str.lower).assign(datetime=times).drop(columns=['date', 'time'])
+        for timeframe, freq in (('M5', '5min'), ('H1', '1h'), ('D1', '1D')):
+            expected = TimeframeConverter.resample_ohlcv(bars.copy(), freq)
+            stored = self.db_manager.get_market_data(timeframe=timeframe)
+            np.testing.assert_array_equal(
+                stored['date_time'].to_numpy(), expected['datetime'].to_numpy())
+            for column in ('open', 'high', 'low', 'close', 'volume'):
+                np.testing.assert_allclose(stored[column], expected[column])
+            catalog = self.db_manager.get_catalog().set_index('timeframe')
+            self.assertEqual(catalog.loc[timeframe, 'rows'], len(expected))
+
+        self.db_manager.store_market_data(df.iloc[:10])
+        self.assertEqual(len(self.db_manager.get_market_data(timeframe='D1')), 1)
+        self.assertEqual(len(self.db_manager.get_market_data(timeframe='M5')),
+                         len(TimeframeConverter.resample_ohlcv(bars.iloc[:10].copy(), '5min')))
+
+    def test_rollups_never_touch_ingested_series(self):
+        def bars(start, periods, freq, close):
+            times = pd.date_range(start, periods=periods, freq=freq)
+            return pd.DataFrame({
+                'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+                'Open': close, 'High': close + 1, 'Low': close - 1, 'Close': close, 'Volume': 1
+            })
+
+        self.db_manager.store_market_data(bars('2023-10-02', 120, 'min', 1.0), symbol='EURUSD')
+        rollup_version = self.db_manager.data_version('EURUSD', 'H1')
+        self.assertEqual(len(self.db_manager.get_market_data(symbol='EURUSD', timeframe='H1')), 2)
+
+        # An ingested H1 series is read instead of the rollup, and gets a version never used before
+        self.db_manager.store_market_data(bars('2023-10-01', 48, 'h', 5.0), symbol='EURUSD', timeframe='H1')
+        self.assertGreater(self.db_manager.data_version('EURUSD', 'H1'), rollup_version)
+        for mode in ('replace', 'append'):
+            self.db_manager.store_market_data(bars('2023-10-02', 180, 'min', 2.0), mode=mode, symbol='EURUSD')
+            native = self.db_manager.get_market_data(symbol='EURUSD', timeframe='H1')
+            self.assertEqual(len(native), 48)
+            self.assertTrue((native['close'] == 5.0).all())
+        catalog = self.db_manager.get_catalog().set_index('timeframe')
+        self.assertEqual((catalog.loc['H1', 'rows'], catalog.loc['H1', 'rollup']), (48, 0))
+        self.assertEqual((catalog.loc['M5', 'rows'], catalog.loc['M5', 'rollup']), (36, 1))
+
+        # With its ingested bars deleted, the timeframe is served from the rollup again
+        self.assertEqual(self.db_manager.delete_market_data(symbol='EURUSD', timeframe='H1'), 48)
+        rolled_up = self.db_manager.get_market_data(symbol='EURUSD', timeframe='H1')
+        self.assertEqual(rolled_up['close'].tolist(), [2.0, 2.0, 2.0])
+        self.assertEqual(len(self.db_manager.get_market_columns(symbol='EURUSD', timeframe='H1')['close']), 3)
+
+    def test_find_overlap(self):
+        times = pd.date_range('2023-10-01 10:00', periods=10, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1
+        })
+        ts = times.as_unit('ns').asi8
+        self.assertEqual(self.db_manager.find_overlap(ts)['rows'], 0)
+        self.db_manager.store_market_data(df.iloc[::2])
+
+        overlap = self.db_manager.find_overlap(ts[3:])
+        self.assertEqual(overlap, {'rows': 3, 'first_ts': int(ts[4]), 'last_ts': int(ts[8])})
+        self.assertEqual(self.db_manager.find_overlap(ts[1::2])['rows'], 0)
+        self.assertEqual(self.db_manager.find_overlap(ts, symbol='OTHER')['rows'], 0)
+        # Disjoint ranges are answered from the catalog
+        later = pd.date_range('2023-10-02', periods=3, freq='min').as_unit('ns').asi8
+        with patch.object(self.db_manager, 'iter_market_data') as mock_iter:
+            self.assertEqual(self.db_manager.find_overlap(later)['rows'], 0)
+            mock_iter.assert_not_called()
+
+    def test_delete_market_data_range(self):
+        times = pd.date_range('2023-10-01 10:00', periods=20, freq='min')
+        df = pd.DataFrame({
+            'Date': times.strftime('%Y-%m-%d'), 'Time': times.strftime('%H:%M:%S'),
+            'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 1
+        })
+        self.db_manager.store_market_data(df)
+        version = self.db_manager.data_version()
+
+        deleted = self.db_manager.delete_market_data('2023-10-01 10:05', '2023-10-01 10:14')
+
+        self.assertEqual(deleted, 10)
+        stored = self.db_manager.get_market_data()
+        self.assertEqual(len(stored), 10)
+        catalog = self.db_manager.get_catalog().set_index('timeframe')
+        self.assertEqual(catalog.loc['M1', 'rows'], 10)
+        self.assertGreater(self.db_manager.data_version(), version)
+        # The emptied M5 buckets are removed, the H1 bar is rebuilt from what is left
+        m5 = self.db_manager.get_market_data(timeframe='M5')
+        self.assertEqual(m5['date_time'].dt.strftime('%H:%M').tolist(), ['10:00', '10:15'])
+        self.assertEqual(catalog.loc['M5', 'rows'], 2)
+        self.assertEqual(self.db_manager.get_market_data(timeframe='H1')['volume'].tolist(), [10])
+        self.assertEqual(self.db_manager.delete_market_data('2023-10-02'), 0)
+
+    def test_store_and_query_signals(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01'] * 3, 'Time': ['10:00:00', '10:01:00', '10:02:00'],
+            'Open': [1.0] * 3, 'High': [2.0] * 3, 'Low': [0.5] * 3, 'Close': [1.5] * 3,
+            'Volume': [10] * 3
+        })
+        self.db_manager.store_market_data(df)
+        params = {'tenkan_period': 9, 'z_score': 1.96}
+        self.assertIsNone(self.db_manager.get_signals(params))
+
+        times = pd.to_datetime(['2023-10-01 10:00', '2023-10-01 10:02', '2023-10-01 10:02'])
+        result = HLNResult([0, 2, 2], [2.0, 2.0, 0.5], [HIGH, HIGH, LOW], times.to_numpy())
+        batch = TradingSignalBatch.from_hln(result)
+        self.assertEqual(batch.signal_type.tolist(), ['high', 'high', 'low'])
+        self.assertEqual(self.db_manager.store_signals(batch, params), 3)
+
+        stored = self.db_manager.get_signals(dict(reversed(list(params.items()))))
+        self.assertEqual(len(stored), 3)
+        np.testing.assert_array_equal(stored.to_hln_result().indices, [0, 2, 2])
+        np.testing.assert_array_equal(stored.to_hln_result().kinds, [HIGH, HIGH, LOW])
+        window = self.db_manager.get_signals(params, start='2023-10-01 10:01')
+        self.assertEqual(window.price.tolist(), [2.0, 0.5])
+        signal = next(iter(window))
+        self.assertEqual((signal.signal_type, signal.price, signal.strength), ('high', 2.0, 1.0))
+        self.assertIsNone(self.db_manager.get_signals({'tenkan_period': 26}))
+
+        # New data makes the stored signals stale
+        self.db_manager.store_market_data(
+            df.assign(Time=['10:03:00', '10:04:00', '10:05:00']), mode='append')
+        self.assertIsNone(self.db_manager.get_signals(params))
+
+    def test_store_signals_in_transaction(self):
+        df = pd.DataFrame({
+            'Date': ['2023-10-01'] * 3, 'Time': ['10:00:00', '10:01:00', '10:02:00'],
+            'Open': [1.0] * 3, 'High': [2.0] * 3, 'Low': [0.5] * 3, 'Close': [1.5] * 3,
+            'Volume': [10] * 3
+        })
+        params = {'tenkan_period': 9}
+        times = pd.to_datetime(['2023-10-01 10:00', '2023-10-01 10:02'])
+        batch = TradingSignalBatch.from_hln(HLNResult([0, 2], [2.0, 0.5], [HIGH, LOW], times.to_numpy()))
+
+        with self.assertRaises(sqlite3.OperationalError):
+            with self.db_manager.transaction() as conn:
+                self.db_manager.store_market_data(df)
+                self.db_manager.store_signals(batch, params)
+                conn.execute("SELECT * FROM missing_table")
+        self.assertEqual(len(self.db_manager.get_market_data()), 0)
+
+        with self.db_manager.transaction():
+            self.db_manager.store_market_data(df)
+            self.assertEqual(self.db_manager.store_signals(batch, params), 2)
+        self.assertEqual(self.db_manager.get_signals(params).price.tolist(), [2.0, 0.5])
+
 
 if __name__ == '__main__':
     unittest.main()
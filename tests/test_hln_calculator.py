@@ -1,9 +1,14 @@
 # tests/test_hln_calculator.py
 
+import json
 import unittest
 import pandas as pd
 import numpy as np
 from strategy.hln_calculator import HLNCalculator
+from strategy.hln_engine import HIGH, LOW, detect_hln_events
+from strategy.incremental_hln import IncrementalHLNCalculator
+from strategy.hln_sweep import HLNParameterSweep
+from utils.streaming import RollingMoments
 from utils.indicators import TechnicalIndicators
 
 class TestHLNCalculator(unittest.TestCase):
@@ -54,5 +59,156 @@ class TestHLNCalculator(unittest.TestCase):
                 )
             )
 
+    def _gappy_data(self, periods=500):
+        # Large moves relative to bar ranges, so gaps interrupt the back-to-back runs
+        rng = np.random.default_rng(7)
+        closes = 100 + np.cumsum(rng.normal(0, 3, periods))
+        return pd.DataFrame(
+            {
+                "high": closes + rng.uniform(0, 1, periods),
+                "low": closes - rng.uniform(0, 1, periods),
+                "close": closes,
+            }
+        )
+
+    def _engine_points(self, calculator, period, anchor):
+        window = period + calculator._dynamic_tolerance(period).to_numpy()
+        indices, values, kinds, _ = detect_hln_events(
+            calculator.data["high"].to_numpy(),
+            calculator.data["low"].to_numpy(),
+            window,
+            anchor=anchor,
+            chunk_size=32,
+        )
+        highs = [{"index": i, "value": v} for i, v, k in zip(indices, values, kinds) if k == HIGH]
+        lows = [{"index": i, "value": v} for i, v, k in zip(indices, values, kinds) if k == LOW]
+        return highs, lows
+
+    def test_vectorized_engine_matches_loop(self):
+        for data in (self.test_data, self._gappy_data()):
+            for anchor in (None, (LOW, 9, data["low"][9]), (HIGH, 9, data["high"][9])):
+                vectorized = HLNCalculator(data.copy(), anchor=anchor).detect_high_low_normal(period=9)
+                loop = HLNCalculator(data.copy(), engine="loop", anchor=anchor).detect_high_low_normal(period=9)
+                self.assertEqual(vectorized, loop)
+                if anchor is not None:
+                    self.assertTrue(vectorized[0] and vectorized[1])
+
+    def test_vectorized_engine_matches_seeded_loop(self):
+        for data in (self.test_data, self._gappy_data()):
+            calculator = HLNCalculator(data.copy())
+            for period in (3, 9, 26):
+                seeded_low = {"index": period, "value": data["low"][period]}
+                seeded_high = {"index": period, "value": data["high"][period]}
+                self.assertEqual(
+                    self._engine_points(calculator, period, (LOW, period, seeded_low["value"])),
+                    calculator._detect_high_low_normal_loop(period, last_low=seeded_low),
+                )
+                self.assertEqual(
+                    self._engine_points(calculator, period, (HIGH, period, seeded_high["value"])),
+                    calculator._detect_high_low_normal_loop(period, last_high=seeded_high),
+                )
+
+    def test_calculate_hln_does_not_mutate_input(self):
+        data = self._gappy_data()
+        data["date_time"] = pd.date_range("2024-01-01", periods=len(data), freq="min")
+        before = data.copy()
+        HLNCalculator(data).calculate_hln()
+        pd.testing.assert_frame_equal(data, before)
+
+    def test_hln_result_conversions(self):
+        data = self._gappy_data()
+        data["date_time"] = pd.date_range("2024-01-01", periods=len(data), freq="min")
+        result = IncrementalHLNCalculator(tenkan_period=9, anchor=(LOW, 9, data["low"][9])).extend(data)
+        self.assertGreater(len(result), 0)
+        self.assertTrue(np.all(np.diff(result.indices) >= 0))
+        self.assertTrue(np.all(result.highs.kinds == HIGH))
+
+        frame = result.to_frame()
+        self.assertEqual(list(frame.columns), ["index", "value", "kind", "date_time"])
+        self.assertTrue((frame["date_time"].to_numpy() == data["date_time"].to_numpy()[result.indices]).all())
+
+        payload = json.loads(result.to_json())
+        self.assertEqual(payload["hln_timestamps"], result.indices.tolist())
+        self.assertEqual(payload["kinds"], frame["kind"].astype(str).tolist())
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            HLNCalculator(self.test_data, engine="gpu")
+
+    def test_rolling_moments_match_pandas(self):
+        changes = self.test_data["close"].diff()
+        moments = RollingMoments(9)
+        means, stds = [], []
+        for value in changes:
+            moments.update(value)
+            means.append(moments.mean())
+            stds.append(moments.std())
+        np.testing.assert_allclose(means, changes.rolling(9).mean(), rtol=1e-9)
+        np.testing.assert_allclose(stds, changes.rolling(9).std(), rtol=1e-9)
+
+    def test_incremental_matches_batch(self):
+        data = self._gappy_data()
+        for period in (3, 9):
+            seeded_low = {"index": period, "value": data["low"][period]}
+            expected = HLNCalculator(data.copy())._detect_high_low_normal_loop(
+                period, last_low=seeded_low
+            )
+
+            streaming = IncrementalHLNCalculator(
+                tenkan_period=period, anchor=(LOW, period, seeded_low["value"])
+            )
+            highs, lows = [], []
+            for _, bar in data.iterrows():
+                new_highs, new_lows = streaming.update(bar).to_point_lists()
+                highs += new_highs
+                lows += new_lows
+            self.assertEqual((highs, lows), expected)
+
+            batched = IncrementalHLNCalculator(
+                tenkan_period=period, anchor=(LOW, period, seeded_low["value"])
+            )
+            highs, lows = [], []
+            for start in range(0, len(data), 37):
+                new_highs, new_lows = batched.extend(data.iloc[start:start + 37]).to_point_lists()
+                highs += new_highs
+                lows += new_lows
+            self.assertEqual((highs, lows), expected)
+            self.assertEqual(batched.anchor, streaming.anchor)
+
+    def test_parameter_sweep_matches_calculator(self):
+        grid = [(period, confidence) for period in (5, 9, 26) for confidence in (0.9, 0.95, 0.99)]
+        sweep = HLNParameterSweep(self.test_data)
+        # Bar 26 is the first with a defined tolerance for every period in the grid
+        anchor = (LOW, 26, self.test_data["low"][26])
+        results = sweep.run(grid, anchor=anchor)
+
+        self.assertEqual(set(results), set(grid))
+        for period, confidence in grid:
+            calculator = HLNCalculator(
+                self.test_data.copy(), tenkan_period=period, confidence_level=confidence, anchor=anchor
+            )
+            values, timestamps = calculator.calculate_hln_lines()
+            self.assertGreater(len(timestamps), 0)
+            self.assertEqual(results[(period, confidence)].values.tolist(), values)
+            self.assertEqual(results[(period, confidence)].indices.tolist(), timestamps)
+
+            z = HLNParameterSweep.z_scores([confidence])[confidence]
+            np.testing.assert_allclose(
+                z * sweep.rolling_std(period),
+                calculator._dynamic_tolerance(period),
+                equal_nan=True,
+            )
+        self.assertEqual(sweep.run([(9, 0.95)])[(9, 0.95)].indices.tolist(), [])
+
+    def test_parameter_sweep_offset(self):
+        # A sweep over a later window takes the anchor and returns indices in global bar numbers
+        tail = self.test_data.iloc[40:].reset_index(drop=True)
+        value = tail["low"][9]
+        result = HLNParameterSweep(tail).run([(9, 0.95)], anchor=(LOW, 49, value), offset=40)[(9, 0.95)]
+        expected = HLNCalculator(tail, anchor=(LOW, 9, value)).calculate_hln()
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(result.indices.tolist(), (expected.indices + 40).tolist())
+        self.assertEqual(result.values.tolist(), expected.values.tolist())
+
 if __name__ == "__main__":
     unittest.main()
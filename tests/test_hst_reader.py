@@ -0,0 +1,108 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+import pandas as pd
+from data.bulk_ingest import BulkIngestor
+from data.data_processor import DataProcessor
+from data.hst_reader import HST_HEADER_DTYPE, HST_RECORD_DTYPES, HstFile
+from database.db_manager import DatabaseManager
+
+
+def write_hst(path, version, times, symbol="EURUSD", period=1, mode="wb"):
+    records = np.zeros(len(times), dtype=HST_RECORD_DTYPES[version])
+    records["time"] = times.as_unit("s").asi8
+    records["open"] = np.arange(len(times)) + 1.0
+    records["high"] = records["open"] + 0.5
+    records["low"] = records["open"] - 0.5
+    records["close"] = records["open"] + 0.25
+    records["volume"] = np.arange(len(times)) * 10
+    with open(path, mode) as f:
+        if mode == "wb":
+            header = np.zeros(1, dtype=HST_HEADER_DTYPE)
+            header["version"] = version
+            header["symbol"] = symbol.encode()
+            header["period"] = period
+            header["digits"] = 5
+            header.tofile(f)
+        records.tofile(f)
+
+
+class TestHstReader(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.times = pd.date_range("2023-10-01 23:55", periods=10, freq="min")
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def test_read_both_versions(self):
+        for version in (400, 401):
+            path = self.path(f"EURUSD{version}.hst")
+            write_hst(path, version, self.times, period=60)
+            hst = HstFile(path)
+
+            self.assertEqual((hst.version, hst.symbol, hst.timeframe, hst.digits, len(hst)),
+                             (version, "EURUSD", "H1", 5, 10))
+            columns = hst.columns(2, 5)
+            np.testing.assert_array_equal(columns["ts"], self.times[2:5].as_unit("ns").asi8)
+            self.assertEqual(columns["high"].tolist(), [3.5, 4.5, 5.5])
+            self.assertEqual(columns["low"].tolist(), [2.5, 3.5, 4.5])
+            self.assertEqual(columns["volume"].dtype, np.int64)
+
+            frame = hst.frame(4, 6)
+            self.assertEqual(frame["Date"].tolist(), ["2023-10-01", "2023-10-02"])
+            self.assertEqual(frame["Time"].tolist(), ["23:59:00", "00:00:00"])
+            self.assertEqual(frame["date_time"].tolist(), ["2023-10-01 23:59:00", "2023-10-02 00:00:00"])
+            self.assertEqual(len(hst.frame(10)), 0)
+
+    def test_invalid_files(self):
+        path = self.path("bad.hst")
+        with open(path, "wb") as f:
+            f.write(b"\0" * 10)
+        with self.assertRaises(ValueError):
+            HstFile(path)
+        header = np.zeros(1, dtype=HST_HEADER_DTYPE)
+        header["version"] = 402
+        header.tofile(path)
+        with self.assertRaises(ValueError):
+            HstFile(path)
+
+    def test_process_and_save_hst(self):
+        path = self.path("EURUSD1.hst")
+        write_hst(path, 401, self.times)
+        with DatabaseManager(":memory:") as db_manager:
+            data_processor = DataProcessor(db_manager)
+            data_processor.set_file_path(path)
+
+            counts = data_processor.process_and_save(symbol="EURUSD", chunk_size=4)
+
+            self.assertEqual(counts["inserted"], 10)
+            stored = db_manager.get_market_data(symbol="EURUSD", timeframe="M1")
+            np.testing.assert_array_equal(
+                stored["date_time"].to_numpy(), self.times.to_numpy(dtype="datetime64[ns]"))
+            self.assertEqual(stored["close"].tolist(), (np.arange(10) + 1.25).tolist())
+            self.assertTrue(data_processor.check_duplicates(path, symbol="EURUSD"))
+            # M1 history feeds the rollups like CSV bars
+            self.assertEqual(len(db_manager.get_market_data(symbol="EURUSD", timeframe="D1")), 2)
+
+    def test_bulk_ingest_appended_records(self):
+        path = self.path("history.hst")
+        write_hst(path, 400, self.times[:6], symbol="GBPUSD", period=30)
+        with DatabaseManager(":memory:") as db_manager:
+            ingestor = BulkIngestor(db_manager, executor="thread")
+            result, = ingestor.ingest(self.tmp.name)
+            self.assertEqual((result.symbol, result.timeframe, result.rows), ("GBPUSD", "M30", 6))
+
+            write_hst(path, 400, self.times[6:], mode="ab")
+            with open(path, "ab") as f:
+                f.write(b"\1" * 7)
+            result, = ingestor.run(self.tmp.name, complete_lines=True)
+            self.assertEqual(result.rows, 4)
+            self.assertEqual(result.offset, os.path.getsize(path) - 7)
+            self.assertEqual(len(db_manager.get_market_data(symbol="GBPUSD", timeframe="M30")), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
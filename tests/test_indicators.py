@@ -0,0 +1,245 @@
+# tests/test_indicators.py
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from utils.cache import CachedIndicators, IndicatorCache, data_fingerprint
+from utils.indicators import IchimokuComponents, TechnicalIndicators
+from utils.rolling import rolling_extrema, rolling_max, rolling_min
+from utils.streaming import (
+    StreamingATR,
+    StreamingDirectionChange,
+    StreamingFlatState,
+    StreamingIchimoku,
+)
+
+
+class TestTechnicalIndicators(unittest.TestCase):
+    def setUp(self):
+        periods = 300
+        np.random.seed(42)  # For reproducible results
+
+        closes = 100 + np.cumsum(np.random.normal(0, 1, periods))
+        self.test_data = pd.DataFrame(
+            {
+                "high": closes + np.random.uniform(0, 2, periods),
+                "low": closes - np.random.uniform(0, 2, periods),
+                "close": closes,
+            },
+            index=pd.date_range(start="2024-01-01", periods=periods, freq="h"),
+        )
+        self.indicators = TechnicalIndicators()
+
+    def _reference_ichimoku(self, high, low, close):
+        tenkan = (high.rolling(9).max() + low.rolling(9).min()) / 2
+        kijun = (high.rolling(26).max() + low.rolling(26).min()) / 2
+        return {
+            "tenkan_sen": tenkan,
+            "kijun_sen": kijun,
+            "senkou_span_a": ((tenkan + kijun) / 2).shift(26),
+            "senkou_span_b": ((high.rolling(52).max() + low.rolling(52).min()) / 2).shift(26),
+            "chikou_span": close.shift(-26),
+        }
+
+    def test_rolling_extrema_match_pandas(self):
+        high = self.test_data["high"].copy()
+        low = self.test_data["low"].copy()
+        high.iloc[[5, 120]] = np.nan
+        low.iloc[200] = np.nan
+        high.iloc[150] = np.inf
+
+        for window, (highs, lows) in rolling_extrema(high, low, (1, 9, 26, 52, 400)).items():
+            np.testing.assert_array_equal(highs, high.rolling(window).max().to_numpy())
+            np.testing.assert_array_equal(lows, low.rolling(window).min().to_numpy())
+        np.testing.assert_array_equal(rolling_max(high, 7), high.rolling(7).max().to_numpy())
+        np.testing.assert_array_equal(rolling_min(low, 7), low.rolling(7).min().to_numpy())
+
+    def test_atr_matches_previous_pandas_implementation(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        tr = pd.concat(
+            [high - low, abs(high - close.shift()), abs(low - close.shift())], axis=1
+        ).max(axis=1)
+        pd.testing.assert_series_equal(
+            self.indicators.calculate_atr(high, low, close, period=14),
+            tr.rolling(window=14).mean(),
+        )
+
+    def test_wilder_and_ema_atr(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        tr = self.indicators.true_range(high, low, close)
+        for method, alpha in (("wilder", 1 / 14), ("ema", 2 / 15)):
+            expected = np.full(len(tr), np.nan)
+            expected[13] = tr[:14].mean()
+            for i in range(14, len(tr)):
+                expected[i] = (1 - alpha) * expected[i - 1] + alpha * tr[i]
+            atr = self.indicators.calculate_atr(high, low, close, period=14, method=method)
+            np.testing.assert_allclose(atr.to_numpy(), expected, rtol=1e-12)
+
+    def test_streaming_atr_matches_batch(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        for method in ("sma", "wilder", "ema"):
+            streaming = StreamingATR(period=14, method=method)
+            values = [streaming.update(h, l, c) for h, l, c in zip(high, low, close)]
+            batch = self.indicators.calculate_atr(high, low, close, period=14, method=method)
+            np.testing.assert_allclose(values, batch.to_numpy(), rtol=1e-9)
+
+    def test_ichimoku_components_match_pandas(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        components = self.indicators.calculate_ichimoku_components(high, low, close)
+        for name, expected in self._reference_ichimoku(high, low, close).items():
+            pd.testing.assert_series_equal(components[name], expected, check_names=False)
+        above, below = components["fill_between"]
+        np.testing.assert_array_equal(
+            above["where"], components["senkou_span_a"] >= components["senkou_span_b"]
+        )
+        np.testing.assert_array_equal(below["y2"], components["senkou_span_b"].to_numpy())
+
+    def test_lazy_fill_between_is_a_key(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        components = self.indicators.calculate_ichimoku_components(high, low, close)
+        self.assertIn("fill_between", components)
+        self.assertEqual(len(components), 6)
+        self.assertEqual(list(components.keys())[-1], "fill_between")
+        self.assertFalse(dict.__contains__(components, "fill_between"))
+
+        self.assertIs(components.get("fill_between"), components["fill_between"])
+        self.assertIsNone(components.get("missing"))
+        self.assertEqual(len(components), 6)
+        copied = dict(self.indicators.calculate_ichimoku_components(high, low, close))
+        self.assertEqual(len(copied["fill_between"]), 2)
+
+    def test_lazy_fill_between_dict_methods(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        built = dict(self.indicators.calculate_ichimoku_components(high, low, close).items())
+        lines = {name: value for name, value in built.items() if name != "fill_between"}
+
+        with patch.object(TechnicalIndicators, "build_fill_between", return_value=built["fill_between"]):
+            self.assertEqual(IchimokuComponents(lines), built)
+            self.assertEqual(built, IchimokuComponents(lines))
+            self.assertNotEqual(IchimokuComponents(lines), lines)
+            self.assertIn("'fill_between'", repr(IchimokuComponents(lines)))
+
+            components = IchimokuComponents(lines)
+            self.assertIs(components.setdefault("fill_between", None), built["fill_between"])
+            components = IchimokuComponents(lines)
+            self.assertIs(components.pop("fill_between"), built["fill_between"])
+            self.assertNotIn("fill_between", components)
+            self.assertEqual(len(components), 5)
+            self.assertIsNone(components.pop("fill_between", None))
+            with self.assertRaises(KeyError):
+                components["fill_between"]
+
+            components = IchimokuComponents(lines)
+            self.assertEqual(components.popitem(), ("fill_between", built["fill_between"]))
+            components = IchimokuComponents(lines)
+            del components["fill_between"]
+            self.assertEqual(list(components), list(lines))
+
+    def test_streaming_ichimoku_matches_batch(self):
+        high, low, close = (self.test_data[c].copy() for c in ("high", "low", "close"))
+        high.iloc[100] = np.nan
+        expected = self._reference_ichimoku(high, low, close)
+
+        streaming = StreamingIchimoku()
+        outputs = [streaming.update(h, l, c) for h, l, c in zip(high, low, close)]
+        for name in ("tenkan_sen", "kijun_sen", "senkou_span_a", "senkou_span_b"):
+            np.testing.assert_array_equal([o[name] for o in outputs], expected[name].to_numpy())
+        chikou = {o["chikou_index"]: o["chikou_span"] for o in outputs if o["chikou_index"] >= 0}
+        np.testing.assert_array_equal(
+            [chikou[i] for i in sorted(chikou)], expected["chikou_span"].dropna().to_numpy()
+        )
+
+    def test_streaming_direction_and_flat_state(self):
+        series = pd.Series([1.0, 2.0, 3.0, 2.0, 2.00001, 2.00001, 1.0, np.nan, 2.0])
+        direction = StreamingDirectionChange()
+        flat = StreamingFlatState(threshold=0.0001)
+        self.assertEqual(
+            [direction.update(v) for v in series],
+            self.indicators.detect_direction_change(series).tolist(),
+        )
+        self.assertEqual(
+            [flat.update(v) for v in series],
+            self.indicators.detect_flat_state(series, threshold=0.0001).tolist(),
+        )
+
+    def test_compute_only_ichimoku(self):
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        lines = self.indicators.calculate_ichimoku_components(
+            high, low, close, compute_only=True, dtype=np.float32
+        )
+        self.assertNotIn("fill_between", lines)
+        for name, expected in self._reference_ichimoku(high, low, close).items():
+            self.assertEqual(lines[name].dtype, np.float32)
+            self.assertTrue(lines[name].flags["C_CONTIGUOUS"])
+            np.testing.assert_allclose(lines[name], expected.to_numpy(), rtol=1e-6)
+
+
+
+class TestIndicatorCache(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(42)
+        closes = 100 + np.cumsum(np.random.normal(0, 1, 200))
+        self.test_data = pd.DataFrame(
+            {
+                "date_time": pd.date_range(start="2024-01-01", periods=200, freq="h"),
+                "high": closes + 1,
+                "low": closes - 1,
+                "close": closes,
+            }
+        )
+
+    def test_fingerprint_tracks_tail_and_length(self):
+        fingerprint = data_fingerprint(self.test_data)
+        self.assertEqual(fingerprint, data_fingerprint(self.test_data.copy()))
+        changed = self.test_data.copy()
+        changed.loc[199, "close"] += 1
+        self.assertNotEqual(fingerprint, data_fingerprint(changed))
+        self.assertNotEqual(fingerprint, data_fingerprint(self.test_data.iloc[:-1]))
+
+    def test_cached_indicators_hit_on_unchanged_data(self):
+        cached = CachedIndicators()
+        high, low, close = (self.test_data[c] for c in ("high", "low", "close"))
+        first = cached.calculate_ichimoku_components(high, low, close, tenkan_period=9)
+        second = cached.calculate_ichimoku_components(high.copy(), low.copy(), close.copy(), tenkan_period=9)
+        self.assertIs(first, second)
+        cached.calculate_ichimoku_components(high, low, close, tenkan_period=10)
+        cached.calculate_atr(high, low, close)
+        stats = cached.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 3))
+
+    def test_lru_eviction_and_disk_tier(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = IndicatorCache(max_entries=2, cache_dir=cache_dir)
+            for key in ("a", "b", "c"):
+                cache.put(key, key.upper())
+            self.assertEqual(cache.stats()["evictions"], 1)
+            self.assertEqual(cache.get("a"), "A")
+            self.assertEqual(cache.stats()["disk_hits"], 1)
+
+            result = CachedIndicators(IndicatorCache(cache_dir=cache_dir)).calculate_hln(self.test_data)
+            reloaded = CachedIndicators(IndicatorCache(cache_dir=cache_dir)).calculate_hln(self.test_data)
+            np.testing.assert_array_equal(result.indices, reloaded.indices)
+
+    def test_disk_tier_is_bounded(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = IndicatorCache(max_entries=1, cache_dir=cache_dir, max_disk_entries=2)
+            for n, key in enumerate(("a", "b", "c")):
+                cache.put(key, key.upper())
+                # Distinct mtimes even on filesystems with coarse timestamps
+                os.utime(cache._disk_path(key), ns=(n * 10**9, n * 10**9))
+            self.assertEqual(sorted(p.name for p in Path(cache_dir).iterdir()), ["b.pkl", "c.pkl"])
+            self.assertEqual(cache.stats()["disk_evictions"], 1)
+
+            # A read makes an entry the newest on disk
+            self.assertEqual(cache.get("b"), "B")
+            cache.put("d", "D")
+            self.assertEqual(sorted(p.name for p in Path(cache_dir).iterdir()), ["b.pkl", "d.pkl"])
+            self.assertIsNone(IndicatorCache(cache_dir=cache_dir).get("c"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,9 +1,14 @@
 # tests/test_strategy.py
 
+import os
+import tempfile
 import unittest
+from unittest.mock import patch
 import pandas as pd
 import numpy as np
-from strategy.strategy import VortexStrategy
+from strategy.strategy import DEFAULT_CONFIG, VortexStrategy
+from strategy.multi_symbol import MultiSymbolRunner
+from database.db_manager import DatabaseManager
 from utils.indicators import TechnicalIndicators
 
 class TestVortexStrategy(unittest.TestCase):
@@ -67,6 +72,110 @@ class TestVortexStrategy(unittest.TestCase):
         self.strategy.initialize(self.test_data)
         self.assertIsNotNone(self.strategy.hln_calculator)
 
+    def test_seeded_signals(self):
+        self.strategy.initialize(self.test_data)
+        self.assertEqual(self.strategy.calculate_signals(), {"hln_points": [], "timestamps": []})
+
+        for seed in ("high", "low"):
+            strategy = VortexStrategy({**DEFAULT_CONFIG, "hln_seed": seed})
+            strategy.initialize(self.test_data)
+            signals = strategy.calculate_signals()
+            self.assertGreater(len(signals["timestamps"]), 0)
+            self.assertEqual(len(signals["hln_points"]), len(signals["timestamps"]))
+
+        with self.assertRaises(ValueError):
+            VortexStrategy({**DEFAULT_CONFIG, "hln_seed": "close"})
+
+    def test_update_signals_only_returns_new_points(self):
+        config = {**DEFAULT_CONFIG, "hln_seed": "low"}
+        # The seeded points start at bar tenkan_period, so split the feed inside them
+        split = 11
+        strategy = VortexStrategy(config)
+        strategy.initialize(self.test_data.iloc[:split])
+        earlier = strategy.calculate_signals()
+        signals = strategy.update_signals(self.test_data.iloc[split:])
+
+        full = VortexStrategy(config)
+        full.initialize(self.test_data)
+        expected = full.calculate_signals()
+        new_points = [t for t in expected["timestamps"] if t >= split]
+        self.assertGreater(len(new_points), 0)
+        self.assertEqual(signals["timestamps"], new_points)
+        self.assertEqual(earlier["timestamps"] + signals["timestamps"], expected["timestamps"])
+        self.assertEqual(earlier["hln_points"] + signals["hln_points"], expected["hln_points"])
+        self.assertEqual(strategy.incremental_hln.bar_count, len(self.test_data))
+
+    def test_multi_symbol_runner(self):
+        config = {**DEFAULT_CONFIG, "hln_seed": "low"}
+        sources = {"A": self.test_data, "B": self.test_data.iloc[:50], "EMPTY": pd.DataFrame()}
+        expected = VortexStrategy(config)
+        expected.initialize(self.test_data)
+        expected = expected.calculate_signals()
+        self.assertGreater(len(expected["timestamps"]), 0)
+        for executor in ("thread", "process"):
+            results = MultiSymbolRunner(config, max_workers=2, executor=executor).run_all(sources)
+            self.assertEqual(set(results), set(sources))
+            self.assertEqual(results["A"].signals, expected)
+            self.assertEqual(results["B"].rows, 50)
+            self.assertIsNotNone(results["EMPTY"].error)
+            self.assertGreaterEqual(results["A"].elapsed, results["A"].compute_time)
+
+    def test_multi_symbol_runner_from_database(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_name = os.path.join(tmp, "bars.db")
+            with DatabaseManager(db_name) as db_manager:
+                db_manager.store_market_data(self._bars(), symbol="EURUSD")
+                db_manager.store_market_data(self._bars().iloc[:50], symbol="GBPUSD")
+
+            results = MultiSymbolRunner(max_workers=2, executor="thread").run_all(
+                {"EURUSD": db_name, "GBPUSD": db_name, "USDJPY": db_name}
+            )
+            self.assertEqual((results["EURUSD"].rows, results["GBPUSD"].rows), (100, 50))
+            # A symbol missing from the database is an error, not another symbol's bars
+            self.assertIsNone(results["USDJPY"].signals)
+            self.assertIn("USDJPY", results["USDJPY"].error)
+
+    def _bars(self):
+        """The test data in the Date/Time column layout of the CSV files."""
+        return self.test_data.assign(
+            Date=self.test_data["datetime"].dt.strftime("%Y-%m-%d"),
+            Time=self.test_data["datetime"].dt.strftime("%H:%M:%S"),
+        ).drop(columns="datetime")
+
+    def test_signals_are_served_from_store(self):
+        db_manager = DatabaseManager(db_name=":memory:")
+        bars = self._bars()
+        config = {**DEFAULT_CONFIG, "hln_seed": "low"}
+        split = 11
+        db_manager.store_market_data(bars.iloc[:split], symbol="EURUSD", timeframe="H1")
+
+        with patch.object(VortexStrategy, "calculate_hln", autospec=True,
+                          side_effect=VortexStrategy.calculate_hln) as calculate:
+            first = VortexStrategy(config).get_or_calculate_signals(db_manager, "EURUSD", "H1")
+            second = VortexStrategy(config).get_or_calculate_signals(db_manager, "EURUSD", "H1")
+            self.assertEqual(calculate.call_count, 1)
+            self.assertEqual(first, second)
+            self.assertGreater(len(first["timestamps"]), 0)
+
+            live = VortexStrategy(config)
+            live.initialize(self.test_data.iloc[:split])
+            new_points = live.update_signals(self.test_data.iloc[split:])
+            db_manager.store_market_data(bars, mode="append", symbol="EURUSD", timeframe="H1")
+            updated = VortexStrategy(config).get_or_calculate_signals(db_manager, "EURUSD", "H1")
+            self.assertEqual(calculate.call_count, 2)
+
+        expected = VortexStrategy(config)
+        expected.initialize(self.test_data)
+        expected = expected.calculate_signals()
+        self.assertGreater(len(expected["timestamps"]), len(first["timestamps"]))
+        self.assertEqual(updated, expected)
+        # The stored batch for the new data version matches both a full run and the live updates
+        stored = db_manager.get_signals(config, "EURUSD", "H1").to_hln_result()
+        self.assertEqual(VortexStrategy.format_signals(stored), expected)
+        self.assertEqual(first["timestamps"] + new_points["timestamps"], expected["timestamps"])
+        # Signals of other parameters are not served
+        self.assertIsNone(db_manager.get_signals(DEFAULT_CONFIG, "EURUSD", "H1"))
+
     def test_strategy_with_empty_data(self):
         empty_data = pd.DataFrame()
         with self.assertRaises(ValueError):
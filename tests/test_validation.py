@@ -0,0 +1,118 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from data.data_processor import DataProcessor
+from data.validation import BarValidator
+from database.db_manager import DatabaseManager
+
+
+def make_bars(times, **columns):
+    times = pd.DatetimeIndex(times)
+    frame = pd.DataFrame({
+        'Open': 1.0, 'High': 2.0, 'Low': 0.5, 'Close': 1.5, 'Volume': 10,
+        'ts': times.as_unit('ns').asi8,
+    }, index=range(len(times)))
+    for name, values in columns.items():
+        frame[name] = values
+    return frame
+
+
+class TestBarValidator(unittest.TestCase):
+    def setUp(self):
+        self.times = pd.date_range('2023-10-02 10:00', periods=6, freq='min')
+
+    def test_price_checks(self):
+        bars = make_bars(
+            self.times,
+            Open=[1.0, np.nan, 1.0, 1.0, 3.0, 1.0],
+            High=[2.0, 2.0, 0.4, 2.0, 2.0, 2.0],
+            Low=[0.5, 0.5, 0.5, -1.0, 0.5, 0.5],
+        )
+        validator = BarValidator('M1')
+
+        self.assertIs(validator.validate(bars), bars)
+        counts = validator.report.counts
+        self.assertEqual(
+            (counts['missing_price'], counts['high_below_low'], counts['nonpositive_price'], counts['outside_range']),
+            (1, 1, 1, 2),
+        )
+        self.assertEqual(validator.report.ranges['outside_range'],
+                         [(self.times[2].value, self.times[2].value, 1), (self.times[4].value, self.times[4].value, 1)])
+        self.assertEqual(validator.report.issues, 5)
+
+    def test_drop_and_repair(self):
+        bars = make_bars(self.times, High=[2.0, 1.2, 2.0, 2.0, 2.0, 2.0], Close=[1.5, 1.5, 1.5, 0.0, 1.5, 1.5])
+
+        kept = BarValidator('M1', 'drop').validate(bars)
+        self.assertEqual(len(kept), 4)
+
+        validator = BarValidator('M1', 'repair')
+        repaired = validator.validate(bars)
+        self.assertEqual(len(repaired), 5)
+        self.assertEqual(repaired['High'].tolist()[1], 1.5)
+        self.assertEqual((validator.report.repaired, validator.report.dropped), (1, 1))
+        # The input is left alone
+        self.assertEqual(bars['High'].tolist()[1], 1.2)
+
+    def test_order_and_duplicates_across_chunks(self):
+        times = self.times[[0, 1, 2, 2, 4, 3]]
+        validator = BarValidator('M1', 'drop')
+
+        first = validator.validate(make_bars(times[:3]))
+        second = validator.validate(make_bars(times[3:]))
+
+        counts = validator.report.counts
+        self.assertEqual((counts['duplicate'], counts['unordered']), (1, 1))
+        self.assertEqual(len(first) + len(second), 5)
+        # A bar repeating the last one of the previous chunk is a duplicate
+        validator.validate(make_bars(self.times[4:5]))
+        self.assertEqual(validator.report.counts['duplicate'], 2)
+
+    def test_gaps(self):
+        # Friday evening to Sunday evening is the weekend close, not a gap
+        times = pd.DatetimeIndex([
+            '2023-10-06 20:58', '2023-10-06 20:59', '2023-10-08 21:00', '2023-10-08 23:00', '2023-10-08 23:01',
+        ])
+        validator = BarValidator('M1', gap_bars=60)
+
+        validator.validate(make_bars(times))
+
+        self.assertEqual(validator.report.counts['gap'], 1)
+        self.assertEqual(validator.report.ranges['gap'], [(times[2].value, times[3].value, 119)])
+
+    def test_report(self):
+        validator = BarValidator('M1', max_ranges=1)
+        validator.validate(make_bars(self.times, Low=[0.5, 3.0, 0.5, 3.0, 0.5, 0.5]))
+
+        report = validator.report.to_dict()
+        self.assertEqual(report['counts'], {'high_below_low': 2, 'outside_range': 2})
+        self.assertEqual(report['ranges']['high_below_low'],
+                         [{'first': '2023-10-02 10:01:00', 'last': '2023-10-02 10:01:00', 'bars': 1}])
+        self.assertIn('high_below_low 2', validator.report.summary())
+        with self.assertRaises(ValueError):
+            BarValidator('M1', 'fix')
+
+    def test_process_and_save_validation(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'bars.csv')
+            frame = make_bars(self.times, High=[2.0, 2.0, 2.0, 0.1, 2.0, 2.0]).drop(columns='ts')
+            frame.insert(0, 'Date', self.times.strftime('%Y.%m.%d'))
+            frame.insert(1, 'Time', self.times.strftime('%H:%M'))
+            frame.to_csv(path, index=False)
+            with DatabaseManager(':memory:') as db_manager:
+                data_processor = DataProcessor(db_manager)
+                data_processor.set_file_path(path)
+
+                with patch('builtins.print'):
+                    counts = data_processor.process_and_save(chunk_size=4, validation='drop')
+
+                self.assertEqual(counts['inserted'], 5)
+                self.assertEqual(data_processor.validation_report.rows, 6)
+                self.assertEqual(data_processor.validation_report.dropped, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,254 @@
+# utils/cache.py
+
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Optional, Union
+import numpy as np
+import pandas as pd
+from .indicators import TechnicalIndicators
+
+FINGERPRINT_TAIL = 256
+
+
+def _last_timestamp(data: Union[pd.Series, pd.DataFrame]) -> Optional[str]:
+    if isinstance(data, pd.DataFrame):
+        for column in ("date_time", "datetime"):
+            if column in data.columns and len(data):
+                return str(data[column].iloc[-1])
+    if isinstance(data.index, pd.DatetimeIndex) and len(data):
+        return str(data.index[-1])
+    return None
+
+
+def data_fingerprint(data: Union[pd.Series, pd.DataFrame], tail: int = FINGERPRINT_TAIL) -> str:
+    """
+    Cheap fingerprint of a Series or DataFrame: length, last timestamp and a hash of the last rows.
+
+    Appending bars or editing recent bars changes the fingerprint; edits older
+    than the last `tail` rows that keep the length and last timestamp do not.
+
+    Parameters:
+        data (Union[pd.Series, pd.DataFrame]): The input data.
+        tail (int): The number of trailing rows that are hashed (default is 256).
+
+    Returns:
+        str: A hex digest identifying the data.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{len(data)}|{_last_timestamp(data)}".encode())
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    for column in frame.columns:
+        values = frame[column].iloc[-tail:].to_numpy()
+        digest.update(str(column).encode())
+        if values.dtype == object:
+            digest.update(repr(values.tolist()).encode())
+        else:
+            digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+
+class IndicatorCache:
+    def __init__(
+        self,
+        max_entries: int = 128,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_disk_entries: int = 1024,
+    ):
+        """
+        Bounded LRU cache for indicator results with an optional on-disk tier.
+
+        Cached values are shared between callers and must be treated as read-only.
+        The disk tier is bounded too: past max_disk_entries files, the least recently
+        written or read ones (oldest mtime) are deleted.
+
+        Parameters:
+            max_entries (int): Maximum number of results kept in memory (default is 128).
+            cache_dir (Optional[Union[str, Path]]): Directory for pickled results; disabled if None.
+            max_disk_entries (int): Maximum number of results kept in cache_dir (default is 1024).
+        """
+        if max_entries <= 0:
+            raise ValueError("max_entries must be a positive number")
+        if max_disk_entries <= 0:
+            raise ValueError("max_disk_entries must be a positive number")
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_evictions = 0
+
+    @staticmethod
+    def make_key(name: str, *fingerprints: str, **params: Hashable) -> str:
+        """Build a cache key from a function name, input fingerprints and parameters."""
+        raw = repr((name, fingerprints, sorted(params.items())))
+        return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+    def _disk_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def _store(self, key: str, value: Any):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _trim_disk(self):
+        """Delete the oldest-mtime files of the disk tier beyond max_disk_entries."""
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                entries.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                # Removed meanwhile by another cache sharing the directory
+                continue
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort()
+        for _, path in entries[:len(entries) - self.max_disk_entries]:
+            path.unlink(missing_ok=True)
+            with self._lock:
+                self.disk_evictions += 1
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for key, looking in memory first and then on disk."""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+        if self.cache_dir is not None and self._disk_path(key).exists():
+            try:
+                with self._disk_path(key).open('rb') as f:
+                    value = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                print(f"Error reading cache entry {key}: {e}")
+            else:
+                try:
+                    # Recently read entries are evicted last
+                    os.utime(self._disk_path(key))
+                except OSError:
+                    pass
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, value)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key: str, value: Any):
+        """Store a value in memory and, if enabled, on disk."""
+        with self._lock:
+            self._store(key, value)
+        if self.cache_dir is not None:
+            path = self._disk_path(key)
+            tmp_path = path.with_suffix(".tmp")
+            with tmp_path.open('wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(path)
+            self._trim_disk()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for key, computing and storing it on a miss."""
+        missing = object()
+        value = self.get(key, missing)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self, disk: bool = False):
+        """Drop all in-memory entries, and the on-disk entries if disk is True."""
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink()
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and the current size."""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "disk_evictions": self.disk_evictions,
+            }
+
+
+class CachedIndicators:
+    def __init__(self, cache: Optional[IndicatorCache] = None):
+        """
+        TechnicalIndicators and HLN calculations memoized by data fingerprint and parameters.
+
+        Parameters:
+            cache (Optional[IndicatorCache]): The cache to use (a new in-memory cache if None).
+        """
+        self.cache = cache if cache is not None else IndicatorCache()
+        self.indicators = TechnicalIndicators()
+
+    def calculate_atr(
+        self,
+        high: pd.Series,
+        low: pd.Series,
+        close: pd.Series,
+        period: int = 14,
+        method: str = "sma",
+    ) -> pd.Series:
+        """Cached TechnicalIndicators.calculate_atr."""
+        key = self.cache.make_key(
+            "atr",
+            data_fingerprint(high),
+            data_fingerprint(low),
+            data_fingerprint(close),
+            period=period,
+            method=method,
+        )
+        return self.cache.get_or_compute(
+            key, lambda: self.indicators.calculate_atr(high, low, close, period=period, method=method)
+        )
+
+    def calculate_ichimoku_components(
+        self, high: pd.Series, low: pd.Series, close: pd.Series, **params
+    ) -> Dict[str, Any]:
+        """Cached TechnicalIndicators.calculate_ichimoku_components; params are passed through."""
+        key = self.cache.make_key(
+            "ichimoku", data_fingerprint(high), data_fingerprint(low), data_fingerprint(close), **params
+        )
+        return self.cache.get_or_compute(
+            key, lambda: self.indicators.calculate_ichimoku_components(high, low, close, **params)
+        )
+
+    def calculate_hln(
+        self, data: pd.DataFrame, tenkan_period: int = 9, confidence_level: float = 0.95, anchor=None
+    ):
+        """Cached HLNCalculator(data, ...).calculate_hln(); returns an HLNResult."""
+        from strategy.hln_calculator import HLNCalculator
+
+        key = self.cache.make_key(
+            "hln",
+            data_fingerprint(data),
+            tenkan_period=tenkan_period,
+            confidence_level=confidence_level,
+            anchor=anchor,
+        )
+        return self.cache.get_or_compute(
+            key,
+            lambda: HLNCalculator(
+                data, tenkan_period=tenkan_period, confidence_level=confidence_level, anchor=anchor
+            ).calculate_hln(),
+        )
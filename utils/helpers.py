@@ -1,10 +1,42 @@
 # utils/helpers.py
 
+import numpy as np
 import pandas as pd
 from datetime import datetime
 from typing import Union, List, Dict
 
 
+_DAYS_IN_MONTH = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31], dtype=np.int64)
+
+
+def _digits(values: np.ndarray, width: int) -> np.ndarray:
+    """View ASCII strings as an (n, width) uint8 matrix of byte values minus '0', NUL padded."""
+    encoded = np.asarray(values).astype(f"S{width}")
+    return encoded.view(np.uint8).reshape(-1, width) - np.uint8(ord("0"))
+
+
+def _number(matrix: np.ndarray, start: int, stop: int) -> np.ndarray:
+    """Decimal value of the digit columns start..stop-1 as int64."""
+    value = np.zeros(len(matrix), dtype=np.int64)
+    for column in range(start, stop):
+        value = value * 10 + matrix[:, column]
+    return value
+
+
+# Separator bytes as they appear in _digits() matrices
+_NUL, _DOT, _DASH, _COLON = (np.uint8((ord(c) - ord("0")) % 256) for c in "\0.-:")
+
+
+def _days_from_civil(year: np.ndarray, month: np.ndarray, day: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 of proleptic Gregorian dates (H. Hinnant's days_from_civil)."""
+    year = year - (month <= 2)
+    era = year // 400
+    year_of_era = year - era * 400
+    day_of_year = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    day_of_era = year_of_era * 365 + year_of_era // 4 - year_of_era // 100 + day_of_year
+    return era * 146097 + day_of_era - 719468
+
+
 class DataHelper:
     @staticmethod
     def validate_dataframe(df: pd.DataFrame, required_columns: List[str]) -> bool:
@@ -35,6 +67,63 @@ class DataHelper:
             dt = pd.to_datetime(dt)
         return dt.strftime("%Y-%m-%d %H:%M:%S")
 
+    @staticmethod
+    def parse_timestamps(dates, times) -> np.ndarray:
+        """
+        Parse date and time strings into int64 nanoseconds since the epoch.
+
+        Fixed-format values (dates "YYYY.MM.DD" as in MT4 exports or "YYYY-MM-DD",
+        times "HH:MM" or "HH:MM:SS") are decoded arithmetically on byte arrays,
+        without per-value parsing. Anything else falls back to pd.to_datetime.
+
+        Parameters:
+            dates (array-like): Date strings.
+            times (array-like): Time strings.
+
+        Returns:
+            np.ndarray: Timestamps as int64 nanoseconds since the epoch.
+        """
+        dates = np.asarray(dates, dtype=object)
+        times = np.asarray(times, dtype=object)
+        if not len(dates):
+            return np.empty(0, dtype=np.int64)
+        try:
+            d = _digits(dates, 11)
+            t = _digits(times, 9)
+        except (UnicodeEncodeError, TypeError, ValueError):
+            d = t = None
+        if d is not None and DataHelper._fixed_format(d, t):
+            year, month, day = _number(d, 0, 4), _number(d, 5, 7), _number(d, 8, 10)
+            hour, minute = _number(t, 0, 2), _number(t, 3, 5)
+            second = _number(t, 6, 8) if t[0, 5] == _COLON else 0
+            leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+            month_days = _DAYS_IN_MONTH[np.clip(month, 0, 12)] + (leap & (month == 2))
+            if (
+                ((month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days)).all()
+                and (hour < 24).all() and (minute < 60).all() and np.all(second < 60)
+            ):
+                seconds = _days_from_civil(year, month, day) * 86400 + hour * 3600 + minute * 60 + second
+                return seconds * 1_000_000_000
+        combined = pd.Series(dates).astype(str) + " " + pd.Series(times).astype(str)
+        return pd.to_datetime(combined).to_numpy(dtype="datetime64[ns]").view(np.int64)
+
+    @staticmethod
+    def _fixed_format(d: np.ndarray, t: np.ndarray) -> bool:
+        """Check the layout of date (YYYY?MM?DD) and time (HH:MM or HH:MM:SS) byte matrices."""
+        separator = d[0, 4]
+        if separator not in (_DOT, _DASH):
+            return False
+        if not (
+            (d[:, [4, 7]] == separator).all() and (d[:, 10] == _NUL).all()
+            and (d[:, [0, 1, 2, 3, 5, 6, 8, 9]] <= 9).all()
+        ):
+            return False
+        if not ((t[:, 2] == _COLON).all() and (t[:, [0, 1, 3, 4]] <= 9).all()):
+            return False
+        if (t[:, 5] == _NUL).all():
+            return True
+        return bool((t[:, 5] == _COLON).all() and (t[:, 8] == _NUL).all() and (t[:, [6, 7]] <= 9).all())
+
     @staticmethod
     def calculate_percentage_change(current: float, previous: float) -> float:
         """
@@ -51,6 +140,77 @@ class DataHelper:
 
 
 class TimeframeConverter:
+    # Bar length in seconds of the MT4-style timeframe names
+    TIMEFRAME_SECONDS = {
+        "M1": 60,
+        "M5": 300,
+        "M15": 900,
+        "M30": 1800,
+        "H1": 3600,
+        "H4": 14400,
+        "D1": 86400,
+    }
+
+    @staticmethod
+    def timeframe_ns(timeframe: str) -> int:
+        """
+        Return the bar length of a timeframe in nanoseconds.
+
+        Raises:
+            ValueError: If the timeframe is unknown.
+        """
+        if timeframe not in TimeframeConverter.TIMEFRAME_SECONDS:
+            raise ValueError(f"timeframe must be one of {list(TimeframeConverter.TIMEFRAME_SECONDS)}")
+        return TimeframeConverter.TIMEFRAME_SECONDS[timeframe] * 1_000_000_000
+
+    @staticmethod
+    def aggregate_ohlcv(
+        ts: np.ndarray,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray,
+        timeframe: str,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Aggregate time-sorted bars into epoch-aligned buckets of a larger timeframe with NumPy.
+
+        Gives the same bars as resample_ohlcv for the same data: empty buckets are
+        omitted and NaN prices are ignored by high/low.
+
+        Parameters:
+            ts (np.ndarray): Bar times as int64 nanoseconds since the epoch, ascending.
+            open_ (np.ndarray): Open prices.
+            high (np.ndarray): High prices.
+            low (np.ndarray): Low prices.
+            close (np.ndarray): Close prices.
+            volume (np.ndarray): Volumes.
+            timeframe (str): The target timeframe, e.g. 'H1'.
+
+        Returns:
+            Dict[str, np.ndarray]: ts (bucket start), open, high, low, close and volume per bucket.
+        """
+        width = TimeframeConverter.timeframe_ns(timeframe)
+        ts = np.asarray(ts, dtype=np.int64)
+        if not len(ts):
+            return {
+                "ts": ts.copy(),
+                **{name: np.empty(0) for name in ("open", "high", "low", "close")},
+                "volume": np.empty(0, dtype=np.asarray(volume).dtype),
+            }
+        buckets = ts - ts % width
+        starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+        ends = np.concatenate((starts[1:], [len(ts)])) - 1
+        return {
+            "ts": buckets[starts],
+            "open": np.asarray(open_)[starts],
+            "high": np.fmax.reduceat(np.asarray(high), starts),
+            "low": np.fmin.reduceat(np.asarray(low), starts),
+            "close": np.asarray(close)[ends],
+            "volume": np.add.reduceat(np.asarray(volume), starts),
+        }
+
     @staticmethod
     def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
         """
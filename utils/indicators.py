@@ -1,12 +1,167 @@
+from collections.abc import ItemsView, KeysView, Mapping, ValuesView
 import numpy as np
 import pandas as pd
-from typing import Tuple, Dict, Any
+from typing import Tuple, Dict, Any, List
+from scipy.signal import lfilter
 from config.settings import TRADING_PARAMS, ICHIMOKU_COLORS
+from .rolling import rolling_extrema
+
+ATR_METHODS = ("sma", "wilder", "ema")
+
+
+class IchimokuComponents(dict):
+    """
+    Ichimoku lines whose "fill_between" plot settings are only built when a chart asks for them.
+
+    Until it is built or removed, "fill_between" behaves as an ordinary key: it is
+    counted by `in`, iteration, len(), keys(), ==, repr() and setdefault(), and
+    reading it in any way ([], get(), pop(), popitem(), items(), values(), a copy)
+    builds and stores it first. Deleting it removes it for good.
+    """
+
+    FILL_BETWEEN = "fill_between"
+    # Cleared once fill_between is built or removed; per instance, as an attribute
+    _pending = True
+
+    def _lazy(self) -> bool:
+        return self._pending and not dict.__contains__(self, self.FILL_BETWEEN)
+
+    def _build(self):
+        if self._lazy():
+            self.__missing__(self.FILL_BETWEEN)
+
+    def __missing__(self, key):
+        if key != self.FILL_BETWEEN or not self._lazy():
+            raise KeyError(key)
+        fill_between = TechnicalIndicators.build_fill_between(
+            self["senkou_span_a"], self["senkou_span_b"]
+        )
+        self[key] = fill_between
+        self._pending = False
+        return fill_between
+
+    def __contains__(self, key) -> bool:
+        return dict.__contains__(self, key) or (key == self.FILL_BETWEEN and self._lazy())
+
+    def __iter__(self):
+        lazy = self._lazy()
+        yield from dict.__iter__(self)
+        if lazy:
+            yield self.FILL_BETWEEN
+
+    def __len__(self) -> int:
+        return dict.__len__(self) + self._lazy()
+
+    def __delitem__(self, key):
+        if key == self.FILL_BETWEEN and self._lazy():
+            self._pending = False
+            return
+        dict.__delitem__(self, key)
+        if key == self.FILL_BETWEEN:
+            self._pending = False
+
+    def __eq__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        return dict(self.items()) == dict(other.items())
+
+    def __ne__(self, other):
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(dict(self.items()))
+
+    def __or__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        merged = self.copy()
+        merged.update(other)
+        return merged
+
+    def __ror__(self, other):
+        if not isinstance(other, Mapping):
+            return NotImplemented
+        merged = dict(other.items())
+        merged.update(self.items())
+        return merged
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        if key == self.FILL_BETWEEN:
+            self._build()
+            self._pending = False
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        # fill_between is last in iteration order, so it is popped first
+        self._build()
+        key, value = dict.popitem(self)
+        if key == self.FILL_BETWEEN:
+            self._pending = False
+        return key, value
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def clear(self):
+        self._pending = False
+        dict.clear(self)
+
+    def keys(self):
+        return KeysView(self)
+
+    def items(self):
+        return ItemsView(self)
+
+    def values(self):
+        return ValuesView(self)
+
+    def copy(self) -> "IchimokuComponents":
+        return IchimokuComponents(self.items())
+
 
 class TechnicalIndicators:
+    @staticmethod
+    def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+        """
+        Calculate the True Range without intermediate frames.
+
+        Parameters:
+            high (np.ndarray): High prices.
+            low (np.ndarray): Low prices.
+            close (np.ndarray): Close prices.
+
+        Returns:
+            np.ndarray: max(high - low, |high - previous close|, |low - previous close|),
+            ignoring missing terms (the first bar is high - low).
+        """
+        high = np.asarray(high, dtype=np.float64)
+        low = np.asarray(low, dtype=np.float64)
+        close = np.asarray(close, dtype=np.float64)
+        tr = np.subtract(high, low)
+        if len(tr) > 1:
+            gap = np.subtract(high[1:], close[:-1])
+            np.abs(gap, out=gap)
+            np.fmax(tr[1:], gap, out=tr[1:])
+            np.subtract(low[1:], close[:-1], out=gap)
+            np.abs(gap, out=gap)
+            np.fmax(tr[1:], gap, out=tr[1:])
+        return tr
+
     @staticmethod
     def calculate_atr(
-        high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14
+        high: pd.Series,
+        low: pd.Series,
+        close: pd.Series,
+        period: int = 14,
+        method: str = "sma",
     ) -> pd.Series:
         """
         Calculate the Average True Range (ATR).
@@ -16,18 +171,46 @@ class TechnicalIndicators:
             low (pd.Series): Low prices.
             close (pd.Series): Close prices.
             period (int): The period for ATR calculation (default is 14).
+            method (str): Smoothing: "sma" (simple rolling mean), "wilder" (alpha = 1 / period)
+                or "ema" (alpha = 2 / (period + 1)). Wilder and EMA are seeded with the
+                simple mean of the first period values (default is "sma").
 
         Returns:
             pd.Series: ATR values.
         """
-        tr1 = high - low
-        tr2 = abs(high - close.shift())
-        tr3 = abs(low - close.shift())
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        return tr.rolling(window=period).mean()
+        if method not in ATR_METHODS:
+            raise ValueError(f"method must be one of {ATR_METHODS}")
+        tr = TechnicalIndicators.true_range(high, low, close)
+        index = high.index if isinstance(high, pd.Series) else None
+        if method == "sma":
+            return pd.Series(tr, index=index).rolling(window=period).mean()
+
+        atr = np.full(len(tr), np.nan)
+        if len(tr) >= period:
+            alpha = 1 / period if method == "wilder" else 2 / (period + 1)
+            seed = tr[:period].mean()
+            atr[period - 1] = seed
+            if len(tr) > period:
+                # atr[i] = (1 - alpha) * atr[i - 1] + alpha * tr[i], evaluated as a linear filter
+                atr[period:], _ = lfilter(
+                    [alpha], [1, alpha - 1], tr[period:], zi=[(1 - alpha) * seed]
+                )
+        return pd.Series(atr, index=index)
 
     @staticmethod
-    def calculate_ichimoku_components(
+    def _shift(values: np.ndarray, periods: int) -> np.ndarray:
+        """NumPy equivalent of pd.Series.shift for a float array."""
+        shifted = np.full(len(values), np.nan, dtype=values.dtype)
+        if periods == 0:
+            shifted[:] = values
+        elif 0 < periods < len(values):
+            shifted[periods:] = values[:-periods]
+        elif -len(values) < periods < 0:
+            shifted[:periods] = values[-periods:]
+        return shifted
+
+    @staticmethod
+    def calculate_ichimoku_lines(
         high: pd.Series,
         low: pd.Series,
         close: pd.Series,
@@ -35,10 +218,11 @@ class TechnicalIndicators:
         kijun_period: int = TRADING_PARAMS["KIJUN_PERIOD"],
         senkou_b_period: int = TRADING_PARAMS["SENKOU_B_PERIOD"],
         ichimoku_shift: int = TRADING_PARAMS["ICHIMOKU_SHIFT"],
-        chikou_shift: int = TRADING_PARAMS["CHIKOU_SHIFT"]
-    ) -> Dict[str, Any]:
+        chikou_shift: int = TRADING_PARAMS["CHIKOU_SHIFT"],
+        dtype: Any = np.float64,
+    ) -> Dict[str, np.ndarray]:
         """
-        Calculate all Ichimoku components.
+        Calculate the five Ichimoku lines only, without any plotting payload.
 
         Parameters:
             high (pd.Series): High prices.
@@ -49,41 +233,69 @@ class TechnicalIndicators:
             senkou_b_period (int): The period for Senkou Span B (default is 52).
             ichimoku_shift (int): The shift for Senkou Spans (default is 26).
             chikou_shift (int): The shift for Chikou Span (default is -26).
+            dtype (Any): Output dtype, e.g. np.float32 to halve memory (default is np.float64).
 
         Returns:
-            Dict[str, Any]: Dictionary containing Tenkan-sen, Kijun-sen, Senkou Span A, Senkou Span B, Chikou Span, and fill_between parameters.
+            Dict[str, np.ndarray]: Contiguous arrays for Tenkan-sen, Kijun-sen, Senkou Span A,
+            Senkou Span B and Chikou Span.
         """
+        # بیشینه و کمینه غلتان برای همه دوره‌ها در یک مرحله
+        extrema = rolling_extrema(
+            np.asarray(high, dtype=np.float64),
+            np.asarray(low, dtype=np.float64),
+            (tenkan_period, kijun_period, senkou_b_period),
+        )
+
         # محاسبه خطوط Tenkan-sen و Kijun-sen
-        tenkan_high = high.rolling(window=tenkan_period).max()
-        tenkan_low = low.rolling(window=tenkan_period).min()
+        tenkan_high, tenkan_low = extrema[tenkan_period]
         tenkan = (tenkan_high + tenkan_low) / 2
 
-        kijun_high = high.rolling(window=kijun_period).max()
-        kijun_low = low.rolling(window=kijun_period).min()
+        kijun_high, kijun_low = extrema[kijun_period]
         kijun = (kijun_high + kijun_low) / 2
 
         # محاسبه خطوط Senkou Span A و Senkou Span B
-        senkou_span_a = ((tenkan + kijun) / 2).shift(ichimoku_shift)
-        senkou_span_b_high = high.rolling(window=senkou_b_period).max()
-        senkou_span_b_low = low.rolling(window=senkou_b_period).min()
-        senkou_span_b = ((senkou_span_b_high + senkou_span_b_low) / 2).shift(ichimoku_shift)
+        senkou_span_a = TechnicalIndicators._shift((tenkan + kijun) / 2, ichimoku_shift)
+        senkou_span_b_high, senkou_span_b_low = extrema[senkou_b_period]
+        senkou_span_b = TechnicalIndicators._shift(
+            (senkou_span_b_high + senkou_span_b_low) / 2, ichimoku_shift
+        )
 
         # محاسبه خط Chikou Span
-        chikou_span = close.shift(chikou_shift)
+        chikou_span = TechnicalIndicators._shift(np.asarray(close, dtype=np.float64), chikou_shift)
+
+        return {
+            "tenkan_sen": tenkan.astype(dtype, copy=False),
+            "kijun_sen": kijun.astype(dtype, copy=False),
+            "senkou_span_a": senkou_span_a.astype(dtype, copy=False),
+            "senkou_span_b": senkou_span_b.astype(dtype, copy=False),
+            "chikou_span": chikou_span.astype(dtype, copy=False),
+        }
+
+    @staticmethod
+    def build_fill_between(senkou_span_a: pd.Series, senkou_span_b: pd.Series) -> List[Dict[str, Any]]:
+        """
+        Build the mplfinance fill_between settings for the Kumo between the Senkou spans.
+
+        Parameters:
+            senkou_span_a (pd.Series): Senkou Span A.
+            senkou_span_b (pd.Series): Senkou Span B.
 
+        Returns:
+            List[Dict[str, Any]]: fill_between dicts for the above and below Kumo colors.
+        """
         # تنظیمات پر کردن فضای بین Senkou Span A و Senkou Span B
-        fill_between = [
+        return [
             dict(
-                y1=senkou_span_a.values,
-                y2=senkou_span_b.values,
+                y1=np.asarray(senkou_span_a),
+                y2=np.asarray(senkou_span_b),
                 where=senkou_span_a >= senkou_span_b,
                 alpha=0.3,
                 facecolor=ICHIMOKU_COLORS["KOMU_ABOVE"],
                 interpolate=True
             ),
             dict(
-                y1=senkou_span_a.values,
-                y2=senkou_span_b.values,
+                y1=np.asarray(senkou_span_a),
+                y2=np.asarray(senkou_span_b),
                 where=senkou_span_a < senkou_span_b,
                 alpha=0.3,
                 facecolor=ICHIMOKU_COLORS["KOMU_BELOW"],
@@ -91,14 +303,58 @@ class TechnicalIndicators:
             )
         ]
 
-        return {
-            "tenkan_sen": tenkan,
-            "kijun_sen": kijun,
-            "senkou_span_a": senkou_span_a,
-            "senkou_span_b": senkou_span_b,
-            "chikou_span": chikou_span,
-            "fill_between": fill_between
-        }
+    @staticmethod
+    def calculate_ichimoku_components(
+        high: pd.Series,
+        low: pd.Series,
+        close: pd.Series,
+        tenkan_period: int = TRADING_PARAMS["TENKAN_PERIOD"],
+        kijun_period: int = TRADING_PARAMS["KIJUN_PERIOD"],
+        senkou_b_period: int = TRADING_PARAMS["SENKOU_B_PERIOD"],
+        ichimoku_shift: int = TRADING_PARAMS["ICHIMOKU_SHIFT"],
+        chikou_shift: int = TRADING_PARAMS["CHIKOU_SHIFT"],
+        compute_only: bool = False,
+        dtype: Any = np.float64,
+    ) -> Dict[str, Any]:
+        """
+        Calculate all Ichimoku components.
+
+        Parameters:
+            high (pd.Series): High prices.
+            low (pd.Series): Low prices.
+            close (pd.Series): Close prices.
+            tenkan_period (int): The period for Tenkan-sen (default is 9).
+            kijun_period (int): The period for Kijun-sen (default is 26).
+            senkou_b_period (int): The period for Senkou Span B (default is 52).
+            ichimoku_shift (int): The shift for Senkou Spans (default is 26).
+            chikou_shift (int): The shift for Chikou Span (default is -26).
+            compute_only (bool): Return only the five lines as NumPy arrays, as
+                calculate_ichimoku_lines does (default is False).
+            dtype (Any): Output dtype of the lines (default is np.float64).
+
+        Returns:
+            Dict[str, Any]: Dictionary containing Tenkan-sen, Kijun-sen, Senkou Span A, Senkou Span B, Chikou Span, and fill_between parameters.
+            fill_between is only built when it is first looked up.
+        """
+        lines = TechnicalIndicators.calculate_ichimoku_lines(
+            high,
+            low,
+            close,
+            tenkan_period=tenkan_period,
+            kijun_period=kijun_period,
+            senkou_b_period=senkou_b_period,
+            ichimoku_shift=ichimoku_shift,
+            chikou_shift=chikou_shift,
+            dtype=dtype,
+        )
+        if compute_only:
+            return lines
+
+        components = IchimokuComponents(
+            (name, pd.Series(values, index=high.index)) for name, values in lines.items()
+        )
+        components["chikou_span"].name = close.name
+        return components
 
     @staticmethod
     def detect_direction_change(series: pd.Series) -> pd.Series:
@@ -0,0 +1,122 @@
+# utils/rolling.py
+
+import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def _prepare(values: np.ndarray, max_window: int, pad: float) -> np.ndarray:
+    """Copy values into a buffer with room for padding, turning infinities into NaN like pandas."""
+    n = len(values)
+    buffer = np.empty(n + max_window, dtype=np.float64)
+    buffer[:n] = values
+    buffer[n:] = pad
+    infinite = np.isinf(buffer[:n])
+    if infinite.any():
+        buffer[:n][infinite] = np.nan
+    return buffer
+
+
+def _rolling_extreme(
+    buffer: np.ndarray,
+    n: int,
+    window: int,
+    ufunc: np.ufunc,
+    out: np.ndarray,
+    scratch: Tuple[np.ndarray, np.ndarray],
+) -> np.ndarray:
+    """
+    Rolling max or min in O(n) with the van Herk/Gil-Werman block algorithm.
+
+    The series is cut into blocks of `window` values; for every position the
+    extreme from the block start (prefix) and to the block end (suffix) is
+    accumulated once, and each window is the extreme of one suffix and one
+    prefix. NaN propagates through the accumulation, so any NaN in a window
+    yields NaN; like pandas, infinite values are treated as NaN.
+
+    Parameters:
+        buffer (np.ndarray): Values followed by at least window - 1 neutral pad values (see _prepare).
+        n (int): The number of actual values in buffer.
+        window (int): The window length.
+        ufunc (np.ufunc): np.maximum or np.minimum.
+        out (np.ndarray): Preallocated output array of length n.
+        scratch (Tuple[np.ndarray, np.ndarray]): Two work arrays at least as long as buffer.
+
+    Returns:
+        np.ndarray: out, with NaN for the first window - 1 positions.
+    """
+    out[: min(window - 1, n)] = np.nan
+    if window > n:
+        return out
+    if window == 1:
+        out[:] = buffer[:n]
+        return out
+
+    size = -(-n // window) * window
+    blocks = buffer[:size].reshape(-1, window)
+    prefix = scratch[0][:size].reshape(-1, window)
+    suffix = scratch[1][:size].reshape(-1, window)
+    ufunc.accumulate(blocks, axis=1, out=prefix)
+    ufunc.accumulate(blocks[:, ::-1], axis=1, out=suffix[:, ::-1])
+    ufunc(scratch[1][: n - window + 1], scratch[0][window - 1:n], out=out[window - 1:])
+    return out
+
+
+def _rolling(values: np.ndarray, window: int, ufunc: np.ufunc, pad: float, out: Optional[np.ndarray]) -> np.ndarray:
+    if window <= 0:
+        raise ValueError("window must be a positive number")
+    values = np.asarray(values, dtype=np.float64)
+    if out is None:
+        out = np.empty(len(values), dtype=np.float64)
+    buffer = _prepare(values, window, pad)
+    scratch = (np.empty_like(buffer), np.empty_like(buffer))
+    return _rolling_extreme(buffer, len(values), window, ufunc, out, scratch)
+
+
+def rolling_max(values: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling maximum matching pandas' rolling(window).max()."""
+    return _rolling(values, window, np.maximum, -np.inf, out)
+
+
+def rolling_min(values: np.ndarray, window: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """Rolling minimum matching pandas' rolling(window).min()."""
+    return _rolling(values, window, np.minimum, np.inf, out)
+
+
+def rolling_extrema(
+    high: np.ndarray, low: np.ndarray, windows: Iterable[int]
+) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+    """
+    Compute the rolling max of high and rolling min of low for several windows.
+
+    All outputs are written into one preallocated (2 * len(windows), n) array.
+    High and low are padded once and the work arrays are shared by every
+    window, so the cost does not include per-window temporaries.
+
+    Parameters:
+        high (np.ndarray): High prices.
+        low (np.ndarray): Low prices.
+        windows (Iterable[int]): Window lengths, e.g. tenkan, kijun and senkou B periods.
+
+    Returns:
+        Dict[int, Tuple[np.ndarray, np.ndarray]]: (rolling high max, rolling low min) per window.
+    """
+    high = np.asarray(high, dtype=np.float64)
+    low = np.asarray(low, dtype=np.float64)
+    windows = list(dict.fromkeys(windows))
+    for window in windows:
+        if window <= 0:
+            raise ValueError("window must be a positive number")
+
+    n = len(high)
+    max_window = max(windows, default=1)
+    high_buffer = _prepare(high, max_window, -np.inf)
+    low_buffer = _prepare(low, max_window, np.inf)
+    scratch = (np.empty_like(high_buffer), np.empty_like(high_buffer))
+    out = np.empty((2 * len(windows), n), dtype=np.float64)
+    results = {}
+    for k, window in enumerate(windows):
+        results[window] = (
+            _rolling_extreme(high_buffer, n, window, np.maximum, out[2 * k], scratch),
+            _rolling_extreme(low_buffer, n, window, np.minimum, out[2 * k + 1], scratch),
+        )
+    return results
@@ -0,0 +1,304 @@
+# utils/streaming.py
+
+import math
+from collections import deque
+from typing import Iterable
+
+
+class RollingMoments:
+    def __init__(self, window: int):
+        """
+        Rolling mean and sample standard deviation updated in O(1) per value.
+
+        Matches pandas' rolling(window).mean() / .std(): results are NaN until
+        the window is full and while it contains a NaN value.
+
+        Parameters:
+            window (int): The number of values in the rolling window.
+        """
+        if window <= 0:
+            raise ValueError("window must be a positive number")
+        self.window = window
+        self.values = deque(maxlen=window)
+        self._count = 0
+        self._nan_count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def _add(self, value: float):
+        if math.isnan(value):
+            self._nan_count += 1
+            return
+        self._count += 1
+        delta = value - self._mean
+        self._mean += delta / self._count
+        self._m2 += delta * (value - self._mean)
+
+    def _remove(self, value: float):
+        if math.isnan(value):
+            self._nan_count -= 1
+            return
+        self._count -= 1
+        if self._count == 0:
+            self._mean = 0.0
+            self._m2 = 0.0
+            return
+        delta = value - self._mean
+        self._mean -= delta / self._count
+        self._m2 -= delta * (value - self._mean)
+
+    def update(self, value: float):
+        """
+        Push a new value into the window, evicting the oldest one when full.
+
+        Parameters:
+            value (float): The new value (NaN is allowed).
+        """
+        value = float(value)
+        if len(self.values) == self.window:
+            self._remove(self.values[0])
+        self.values.append(value)
+        self._add(value)
+
+    def extend(self, values: Iterable[float]):
+        """Push several values in order."""
+        for value in values:
+            self.update(value)
+
+    @property
+    def ready(self) -> bool:
+        """True when the window is full and free of NaN values."""
+        return len(self.values) == self.window and self._nan_count == 0
+
+    def mean(self) -> float:
+        """Return the rolling mean, or NaN if the window is not ready."""
+        return self._mean if self.ready else math.nan
+
+    def std(self) -> float:
+        """Return the rolling sample standard deviation, or NaN if not ready."""
+        if not self.ready or self.window < 2:
+            return math.nan
+        return math.sqrt(max(self._m2, 0.0) / (self.window - 1))
+
+
+class StreamingATR:
+    def __init__(self, period: int = 14, method: str = "sma"):
+        """
+        Average True Range updated in O(1) per bar.
+
+        Produces the same values as TechnicalIndicators.calculate_atr with the
+        same period and method, one bar at a time.
+
+        Parameters:
+            period (int): The period for ATR calculation (default is 14).
+            method (str): "sma", "wilder" or "ema" (default is "sma").
+        """
+        from .indicators import ATR_METHODS
+
+        if method not in ATR_METHODS:
+            raise ValueError(f"method must be one of {ATR_METHODS}")
+        if period <= 0:
+            raise ValueError("period must be a positive number")
+        self.period = period
+        self.method = method
+        self.alpha = 1 / period if method == "wilder" else 2 / (period + 1)
+        self.prev_close = None
+        self.value = math.nan
+        self.bar_count = 0
+        self._window = RollingMoments(period)
+
+    def true_range(self, high: float, low: float) -> float:
+        """True Range of a bar against the previous close, ignoring missing terms."""
+        terms = [high - low]
+        if self.prev_close is not None:
+            terms += [abs(high - self.prev_close), abs(low - self.prev_close)]
+        terms = [term for term in terms if not math.isnan(term)]
+        return max(terms) if terms else math.nan
+
+    def update(self, high: float, low: float, close: float) -> float:
+        """
+        Process a bar and return the ATR after it (NaN during warm-up).
+
+        Parameters:
+            high (float): High price.
+            low (float): Low price.
+            close (float): Close price.
+        """
+        tr = self.true_range(float(high), float(low))
+        self.prev_close = float(close)
+        self.bar_count += 1
+
+        if self.method == "sma":
+            self._window.update(tr)
+            self.value = self._window.mean()
+        elif self.bar_count <= self.period:
+            # Wilder and EMA are seeded with the simple mean of the first period values
+            self._window.update(tr)
+            self.value = self._window.mean() if self.bar_count == self.period else math.nan
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * tr
+        return self.value
+
+
+class StreamingExtreme:
+    def __init__(self, window: int, maximum: bool = True):
+        """
+        Rolling max (or min) over a monotonic deque, O(1) amortized per value.
+
+        Matches pandas' rolling(window).max() / .min(): NaN until the window is
+        full and while it contains a NaN or infinite value.
+
+        Parameters:
+            window (int): The number of values in the rolling window.
+            maximum (bool): Track the maximum if True, the minimum otherwise (default is True).
+        """
+        if window <= 0:
+            raise ValueError("window must be a positive number")
+        self.window = window
+        self.maximum = maximum
+        self.count = 0
+        self._candidates = deque()  # (index, value), values monotonic from the front
+        self._last_missing = -window
+
+    def update(self, value: float) -> float:
+        """Push a value and return the extreme of the last window values."""
+        value = float(value)
+        i = self.count
+        self.count += 1
+        if math.isnan(value) or math.isinf(value):
+            self._last_missing = i
+        else:
+            candidates = self._candidates
+            if self.maximum:
+                while candidates and candidates[-1][1] <= value:
+                    candidates.pop()
+            else:
+                while candidates and candidates[-1][1] >= value:
+                    candidates.pop()
+            candidates.append((i, value))
+        while self._candidates and self._candidates[0][0] <= i - self.window:
+            self._candidates.popleft()
+
+        if self.count < self.window or self._last_missing > i - self.window:
+            return math.nan
+        return self._candidates[0][1]
+
+
+class StreamingIchimoku:
+    def __init__(
+        self,
+        tenkan_period: int = 9,
+        kijun_period: int = 26,
+        senkou_b_period: int = 52,
+        ichimoku_shift: int = 26,
+        chikou_shift: int = -26,
+    ):
+        """
+        Ichimoku lines updated bar by bar with bounded memory.
+
+        Gives the same values as TechnicalIndicators.calculate_ichimoku_components.
+        Senkou spans are delayed through a ring buffer of ichimoku_shift values.
+        With a negative chikou_shift the Chikou Span of a past bar only becomes
+        known now, so it is reported together with the index it belongs to.
+
+        Parameters:
+            tenkan_period (int): The period for Tenkan-sen (default is 9).
+            kijun_period (int): The period for Kijun-sen (default is 26).
+            senkou_b_period (int): The period for Senkou Span B (default is 52).
+            ichimoku_shift (int): The shift for Senkou Spans (default is 26).
+            chikou_shift (int): The shift for Chikou Span (default is -26).
+        """
+        if ichimoku_shift < 0:
+            raise ValueError("ichimoku_shift must not be negative")
+        self.ichimoku_shift = ichimoku_shift
+        self.chikou_shift = chikou_shift
+        self.bar_count = 0
+        self._extremes = {
+            period: (StreamingExtreme(period, maximum=True), StreamingExtreme(period, maximum=False))
+            for period in {tenkan_period, kijun_period, senkou_b_period}
+        }
+        self.periods = (tenkan_period, kijun_period, senkou_b_period)
+        self._spans = deque(maxlen=ichimoku_shift + 1)
+        self._closes = deque(maxlen=max(chikou_shift, 0) + 1)
+
+    def update(self, high: float, low: float, close: float) -> dict:
+        """
+        Process a bar.
+
+        Parameters:
+            high (float): High price.
+            low (float): Low price.
+            close (float): Close price.
+
+        Returns:
+            dict: index, tenkan_sen, kijun_sen, senkou_span_a and senkou_span_b for this bar,
+            plus chikou_span and the chikou_index of the bar it belongs to.
+        """
+        midpoints = {}
+        for period, (highest, lowest) in self._extremes.items():
+            midpoints[period] = (highest.update(high) + lowest.update(low)) / 2
+        tenkan_period, kijun_period, senkou_b_period = self.periods
+        tenkan = midpoints[tenkan_period]
+        kijun = midpoints[kijun_period]
+
+        self._spans.append(((tenkan + kijun) / 2, midpoints[senkou_b_period]))
+        if len(self._spans) == self._spans.maxlen:
+            senkou_span_a, senkou_span_b = self._spans[0]
+        else:
+            senkou_span_a = senkou_span_b = math.nan
+
+        index = self.bar_count
+        self.bar_count += 1
+        self._closes.append(float(close))
+        if self.chikou_shift < 0:
+            chikou_index, chikou_span = index + self.chikou_shift, float(close)
+        else:
+            chikou_index = index
+            full = len(self._closes) == self._closes.maxlen
+            chikou_span = self._closes[0] if full else math.nan
+
+        return {
+            "index": index,
+            "tenkan_sen": tenkan,
+            "kijun_sen": kijun,
+            "senkou_span_a": senkou_span_a,
+            "senkou_span_b": senkou_span_b,
+            "chikou_index": chikou_index,
+            "chikou_span": chikou_span,
+        }
+
+
+class StreamingDirectionChange:
+    def __init__(self):
+        """Streaming TechnicalIndicators.detect_direction_change: True when the slope changes sign."""
+        self._previous_value = None
+        self._previous_diff = math.nan
+
+    def update(self, value: float) -> bool:
+        """Push a value and return whether the direction changed at it."""
+        value = float(value)
+        diff = value - self._previous_value if self._previous_value is not None else math.nan
+        changed = diff * self._previous_diff < 0
+        self._previous_value = value
+        self._previous_diff = diff
+        return changed
+
+
+class StreamingFlatState:
+    def __init__(self, threshold: float = 0.0001):
+        """
+        Streaming TechnicalIndicators.detect_flat_state: True when the last change is below threshold.
+
+        Parameters:
+            threshold (float): The threshold for detecting flat states (default is 0.0001).
+        """
+        self.threshold = threshold
+        self._previous_value = None
+
+    def update(self, value: float) -> bool:
+        """Push a value and return whether the series is flat at it."""
+        value = float(value)
+        previous, self._previous_value = self._previous_value, value
+        if previous is None:
+            return False
+        return abs(value - previous) < self.threshold